@@ -0,0 +1,222 @@
+"""Delivery of the inventory alerts computed by the pipeline.
+
+Alerts are handed to a background worker so the post-run hook keeps uploading while they
+are sent. Every delivery has a timeout and is retried with backoff on connection errors,
+rate limits and server errors. Alerts that were delivered are remembered in a state file,
+so re-running the pipeline on the same day does not notify twice.
+"""
+import datetime
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .customClasses.HTTPTransport import get_default_transport
+from .customClasses.Tracer import attributes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+# days a delivered alert is remembered
+STATE_RETENTION_DAYS = 31
+
+SENT = "sent"
+FAILED = "failed"
+DUPLICATE = "duplicate"
+PENDING = "pending"
+
+
+class DeliveryError(Exception):
+    """An alert could not be delivered
+
+    Attributes:
+        retryable: the delivery may succeed when tried again
+    """
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def alert_key(alert: Dict[str, Any]) -> str:
+    """Identity of an alert, the same change on the same day has the same key"""
+    return f"{alert['date']}|{alert['level']}|{alert['name']}"
+
+
+def format_alert(alert: Dict[str, Any]) -> str:
+    """Human readable text of an alert"""
+    delta = alert["delta"]
+    delta = int(delta) if float(delta).is_integer() else delta
+    if alert["level"] == "total":
+        return f"Inventory diff is {delta} from yesterday. Date: {alert['date']}."
+    return (
+        f"Inventory diff of {alert['level']} {alert['name']} is {delta} from yesterday "
+        f"(threshold {alert['threshold']:g}). Date: {alert['date']}."
+    )
+
+
+class SlackSink:
+    """Posts alerts to a Slack incoming webhook
+
+    Attributes:
+        url: the webhook URL
+        timeout: seconds a post may take
+    """
+
+    def __init__(self, url: str, timeout: float = DEFAULT_TIMEOUT, transport=None):
+        self.url = url
+        self.timeout = timeout
+        self.transport = transport or get_default_transport()
+
+    def __repr__(self):
+        return "SlackSink()"
+
+    def send(self, alert: Dict[str, Any]) -> None:
+        """Post one alert
+
+        Raises:
+            DeliveryError: the post failed, retryable unless Slack rejected the message
+        """
+        try:
+            # the webhook URL is a secret, the span only names the service
+            with attributes(endpoint="POST slack webhook"):
+                response = self.transport.post(self.url, json={"text": format_alert(alert)}, timeout=self.timeout)
+        except Exception as error:
+            raise DeliveryError(f"{type(error).__name__}: {error}") from error
+        if response.status_code >= 400:
+            retryable = response.status_code == 429 or response.status_code >= 500
+            raise DeliveryError(f"Slack answered {response.status_code}: {response.text[:200]}", retryable)
+
+
+class AlertDispatcher:
+    """Background worker delivering alerts to every sink
+
+    Attributes:
+        sinks: objects with a ``send(alert)`` method
+        retries: retries of a failed delivery
+        backoff: seconds before the first retry, doubled on every retry
+        state_file: JSON file of the alerts already delivered, no deduplication across
+            runs without it
+    """
+
+    def __init__(
+            self,
+            sinks: List[Any],
+            retries: int = DEFAULT_RETRIES,
+            backoff: float = DEFAULT_BACKOFF,
+            state_file: Optional[str] = None,
+    ):
+        self.sinks = list(sinks)
+        self.retries = retries
+        self.backoff = backoff
+        self.state_file = state_file
+        self.results: Dict[str, str] = {}
+        self._sent = self._load_state()
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._started = False
+
+    def _load_state(self) -> Dict[str, str]:
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self) -> None:
+        if not self.state_file:
+            return
+        oldest = (datetime.datetime.now() - datetime.timedelta(days=STATE_RETENTION_DAYS)).isoformat()
+        with self._lock:
+            state = {key: sent_at for key, sent_at in self._sent.items() if sent_at >= oldest}
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_file)
+
+    def start(self) -> "AlertDispatcher":
+        """Start the worker"""
+        if not self._started:
+            self._started = True
+            self._worker.start()
+        return self
+
+    def submit(self, alert: Dict[str, Any]) -> bool:
+        """Queue an alert for delivery
+
+        Returns:
+            bool: False when the alert was already delivered or queued
+        """
+        key = alert_key(alert)
+        with self._lock:
+            if key in self._sent or key in self.results:
+                self.results.setdefault(key, DUPLICATE)
+                logger.info("Alert %s was already sent", key)
+                return False
+            self.results[key] = PENDING
+        self._queue.put(alert)
+        return True
+
+    def _deliver(self, sink, alert: Dict[str, Any]) -> None:
+        for attempt in range(self.retries + 1):
+            try:
+                sink.send(alert)
+                return
+            except DeliveryError as error:
+                if not error.retryable or attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                logger.warning("Alert delivery to %r failed, retrying in %.1fs: %s", sink, delay, error)
+                time.sleep(delay)
+
+    def _run(self) -> None:
+        while True:
+            alert = self._queue.get()
+            if alert is None:
+                return
+            key = alert_key(alert)
+            try:
+                for sink in self.sinks:
+                    self._deliver(sink, alert)
+            except Exception as error:  # a failed alert must not stop the others
+                status = FAILED
+                logger.error("Alert %s could not be delivered: %s", key, error)
+            else:
+                status = SENT
+                logger.info("Alert %s sent: %s", key, format_alert(alert))
+            with self._lock:
+                self.results[key] = status
+                if status == SENT:
+                    self._sent[key] = datetime.datetime.now().isoformat(timespec="seconds")
+
+    def close(self, timeout: float = None) -> Dict[str, str]:
+        """Wait for the queued alerts and stop the worker
+
+        Args:
+            timeout: seconds to wait, alerts still queued after it stay pending and are not
+                remembered as sent
+
+        Returns:
+            Dict[str, str]: "sent", "failed", "duplicate" or "pending" for every alert key
+        """
+        if self._started:
+            self._queue.put(None)
+            self._worker.join(timeout)
+        self._save_state()
+        with self._lock:
+            results = dict(self.results)
+        pending = [key for key, status in results.items() if status == PENDING]
+        if pending:
+            logger.warning("%d alerts were not sent before the %ss timeout: %s", len(pending), timeout, pending)
+        return results
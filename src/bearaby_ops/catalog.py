@@ -0,0 +1,147 @@
+"""Data catalog narrowing the dtypes of every frame it loads from a file.
+
+``OptimizingDataCatalog`` is the ``DATA_CATALOG_CLASS`` of the project. Frames loaded from
+CSV, Excel or Parquet go through ``optimize_dtypes``: integers are narrowed to int32 when
+their values fit, floats to float32 when no value changes, and the repeated text columns of
+``CATEGORICAL_COLUMNS`` become categoricals. The memory of every frame before and after is
+logged. Frames handed from node to node in memory are left as their node made them.
+
+The intermediate results without a catalog entry, which the runners keep in a
+``MemoryDataset``, are kept in a ``CopyOnWriteMemoryDataset`` instead: with pandas
+Copy-on-Write enabled the nodes reading them share their data until one modifies it.
+"""
+import logging
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+from kedro.io import AbstractDataset, AbstractVersionedDataset, DataCatalog, MemoryDataset
+
+from .extras.datasets import CopyOnWriteMemoryDataset
+
+logger = logging.getLogger(__name__)
+
+# text columns holding a handful of distinct values, whatever the dataset
+CATEGORICAL_COLUMNS = frozenset({
+    "WAREHOUSEID", "WAREHOUSENAME", "ACCOUNTNAME", "Warehouse", "Collection", "Color", "Size (Inch)",
+})
+
+# a text column stays text when more than this share of its values are distinct
+MAX_CATEGORY_SHARE = 0.5
+
+INT32 = np.iinfo(np.int32)
+
+MIB = 1024 * 1024
+
+def _narrow_integers(values: pd.Series) -> pd.Series:
+    # never below int32, the sums of smaller integers overflow
+    if values.dtype != np.int64 or values.empty or values.min() < INT32.min or values.max() > INT32.max:
+        return values
+    return values.astype(np.int32)
+
+
+def _narrow_floats(values: pd.Series) -> pd.Series:
+    if values.dtype != np.float64:
+        return values
+    narrow = values.to_numpy(np.float32)
+    if not np.array_equal(narrow.astype(np.float64), values.to_numpy(), equal_nan=True):
+        return values
+    return pd.Series(narrow, index=values.index, name=values.name)
+
+
+def _categorize(values: pd.Series, max_share: float) -> pd.Series:
+    if not (values.dtype == object or isinstance(values.dtype, pd.StringDtype)):
+        return values
+    if values.nunique() > max_share * len(values):
+        return values
+    return values.astype("category")
+
+
+def optimize_dtypes(
+        data: pd.DataFrame,
+        categorical_columns: Iterable[str] = CATEGORICAL_COLUMNS,
+        max_category_share: float = MAX_CATEGORY_SHARE,
+) -> pd.DataFrame:
+    """Narrow the dtypes of a frame without changing any value
+
+    Args:
+        data: the loaded frame, its columns are replaced in place
+        categorical_columns: text columns turned into categoricals
+        max_category_share: text columns with more distinct values than this share of
+            their rows are kept as text
+
+    Returns:
+        pd.DataFrame: data, int64 columns that fit as int32, float64 columns that are exact
+        as float32 and the repeated categorical_columns as categoricals
+    """
+    categorical_columns = set(categorical_columns)
+    for column in list(data.columns):
+        values = data[column]
+        if not isinstance(values, pd.Series):
+            # repeated column names, left as they are
+            continue
+        if column in categorical_columns:
+            narrow = _categorize(values, max_category_share)
+        elif pd.api.types.is_integer_dtype(values.dtype):
+            narrow = _narrow_integers(values)
+        elif pd.api.types.is_float_dtype(values.dtype):
+            narrow = _narrow_floats(values)
+        else:
+            continue
+        if narrow is not values:
+            data[column] = narrow
+    return data
+
+
+def is_file_backed(dataset: AbstractDataset) -> bool:
+    """Whether a dataset loads from a file, unlike the frames the runners keep in memory"""
+    # kedro's file datasets, and the project's, keep their path in _filepath
+    return isinstance(dataset, AbstractVersionedDataset) or hasattr(dataset, "_filepath")
+
+
+def memory_usage(data: pd.DataFrame) -> int:
+    """Bytes held by a frame, the Python strings of its object columns included"""
+    return int(data.memory_usage(index=True, deep=True).sum())
+
+
+class OptimizingDataCatalog(DataCatalog):
+    """DataCatalog narrowing the dtypes of the frames loaded from files, and keeping the
+    intermediate results of the runners as copy-on-write views
+
+    Attributes:
+        categorical_columns: text columns turned into categoricals, see CATEGORICAL_COLUMNS
+        max_category_share: see optimize_dtypes
+    """
+
+    categorical_columns = CATEGORICAL_COLUMNS
+    max_category_share = MAX_CATEGORY_SHARE
+
+    def load(self, name: str, version: str = None) -> Any:
+        data = super().load(name, version)
+        if not isinstance(data, pd.DataFrame) or not is_file_backed(self._get_dataset(name)):
+            return data
+        before = memory_usage(data)
+        data = optimize_dtypes(data, self.categorical_columns, self.max_category_share)
+        after = memory_usage(data)
+        logger.info(
+            "Loaded '%s': %.2f MiB, %.2f MiB once its dtypes are narrowed (%.0f%%)",
+            name, before / MIB, after / MIB, 100 * after / before if before else 100,
+        )
+        return data
+
+    def add(self, data_set_name: str, data_set: AbstractDataset, replace: bool = False) -> None:
+        # the empty MemoryDataset a runner adds for an intermediate result deep copies it
+        # on every save and load, ParallelRunner's shared datasets are left alone
+        if type(data_set) is MemoryDataset and not data_set.exists():
+            data_set = CopyOnWriteMemoryDataset()
+        super().add(data_set_name, data_set, replace)
+
+    def shallow_copy(self) -> "OptimizingDataCatalog":
+        # the runners load through a shallow copy, DataCatalog's would drop this class
+        return self.__class__(
+            data_sets=self._data_sets,
+            layers=self.layers,
+            dataset_patterns=self._dataset_patterns,
+            load_versions=self._load_versions,
+            save_version=self._save_version,
+        )
@@ -0,0 +1,48 @@
+"""Command line of the project: ``kedro run`` with the worker count of its runner.
+
+``kedro run`` builds its runner without arguments. This ``run`` takes every option of
+kedro's and ``--max-workers``, and runs ParallelRunner and ThreadRunner as the project's
+runners (see ``runner.py``), sized by that option. A run profile picks both::
+
+    kedro run --config conf/base/run.yml
+    kedro run --config conf/base/run.yml --runner ParallelRunner --max-workers 2
+"""
+import os
+
+import click
+from kedro.framework.cli.project import run as kedro_run
+
+from .runner import MAX_WORKERS_ENV
+
+# runners named without their module are the project's, sized by --max-workers
+PROJECT_RUNNERS = {
+    "ParallelRunner": "bearaby_ops.runner.ParallelRunner",
+    "ThreadRunner": "bearaby_ops.runner.ThreadRunner",
+}
+
+
+@click.group(name="Bearaby_Ops")
+def cli():
+    """Command line tools for manipulating a Kedro project."""
+
+
+def _run(max_workers, runner, **kwargs):
+    if max_workers:
+        os.environ[MAX_WORKERS_ENV] = str(max_workers)
+    kedro_run.callback(runner=PROJECT_RUNNERS.get(runner, runner), **kwargs)
+
+
+run = click.Command(
+    name="run",
+    callback=_run,
+    params=[
+        *kedro_run.params,
+        click.Option(
+            ["--max-workers", "max_workers"], type=click.IntRange(min=1), default=None,
+            help="Processes of ParallelRunner or threads of ThreadRunner, by default "
+                 "as many as the pipeline can use.",
+        ),
+    ],
+    help=kedro_run.help,
+)
+cli.add_command(run)
@@ -1,24 +1,101 @@
 import csv
+import io
 import xml.etree.ElementTree as ET
 from urllib.parse import quote_plus
 
 import requests
 
+from .HTTPTransport import get_default_transport
+from .TokenCache import get_default_token_cache
+from .Tracer import get_default_tracer
+
+NAMESPACE = 'http://rex11.com/webmethods/'
+ITEM_TAG = f'{{{NAMESPACE}}}item'
+
+# WAREHOUSENAME	STYLE	COLOR	SIZE	DESCRIPTION	UPCCODE	ACTUALQTY	PENDINGPICKING	AVAILABLE	SKU	ACCOUNTNAME	SEASON
+CSV_HEADER = [
+    'WAREHOUSENAME', 'STYLE', 'COLOR', 'SIZE', 'DESCRIPTION', 'UPCCODE', 'ACTUALQTY', 'PENDINGPICKING', 'AVAILABLE', 'SKU'
+]
+
+
+def _iter_inventory_rows(source):
+    """Parse the inventory items of a GetInventory response incrementally.
+
+    Items are removed from the tree once they are read, so memory stays flat whatever
+    the size of the response.
+    """
+    stack = []
+    for event, element in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+        stack.pop()
+        if element.tag != ITEM_TAG:
+            continue
+
+        fields = {child.tag[len(NAMESPACE) + 2:]: child.text for child in element}
+        element.clear()
+        if stack:
+            stack[-1].remove(element)
+
+        if fields.get('ActualQuantity') == '0' and fields.get('PendingQuantity') == '0':
+            continue
+
+        # a missing quantity is written as 0, the catalog reads these columns as integers
+        actual_quantity = int(fields.get('ActualQuantity') or 0)
+        pending_quantity = int(fields.get('PendingQuantity') or 0)
+        yield [
+            fields.get('Warehouse'), fields.get('Style'), fields.get('Color'), fields.get('Size'),
+            fields.get('Description'), fields.get('Upc'), actual_quantity, pending_quantity,
+            actual_quantity - pending_quantity, fields.get('Sku'),
+        ]
+
+
+def _write_inventory_rows(source, csv_filename):
+    """Write the inventory items read from a file-like source to a CSV file."""
+    rows = 0
+    with open(csv_filename, mode='w', newline='') as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(CSV_HEADER)
+        for row in _iter_inventory_rows(source):
+            csv_writer.writerow(row)
+            rows += 1
+    return rows
+
 
 class BergenAPI:
     """Class to interact with the Rex API and fetch inventory data."""
     
-    def __init__(self, web_address, username, password):
-        """Initialize the BergenAPI instance with credentials and base URL."""
-        self.base_url = "https://sync.rex11.com/ws/v3prod/publicapiws.asmx"
+    def __init__(self, web_address, username, password, timeout=60,
+                 base_url="https://sync.rex11.com/ws/v3prod/publicapiws.asmx", transport=None,
+                 token_cache=None, token_ttl=3600):
+        """Initialize the BergenAPI instance with credentials and base URL.
+
+        Requests go through the transport shared by all API clients unless another
+        transport is given. The authentication token is kept in the token cache for
+        token_ttl seconds, as the API does not tell when it expires.
+        """
+        self.base_url = base_url
         self.headers = {'Host': 'sync.rex11.com'}
         self.web_address = web_address
         self.username = username
         self.password = password
         self.authentication_token = None
+        self.timeout = timeout
+        self.transport = transport or get_default_transport()
+        self.token_cache = token_cache or get_default_token_cache()
+        self.token_ttl = token_ttl
+        self._token_key = self.token_cache.key("bergen", base_url, web_address, username)
+
+    def get_authentication_token(self, refresh=False):
+        """Get authentication token from the cache, or from the API when missing or refresh is set."""
+        if refresh:
+            self.token_cache.invalidate(self._token_key)
+        else:
+            self.authentication_token = self.token_cache.get(self._token_key)
+            if self.authentication_token:
+                return self.authentication_token
 
-    def get_authentication_token(self):
-        """Get authentication token from the API."""
         url = f"{self.base_url}/AuthenticationTokenGet"
         params = {
             "WebAddress": quote_plus(self.web_address),
@@ -27,77 +104,96 @@ class BergenAPI:
         }
         
         try:
-            response = requests.get(url, params=params)
+            response = self.transport.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
             root = ET.fromstring(response.text)
             self.authentication_token = root.text
             if not self.authentication_token:
                 print("Authentication failed. Please check your credentials.")
                 return None
+            self.token_cache.set(self._token_key, self.authentication_token, self.token_ttl)
             return self.authentication_token
         except requests.exceptions.RequestException as e:
             print("An error occurred during authentication:", e)
             return None
 
+    def _get_inventory_response(self, conditional_headers=None, **kwargs):
+        """Request GetInventory, authenticating again once if the cached token is rejected."""
+        url = f"{self.base_url}/GetInventory"
+        headers = {**self.headers, **(conditional_headers or {})}
+        response = self.transport.get(
+            url, params={"AuthenticationString": self.authentication_token}, headers=headers,
+            timeout=self.timeout, **kwargs
+        )
+        if response.status_code != 401 or not self.get_authentication_token(refresh=True):
+            return response
+        response.close()
+        return self.transport.get(
+            url, params={"AuthenticationString": self.authentication_token}, headers=headers,
+            timeout=self.timeout, **kwargs
+        )
+
     def get_inventory(self):
         """Fetch inventory data from the API."""
         if not self.authentication_token:
             print("Authentication token is missing. Please authenticate first.")
             return None
         
-        url = f"{self.base_url}/GetInventory"
-        params = {
-            "AuthenticationString": self.authentication_token
-        }
-        
         try:
-            response = requests.get(url, params=params, headers=self.headers)
+            response = self._get_inventory_response()
             response.raise_for_status()
             return response.content
         except requests.exceptions.RequestException as e:
             print("An error occurred while fetching inventory:", e)
             return None
         
+    def stream_inventory_to_csv(self, csv_filename, validators=None):
+        """Stream inventory data from the API straight into a CSV file.
+
+        The response is parsed while it downloads and rows are written as they are
+        read, so the full response is never held in memory.
+
+        When validators is given its etag and last_modified are sent as a conditional
+        request and updated from the response. On 304 Not Modified nothing is written,
+        validators["not_modified"] is set and 0 is returned.
+
+        Returns the number of rows written, or None when the download failed.
+        """
+        if not self.authentication_token:
+            print("Authentication token is missing. Please authenticate first.")
+            return None
+
+        headers = {}
+        if validators is not None:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            with self._get_inventory_response(stream=True, conditional_headers=headers) as response:
+                if response.status_code == 304 and validators is not None:
+                    validators["not_modified"] = True
+                    return 0
+                response.raise_for_status()
+                if validators is not None:
+                    validators["etag"] = response.headers.get("ETag")
+                    validators["last_modified"] = response.headers.get("Last-Modified")
+                # let urllib3 undo the gzip/deflate transfer encoding while streaming
+                response.raw.decode_content = True
+                # the request span ends with the headers, the download is its own span
+                with get_default_tracer().span("GET Bergen inventory stream") as span:
+                    rows = _write_inventory_rows(response.raw, csv_filename)
+                    span.set(rows=rows, **{"http.response_bytes": response.raw.tell()})
+        except requests.exceptions.RequestException as e:
+            print("An error occurred while fetching inventory:", e)
+            return None
+
+        print(f'CSV data has been written to {csv_filename}')
+        return rows
+
     def write_inventory_to_csv(self, response_content, csv_filename):
         """Write inventory data to a CSV file."""
-        root = ET.fromstring(response_content)
-
-        # Define the namespace
-        namespace = {'ns': 'http://rex11.com/webmethods/'}
-
-        # Find all item elements within the namespace
-        items = root.findall('.//ns:item', namespace)
-
-        # Open a CSV file for writing
-        with open(csv_filename, mode='w', newline='') as csv_file:
-            csv_writer = csv.writer(csv_file)
-
-            # WAREHOUSENAME	STYLE	COLOR	SIZE	DESCRIPTION	UPCCODE	ACTUALQTY	PENDINGPICKING	AVAILABLE	SKU	ACCOUNTNAME	SEASON
-            # Write CSV header
-            csv_writer.writerow([
-                'WAREHOUSENAME', 'STYLE', 'COLOR', 'SIZE', 'DESCRIPTION', 'UPCCODE', 'ACTUALQTY', 'PENDINGPICKING', 'AVAILABLE', 'SKU' 
-            ])
-            
-            # Iterate through item elements and write data to CSV
-            for item in items:
-                warehouse = item.find('ns:Warehouse', namespace).text
-                style = item.find('ns:Style', namespace).text
-                color = item.find('ns:Color', namespace).text
-                size = item.find('ns:Size', namespace).text
-                description = item.find('ns:Description', namespace).text
-                
-                sku = item.find('ns:Sku', namespace).text
-                upc = item.find('ns:Upc', namespace).text
-                actual_quantity = item.find('ns:ActualQuantity', namespace).text
-                pending_quantity = item.find('ns:PendingQuantity', namespace).text
-                available = int(actual_quantity) - int(pending_quantity)
-
-                if actual_quantity == '0' and pending_quantity == '0':
-                    continue
-
-                csv_writer.writerow([
-                    warehouse, style, color, size, description, upc, actual_quantity, pending_quantity, available, sku 
-                ])
-              
+        _write_inventory_rows(io.BytesIO(response_content), csv_filename)
 
         print(f'CSV data has been written to {csv_filename}')
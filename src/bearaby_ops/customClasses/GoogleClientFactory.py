@@ -0,0 +1,174 @@
+import os
+import threading
+
+import gspread
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+from oauth2client.service_account import ServiceAccountCredentials
+
+from .Tracer import TracedHttp
+
+# If modifying these scopes, delete the token files.
+DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive']
+SHEETS_SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+GSPREAD_SCOPES = [
+    'https://www.googleapis.com/auth/drive',
+    'https://www.googleapis.com/auth/drive.file'
+]
+
+
+class GoogleClientFactory:
+    """
+    Builds the Google API clients of the process once, on first use.
+
+    Credentials and services are cached by token file and scopes, so the post-run hooks
+    share one Drive and one Sheets service however many files and sheets they write.
+    Services are built from the discovery documents bundled with google-api-python-client,
+    which saves fetching them from Google on every build.
+
+    Attributes
+    ----------
+    credentials_file : str
+        The OAuth client secrets used when a token file is missing or cannot be refreshed.
+    service_account_file : str
+        The service account key used by gspread.
+
+    Methods
+    -------
+    credentials(token_file, scopes, credentials_file=None)
+        Returns the user credentials stored in token_file, refreshed when expired.
+    service(name, version, token_file, scopes, credentials_file=None)
+        Returns the cached API service.
+    drive(token_file, credentials_file=None)
+        Returns the Drive v3 service.
+    sheets(token_file, credentials_file=None)
+        Returns the Sheets v4 service.
+    gspread_client()
+        Returns the gspread client of the service account.
+    """
+
+    def __init__(self, credentials_file=None, service_account_file=None):
+        """
+        Parameters
+        ----------
+        credentials_file : str, optional
+            The OAuth client secrets, by default src/bearaby_ops/credentials.json
+        service_account_file : str, optional
+            The service account key, by default src/bearaby_ops/service_account.json
+        """
+        self.credentials_file = credentials_file or r'src/bearaby_ops/credentials.json'
+        self.service_account_file = service_account_file or r'src/bearaby_ops/service_account.json'
+        self._credentials = {}
+        self._services = {}
+        self._gspread_client = None
+        self._lock = threading.RLock()
+
+    def credentials(self, token_file, scopes, credentials_file=None):
+        """
+        Returns the user credentials stored in token_file, refreshed when expired.
+
+        Without a usable token the OAuth consent flow runs and its token is saved to
+        token_file for the next runs.
+
+        Parameters
+        ----------
+        token_file : str
+            The file holding the access and refresh tokens.
+        scopes : list of str
+            The scopes the credentials are requested for.
+        credentials_file : str, optional
+            The OAuth client secrets, by default self.credentials_file
+
+        Returns
+        -------
+        google.oauth2.credentials.Credentials
+            The credentials.
+        """
+        key = (token_file, tuple(scopes))
+        with self._lock:
+            creds = self._credentials.get(key)
+            if creds is not None and creds.valid:
+                return creds
+            if creds is None and os.path.exists(token_file):
+                creds = Credentials.from_authorized_user_file(token_file, scopes)
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    creds.refresh(Request())
+                else:
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        credentials_file or self.credentials_file, scopes
+                    )
+                    creds = flow.run_local_server(port=0)
+                # Save the credentials for the next run
+                with open(token_file, 'w') as token:
+                    token.write(creds.to_json())
+            self._credentials[key] = creds
+            return creds
+
+    def service(self, name, version, token_file, scopes, credentials_file=None):
+        """
+        Returns the cached API service.
+
+        Parameters
+        ----------
+        name : str
+            The API name, e.g. 'drive'.
+        version : str
+            The API version, e.g. 'v3'.
+        token_file : str
+            The file holding the user tokens.
+        scopes : list of str
+            The scopes of the credentials.
+        credentials_file : str, optional
+            The OAuth client secrets, by default self.credentials_file
+
+        Returns
+        -------
+        googleapiclient.discovery.Resource
+            The service.
+        """
+        key = (name, version, token_file, tuple(scopes))
+        with self._lock:
+            if key not in self._services:
+                credentials = self.credentials(token_file, scopes, credentials_file)
+                self._services[key] = build(
+                    name, version,
+                    # every request of the service is recorded as a span
+                    http=TracedHttp(AuthorizedHttp(credentials, http=build_http())),
+                    static_discovery=True,
+                    cache_discovery=False,
+                )
+            return self._services[key]
+
+    def drive(self, token_file='token.json', credentials_file=None):
+        """Returns the Drive v3 service."""
+        return self.service('drive', 'v3', token_file, DRIVE_SCOPES, credentials_file)
+
+    def sheets(self, token_file='token_.json', credentials_file=None):
+        """Returns the Sheets v4 service."""
+        return self.service('sheets', 'v4', token_file, SHEETS_SCOPES, credentials_file)
+
+    def gspread_client(self):
+        """Returns the gspread client of the service account."""
+        with self._lock:
+            if self._gspread_client is None:
+                creds = ServiceAccountCredentials.from_json_keyfile_name(self.service_account_file, GSPREAD_SCOPES)
+                self._gspread_client = gspread.authorize(creds)
+            return self._gspread_client
+
+
+_default_client_factory = None
+_default_client_factory_lock = threading.Lock()
+
+
+def get_default_client_factory():
+    """Returns the Google client factory shared by the whole process."""
+    global _default_client_factory
+    with _default_client_factory_lock:
+        if _default_client_factory is None:
+            _default_client_factory = GoogleClientFactory()
+        return _default_client_factory
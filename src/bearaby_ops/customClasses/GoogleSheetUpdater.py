@@ -1,52 +1,290 @@
-import os
+import json
+import math
 
-import gspread
 import pandas as pd
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from oauth2client.service_account import ServiceAccountCredentials
+
+from .GoogleClientFactory import SHEETS_SCOPES, get_default_client_factory
+
+
+# Google recommends request payloads of at most 2 MB
+MAX_PAYLOAD_BYTES = 2_000_000
+
+
+def _cell_value(value):
+    """Returns a value as the Sheets API stores it, missing values are empty cells."""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT:
+        return ''
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def frame_to_values(df):
+    """
+    Converts a frame to the rows of a sheet, header first.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The table to write.
+
+    Returns
+    -------
+    list of list
+        The header and the rows of the table.
+    """
+    rows = df.astype(object).values.tolist()
+    return [[_cell_value(v) for v in df.columns]] + [[_cell_value(v) for v in row] for row in rows]
+
+
+def _row_key(row):
+    row = list(row)
+    while row and row[-1] == '':
+        row.pop()
+    return tuple(row)
+
+
+def removed_leading_rows(current, new):
+    """
+    Returns how many rows below the header were dropped from the top of the sheet.
+
+    A rolling time series loses its oldest day at the top and gains a new one at the
+    bottom, so every row moves up. Deleting those rows first keeps the others in place
+    and only the new day is left to write.
+
+    Parameters
+    ----------
+    current : list of list
+        The values currently in the sheet, header first.
+    new : list of list
+        The values the sheet should hold, header first.
+
+    Returns
+    -------
+    int
+        The number of rows to delete under the header, 0 when the rows did not move.
+    """
+    if len(current) < 2 or len(new) < 2 or _row_key(current[0]) != _row_key(new[0]):
+        return 0
+    current_keys = [_row_key(row) for row in current[1:]]
+    new_keys = [_row_key(row) for row in new[1:]]
+    for shift, key in enumerate(current_keys):
+        if key != new_keys[0]:
+            continue
+        overlap = min(len(current_keys) - shift, len(new_keys))
+        if current_keys[shift:shift + overlap] == new_keys[:overlap]:
+            return shift
+    return 0
+
+
+def diff_value_ranges(sheet_name, current, new):
+    """
+    Returns the ranges of rows that differ between the sheet and the new values.
+
+    Contiguous changed rows are sent as one range. Rows and columns the new values no
+    longer cover are overwritten with empty cells.
+
+    Parameters
+    ----------
+    sheet_name : str
+        The sheet the values are written to.
+    current : list of list
+        The values currently in the sheet.
+    new : list of list
+        The values the sheet should hold.
+
+    Returns
+    -------
+    list of dict
+        ValueRange objects of the spreadsheets.values.batchUpdate body.
+    """
+    width = max([len(row) for row in current + new] or [0])
+    value_ranges = []
+    block, block_start = [], None
+    for index in range(max(len(current), len(new))):
+        current_row = current[index] if index < len(current) else []
+        new_row = new[index] if index < len(new) else []
+        if _row_key(current_row) == _row_key(new_row):
+            if block:
+                value_ranges.append({'range': f"'{sheet_name}'!A{block_start + 1}", 'values': block})
+                block, block_start = [], None
+            continue
+        if block_start is None:
+            block_start = index
+        # pad to the widest row so cells left over from the old values are cleared
+        block.append(new_row + [''] * (width - len(new_row)))
+    if block:
+        value_ranges.append({'range': f"'{sheet_name}'!A{block_start + 1}", 'values': block})
+    return value_ranges
+
+
+def chunk_value_ranges(value_ranges, max_payload_bytes=MAX_PAYLOAD_BYTES):
+    """
+    Splits value ranges into batches whose JSON payload stays under max_payload_bytes.
+
+    A range larger than the limit on its own is split by rows.
+
+    Parameters
+    ----------
+    value_ranges : list of dict
+        ValueRange objects from diff_value_ranges.
+    max_payload_bytes : int, optional
+        The size limit of one batchUpdate body, by default MAX_PAYLOAD_BYTES
+
+    Returns
+    -------
+    list of list of dict
+        The value ranges of every batchUpdate request.
+    """
+    batches, batch, batch_bytes = [], [], 0
+    for value_range in value_ranges:
+        sheet_name, start = value_range['range'].rsplit('!A', 1)
+        piece, piece_start = [], int(start)
+        for offset, row in enumerate(value_range['values']):
+            row_bytes = len(json.dumps(row)) + 1
+            if (batch or piece) and batch_bytes + row_bytes > max_payload_bytes:
+                if piece:
+                    batch.append({'range': f'{sheet_name}!A{piece_start}', 'values': piece})
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+                piece, piece_start = [], int(start) + offset
+            piece.append(row)
+            batch_bytes += row_bytes
+        if piece:
+            batch.append({'range': f'{sheet_name}!A{piece_start}', 'values': piece})
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _delete_rows(service_sheets, spreadsheet_id, sheet_name, start, end):
+    spreadsheet = service_sheets.spreadsheets().get(
+        spreadsheetId=spreadsheet_id, fields='sheets.properties(sheetId,title)'
+    ).execute()
+    sheet_id = next(
+        sheet['properties']['sheetId'] for sheet in spreadsheet['sheets']
+        if sheet['properties']['title'] == sheet_name
+    )
+    service_sheets.spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body={'requests': [{'deleteDimension': {
+            'range': {'sheetId': sheet_id, 'dimension': 'ROWS', 'startIndex': start, 'endIndex': end},
+        }}]},
+    ).execute()
+
+
+def write_values_diff(service_sheets, spreadsheet_id, sheet_name, values, max_payload_bytes=MAX_PAYLOAD_BYTES):
+    """
+    Writes only the rows of a sheet that changed, with as few batchUpdate calls as the
+    payload limit allows. Rows dropped from the top are deleted instead of rewritten.
+
+    Parameters
+    ----------
+    service_sheets : googleapiclient.discovery.Resource
+        The Sheets API service.
+    spreadsheet_id : str
+        The spreadsheet holding the sheet.
+    sheet_name : str
+        The sheet to write.
+    values : list of list
+        The values the sheet should hold, header first.
+    max_payload_bytes : int, optional
+        The size limit of one batchUpdate body, by default MAX_PAYLOAD_BYTES
+
+    Returns
+    -------
+    dict
+        Number of deleted rows, changed rows, updated cells and values batchUpdate
+        requests sent.
+    """
+    response = service_sheets.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=f"'{sheet_name}'",
+        valueRenderOption='UNFORMATTED_VALUE',
+    ).execute()
+    current = response.get('values', [])
+
+    deleted = removed_leading_rows(current, values)
+    if deleted:
+        _delete_rows(service_sheets, spreadsheet_id, sheet_name, 1, 1 + deleted)
+        current = current[:1] + current[1 + deleted:]
+
+    value_ranges = diff_value_ranges(sheet_name, current, values)
+    summary = {
+        'deleted_rows': deleted,
+        'rows': sum(len(r['values']) for r in value_ranges),
+        'cells': 0,
+        'requests': 0,
+    }
+    for batch in chunk_value_ranges(value_ranges, max_payload_bytes):
+        response = service_sheets.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'valueInputOption': 'RAW', 'data': batch},
+        ).execute()
+        summary['cells'] += response.get('totalUpdatedCells', 0)
+        summary['requests'] += 1
+    return summary
 
 
 class GoogleSheetUpdater:
-    def __init__(self, file_to_edit, token_file, credentials_file):
+    def __init__(self, file_to_edit, token_file, credentials_file, client_factory=None):
         self.file_to_edit = file_to_edit
-        self.SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+        self.SCOPES = SHEETS_SCOPES
         self.filePath, self.filename, self.folderLocation = file_to_edit
+        self.token_file = token_file
+        self.credentials_file = credentials_file
+        # clients are built on first use and shared with the other updaters of the process
+        self.client_factory = client_factory or get_default_client_factory()
+        self._python_sheet = None
 
-        # Authorize the API
-        scope = [
-            'https://www.googleapis.com/auth/drive',
-            'https://www.googleapis.com/auth/drive.file'
-        ]
-        file_name = r'src/bearaby_ops/service_account.json'
-        self.creds = ServiceAccountCredentials.from_json_keyfile_name(file_name, scope)
-        self.client = gspread.authorize(self.creds)
-
-        # Fetch the sheet
-        self.sheet = self.client.open('new').sheet1
-        self.python_sheet = self.sheet.get_all_records()
-
-        if os.path.exists(token_file):
-            self.creds = Credentials.from_authorized_user_file(token_file, self.SCOPES)
-         
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(credentials_file, self.SCOPES)
-            self.creds = flow.run_local_server(port=0)
-            
-            with open(token_file, 'w') as token:
-                token.write(self.creds.to_json())
+    @property
+    def service_sheets(self):
+        return self.client_factory.sheets(self.token_file, self.credentials_file)
+
+    @property
+    def client(self):
+        return self.client_factory.gspread_client()
 
-        # Build the service for Google Sheets API
-        self.service_sheets = build('sheets', 'v4', credentials=self.creds)
+    @property
+    def sheet(self):
+        return self.client.open('new').sheet1
 
-    def update_sheet(self, sheet_name, update_range):
+    @property
+    def python_sheet(self):
+        # the records of the 'new' sheet are only downloaded when asked for
+        if self._python_sheet is None:
+            self._python_sheet = self.sheet.get_all_records()
+        return self._python_sheet
+
+    def update_sheet(self, sheet_name, update_range, diff=False):
+        """
+        Writes the Excel file of file_to_edit to a sheet.
+
+        Parameters
+        ----------
+        sheet_name : str
+            The sheet to write.
+        update_range : str
+            The top left cell of the written values.
+        diff : bool, optional
+            Fetch the sheet and only send the rows that changed, by default False
+        """
         try:
             spreadsheet_id = self.folderLocation
 
             df = pd.read_excel(self.filePath)
 
+            if diff:
+                summary = write_values_diff(self.service_sheets, spreadsheet_id, sheet_name, frame_to_values(df))
+                print(
+                    f"Rows deleted: {summary['deleted_rows']}, rows changed: {summary['rows']}, "
+                    f"cells updated: {summary['cells']}, requests: {summary['requests']}"
+                )
+                return
+
             # data is the header + the values from df
             data = [df.columns.values.tolist()] + df.values.tolist()
             value_input_option = 'RAW'
@@ -64,26 +302,40 @@ class GoogleSheetUpdater:
         except HttpError as error:
             print(f'An error occurred: {error}')
             
-    def download_sheet(self, sheet_name, sheet_id, file_name):
+    def read_sheet(self, sheet_name, sheet_id):
+        """
+        Reads a sheet whose first row holds the column names.
+
+        Parameters
+        ----------
+        sheet_name : str
+            The sheet to read.
+        sheet_id : str
+            The spreadsheet holding the sheet.
+
+        Returns
+        -------
+        pd.DataFrame or None
+            The rows of the sheet, None when the request failed.
+        """
         try:
-            spreadsheet_id = sheet_id
             request = self.service_sheets.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
+                spreadsheetId=sheet_id,
                 range=f'{sheet_name}'
             )
 
             response = request.execute()
-            print('Downloaded Time Series Data')
-            # the top row is the columns names and the rest is the data
-            df = pd.DataFrame(response.get('values'), index=None)
-            
-            # set the first row as the columns names
-            df.columns = df.iloc[0]
-            # drop the first row
-            df = df.iloc[1:]
-            
-            df.to_csv(file_name, index=False)
-             
         except HttpError as error:
             print(f'An error occurred: {error}')
-         
+            return None
+        values = response.get('values', [])
+        if not values:
+            return pd.DataFrame()
+        # the top row is the columns names and the rest is the data
+        return pd.DataFrame(values[1:], columns=values[0])
+
+    def download_sheet(self, sheet_name, sheet_id, file_name):
+        df = self.read_sheet(sheet_name, sheet_id)
+        if df is not None:
+            print('Downloaded Time Series Data')
+            df.to_csv(file_name, index=False)
@@ -0,0 +1,156 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .Tracer import endpoint_name, get_default_tracer
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _response_bytes(response, stream):
+    # a streamed body is not read here, only its announced length is known
+    if stream:
+        length = response.headers.get("Content-Length")
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+def _retries(response):
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    history = getattr(retries, "history", None)
+    return len(history) if history is not None else 0
+
+
+class HTTPTransport:
+    """
+    Pooled HTTP session shared by the warehouse API clients.
+
+    Connections are kept alive between requests, so paginated downloads only pay the
+    TCP and TLS handshake once per connection in the pool. Idempotent requests are
+    retried with exponential backoff on rate limits and server errors. POST requests are
+    never retried, a failed page of the paginated ThinkLogistics POST download is not
+    retried either and ends that download. Every request is recorded as a span of the
+    default Tracer.
+
+    Attributes
+    ----------
+    timeout : float
+        Seconds to wait for a response when the caller does not pass a timeout.
+    session : requests.Session
+        The pooled session all requests go through.
+
+    Methods
+    -------
+    request(method, url, **kwargs)
+        Sends a request through the pooled session.
+    get(url, **kwargs)
+        Sends a GET request.
+    post(url, **kwargs)
+        Sends a POST request.
+    set_pool_size(url_prefix, pool_maxsize)
+        Sizes the connection pool of one host.
+    """
+
+    def __init__(self, timeout=60, retries=5, backoff_factor=0.5, pool_connections=4, pool_maxsize=8,
+                 session=None):
+        """
+        Parameters
+        ----------
+        timeout : float, optional
+            Default seconds to wait for a response, by default 60
+        retries : int, optional
+            Retries of GET and HEAD requests on 429 and 5xx responses, by default 5
+        backoff_factor : float, optional
+            Backoff between retries in seconds, doubled on every retry, by default 0.5
+        pool_connections : int, optional
+            Number of hosts to keep a connection pool for, by default 4
+        pool_maxsize : int, optional
+            Connections kept alive per host, by default 8, see set_pool_size for one host
+        session : requests.Session, optional
+            Session to send the requests with, by default a new one
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_connections = pool_connections
+        self.session = session or requests.Session()
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self.session.mount("https://", self._adapter(pool_maxsize))
+        self.session.mount("http://", self._adapter(pool_maxsize))
+
+    def _adapter(self, pool_maxsize):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            # hand the last response back so clients keep their own status handling
+            raise_on_status=False,
+        )
+        return HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    def set_pool_size(self, url_prefix, pool_maxsize):
+        """
+        Sizes the connection pool of the URLs starting with url_prefix.
+
+        Parameters
+        ----------
+        url_prefix : str
+            Scheme and host of the API, e.g. https://secure-wms.com
+        pool_maxsize : int
+            Connections kept alive for that host.
+        """
+        self.session.mount(url_prefix, self._adapter(pool_maxsize))
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request through the pooled session.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method.
+        url : str
+            The URL to request.
+        **kwargs
+            Passed on to requests.Session.request, timeout defaults to self.timeout.
+
+        Returns
+        -------
+        requests.Response
+            The response of the request.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        with get_default_tracer().span(endpoint_name(method, url), **{"http.method": method}) as span:
+            response = self.session.request(method, url, **kwargs)
+            span.set(**{
+                "http.status_code": response.status_code,
+                "http.response_bytes": _response_bytes(response, kwargs.get("stream", False)),
+                "http.retries": _retries(response),
+            })
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    """Returns the transport shared by every API client of the process."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport()
+        return _default_transport
@@ -7,10 +7,15 @@ import json
 import requests
 import xml.etree.ElementTree as ET
 from urllib.parse import quote_plus
+
+from .HTTPTransport import get_default_transport
+from .TokenCache import get_default_token_cache
+from .Tracer import attributes
  
 class ThinkLogisticsAPI:
-    def __init__(self, login, password):
-        self.base_url = "https://api.thinklogistics.com/"
+    def __init__(self, login, password, timeout=60, base_url="https://api.thinklogistics.com/", transport=None,
+                 token_cache=None, token_ttl=3600):
+        self.base_url = base_url
         self.auth_url = "api/v1/auth/signin"
         self.login = login
         self.password = password
@@ -20,9 +25,23 @@ class ThinkLogisticsAPI:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         }
         self.token = None
+        self.timeout = timeout
+        # pooled session shared with the other API clients, keeps connections alive across pages
+        self.transport = transport or get_default_transport()
+        # signed-in token kept between runs, token_ttl is used when the API does not send an expiry
+        self.token_cache = token_cache or get_default_token_cache()
+        self.token_ttl = token_ttl
+        self._token_key = self.token_cache.key("thinklogistics", base_url, login)
+
+    def authenticate(self, refresh=False):
+        # Authenticate with the Think Logistics API, reusing the cached token unless refresh is set
+        if refresh:
+            self.token_cache.invalidate(self._token_key)
+        else:
+            self.token = self.token_cache.get(self._token_key)
+            if self.token:
+                return True
 
-    def authenticate(self):
-        # Authenticate with the Think Logistics API
         url = self.base_url + self.auth_url
         body = {
             "Login": self.login,
@@ -31,10 +50,12 @@ class ThinkLogisticsAPI:
         }
 
         try:
-            response = requests.post(url, json=body, headers=self.headers)
+            response = self.transport.post(url, json=body, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             response_dict = json.loads(response.text)
             self.token = response_dict['Token']
+            expires_in = response_dict.get('ExpiresIn') or response_dict.get('expires_in') or self.token_ttl
+            self.token_cache.set(self._token_key, self.token, expires_in)
             return True
         except requests.exceptions.RequestException as e:
             print(f"Authentication failed: {e}")
@@ -75,10 +96,19 @@ class ThinkLogisticsAPI:
         }
 
         all_inventory = []
+        reauthenticated = False
 
         while True:
             try:
-                response = requests.post(url, headers=headers, json=params)
+                with attributes(page=params["PageIndex"]):
+                    response = self.transport.post(url, headers=headers, json=params, timeout=self.timeout)
+                if response.status_code == 401 and not reauthenticated:
+                    # the token expired mid-download, sign in again and retry the same page
+                    reauthenticated = True
+                    if not self.authenticate(refresh=True):
+                        return None
+                    headers['Authorization'] = 'Bearer ' + self.token
+                    continue
                 response.raise_for_status()
                 data = response.json()
                 inventory_items = data
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bearaby_ops", "tokens.json")
+
+
+class TokenCache:
+    """
+    On-disk cache of API access tokens, keyed by client identity.
+
+    The cache file is only readable by the current user and keys are hashes of the
+    client identity, so no credential is stored in clear. A token is treated as expired
+    refresh_margin seconds before its real expiry, so clients re-authenticate before a
+    long download can run into an expired token.
+
+    Attributes
+    ----------
+    path : str
+        The JSON file holding the tokens.
+    refresh_margin : float
+        Seconds before expiry at which a token is no longer handed out.
+
+    Methods
+    -------
+    key(*identity)
+        Builds the cache key of a client.
+    get(key)
+        Returns the cached token, or None when missing or about to expire.
+    set(key, token, expires_in)
+        Stores a token valid for expires_in seconds.
+    invalidate(key)
+        Drops a token the API rejected.
+    """
+
+    def __init__(self, path=None, refresh_margin=300):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            The JSON file holding the tokens, by default $TOKEN_CACHE_PATH or
+            ~/.cache/bearaby_ops/tokens.json
+        refresh_margin : float, optional
+            Seconds before expiry at which a token is refreshed, by default 300
+        """
+        self.path = path or os.getenv("TOKEN_CACHE_PATH", DEFAULT_PATH)
+        self.refresh_margin = refresh_margin
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*identity):
+        """
+        Builds the cache key of a client.
+
+        Parameters
+        ----------
+        *identity : str
+            API name, URL and user the token belongs to.
+
+        Returns
+        -------
+        str
+            SHA-256 of the identity.
+        """
+        return hashlib.sha256("\0".join(str(part) for part in identity).encode("utf-8")).hexdigest()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, tokens):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # mkstemp creates the file readable by the current user only
+        fd, tmp_path = tempfile.mkstemp(prefix=".tokens", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(tokens, f)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(self, key):
+        """
+        Returns the cached token, or None when missing or about to expire.
+
+        Parameters
+        ----------
+        key : str
+            The client key from TokenCache.key.
+
+        Returns
+        -------
+        str or None
+            The cached token.
+        """
+        with self._lock:
+            entry = self._read().get(key)
+        if not entry or entry["expires_at"] - self.refresh_margin <= time.time():
+            return None
+        return entry["token"]
+
+    def set(self, key, token, expires_in):
+        """
+        Stores a token valid for expires_in seconds.
+
+        Parameters
+        ----------
+        key : str
+            The client key from TokenCache.key.
+        token : str
+            The access token.
+        expires_in : float
+            Seconds the token is valid for.
+        """
+        with self._lock:
+            tokens = self._read()
+            now = time.time()
+            # drop tokens that expired since they were cached
+            tokens = {k: v for k, v in tokens.items() if v["expires_at"] > now}
+            tokens[key] = {"token": token, "expires_at": now + float(expires_in)}
+            self._write(tokens)
+
+    def invalidate(self, key):
+        """
+        Drops a token the API rejected.
+
+        Parameters
+        ----------
+        key : str
+            The client key from TokenCache.key.
+        """
+        with self._lock:
+            tokens = self._read()
+            if tokens.pop(key, None) is not None:
+                self._write(tokens)
+
+
+_default_token_cache = None
+_default_token_cache_lock = threading.Lock()
+
+
+def get_default_token_cache():
+    """Returns the token cache shared by every API client of the process."""
+    global _default_token_cache
+    with _default_token_cache_lock:
+        if _default_token_cache is None:
+            _default_token_cache = TokenCache()
+        return _default_token_cache
@@ -0,0 +1,306 @@
+import contextlib
+import contextvars
+import datetime
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+# path segments replaced by a placeholder so the calls of one endpoint are grouped
+ID_SEGMENT = re.compile(r"^(?:\d+|[A-Za-z0-9_-]{16,})$")
+# collections whose next segment is always an id, whatever its length
+ID_COLLECTIONS = {"files", "spreadsheets", "sheets"}
+RANGE_SEGMENT = re.compile(r"!|%21")
+
+PERCENTILES = (50, 95, 99)
+
+_attributes = contextvars.ContextVar("span_attributes", default={})
+
+
+def endpoint_name(method, url):
+    """
+    Names the endpoint of a request, the ids in its path replaced by placeholders.
+
+    Parameters
+    ----------
+    method : str
+        The HTTP method.
+    url : str
+        The URL requested, its query is left out.
+
+    Returns
+    -------
+    str
+        e.g. "GET secure-wms.com/inventory/stocksummaries" or
+        "PATCH www.googleapis.com/upload/drive/v3/files/{id}"
+    """
+    parsed = urlparse(url)
+    segments = parsed.path.split("/")
+    for i, segment in enumerate(segments):
+        if RANGE_SEGMENT.search(segment):
+            segments[i] = "{range}"
+        elif segment and (ID_SEGMENT.match(segment) or (i and segments[i - 1] in ID_COLLECTIONS)):
+            segments[i] = "{id}"
+    return f"{method.upper()} {parsed.netloc}{'/'.join(segments)}"
+
+
+@contextlib.contextmanager
+def attributes(**values):
+    """
+    Adds attributes to the spans started in the block, e.g. the page being downloaded.
+
+    An ``endpoint`` attribute replaces the endpoint derived from the URL, so callers can
+    keep secrets in the URL, like a webhook token, out of the trace.
+    """
+    token = _attributes.set({**_attributes.get(), **values})
+    try:
+        yield
+    finally:
+        _attributes.reset(token)
+
+
+class Span:
+    """
+    One outbound call.
+
+    Attributes
+    ----------
+    name : str
+        The endpoint called.
+    attributes : dict
+        Status, bytes, retries, page and any other detail of the call.
+    start : float
+        Epoch seconds at which the call started.
+    duration : float
+        Seconds the call took, None while it runs.
+    error : str
+        The exception raised by the call, None when it answered.
+    """
+
+    def __init__(self, name, attributes=None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.span_id = secrets.token_hex(8)
+        self.start = time.time()
+        self.duration = None
+        self.error = None
+        self._started = time.perf_counter()
+
+    def set(self, **values):
+        """Sets attributes of the span, None values are left out."""
+        self.attributes.update({key: value for key, value in values.items() if value is not None})
+
+    def end(self, error=None):
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def failed(self):
+        status = self.attributes.get("http.status_code")
+        return self.error is not None or (status is not None and status >= 400)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "start": datetime.datetime.fromtimestamp(self.start).isoformat(timespec="milliseconds"),
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Collects the spans of the outbound calls of a run and their latency percentiles.
+
+    Attributes
+    ----------
+    trace_id : str
+        Identifier shared by the spans of the run, 32 hex characters.
+
+    Methods
+    -------
+    span(name, **attributes)
+        Context manager timing one call.
+    spans()
+        Returns the finished spans.
+    summary()
+        Returns the latency percentiles per endpoint.
+    export(path, otlp=False)
+        Writes the spans and the summary to a JSON file.
+    clear()
+        Drops the spans and starts a new trace.
+    """
+
+    def __init__(self):
+        self.trace_id = secrets.token_hex(16)
+        self._spans = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        """
+        Times the block as one call.
+
+        Parameters
+        ----------
+        name : str
+            The endpoint called, replaced by the ``endpoint`` attribute of the context.
+        **attributes
+            Attributes of the span, the attributes of the context are added.
+
+        Yields
+        ------
+        Span
+            The span, for the caller to set the status and bytes of the response.
+        """
+        context = dict(_attributes.get())
+        span = Span(context.pop("endpoint", name), {**attributes, **context})
+        try:
+            yield span
+        except BaseException as error:
+            span.end(error)
+            raise
+        else:
+            span.end()
+        finally:
+            with self._lock:
+                self._spans.append(span)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans = []
+            self.trace_id = secrets.token_hex(16)
+
+    def summary(self):
+        """
+        Returns the latency percentiles per endpoint.
+
+        Returns
+        -------
+        dict
+            Per endpoint: calls, errors, bytes, total, max and p50/p95/p99 seconds,
+            the slowest endpoint in total first.
+        """
+        by_endpoint = {}
+        for span in self.spans():
+            by_endpoint.setdefault(span.name, []).append(span)
+        summary = {}
+        for name, spans in by_endpoint.items():
+            durations = np.array([span.duration for span in spans])
+            p50, p95, p99 = np.percentile(durations, PERCENTILES)
+            summary[name] = {
+                "calls": len(spans),
+                "errors": sum(span.failed for span in spans),
+                "retries": sum(span.attributes.get("http.retries", 0) for span in spans),
+                "bytes": sum(span.attributes.get("http.response_bytes", 0) for span in spans),
+                "total": float(durations.sum()),
+                "max": float(durations.max()),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+            }
+        return dict(sorted(summary.items(), key=lambda item: -item[1]["total"]))
+
+    def _otlp(self):
+        def value(v):
+            if isinstance(v, bool):
+                return {"boolValue": v}
+            if isinstance(v, int):
+                return {"intValue": str(v)}
+            if isinstance(v, float):
+                return {"doubleValue": v}
+            return {"stringValue": str(v)}
+
+        spans = []
+        for span in self.spans():
+            start = int(span.start * 1e9)
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 3,  # SPAN_KIND_CLIENT
+                "startTimeUnixNano": str(start),
+                "endTimeUnixNano": str(start + int(span.duration * 1e9)),
+                "attributes": [{"key": k, "value": value(v)} for k, v in span.attributes.items()],
+                "status": {"code": 2, "message": span.error or ""} if span.failed else {"code": 1},
+            })
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "bearaby_ops"}}]},
+            "scopeSpans": [{"scope": {"name": "bearaby_ops.tracer"}, "spans": spans}],
+        }]}
+
+    def export(self, path, otlp=False):
+        """
+        Writes the spans and the summary to a JSON file.
+
+        Parameters
+        ----------
+        path : str
+            The JSON file, replaced atomically.
+        otlp : bool, optional
+            Write the spans as OpenTelemetry OTLP/JSON, which collectors accept on
+            /v1/traces, by default a plain list of spans with the summary
+        """
+        if otlp:
+            document = self._otlp()
+        else:
+            document = {
+                "trace_id": self.trace_id,
+                "summary": self.summary(),
+                "spans": [span.to_dict() for span in self.spans()],
+            }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+
+class TracedHttp:
+    """
+    httplib2 connection recording a span for every request of the Google API clients.
+
+    Everything but ``request`` is delegated to the wrapped connection, so it can be given
+    to ``googleapiclient.discovery.build`` or ``HttpRequest.execute`` in its place.
+    """
+
+    def __init__(self, http, tracer=None):
+        self.http = http
+        self.tracer = tracer
+
+    def request(self, uri, method="GET", *args, **kwargs):
+        tracer = self.tracer or get_default_tracer()
+        with tracer.span(endpoint_name(method, uri), **{"http.method": method}) as span:
+            response, content = self.http.request(uri, method, *args, **kwargs)
+            span.set(**{"http.status_code": response.status, "http.response_bytes": len(content or b"")})
+        return response, content
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+
+_default_tracer = None
+_default_tracer_lock = threading.Lock()
+
+
+def get_default_tracer():
+    """Returns the tracer shared by every API client of the process."""
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            _default_tracer = Tracer()
+        return _default_tracer
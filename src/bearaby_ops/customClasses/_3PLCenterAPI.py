@@ -23,7 +23,15 @@ from googleapiclient.http import MediaIoBaseDownload
 from kedro.framework.hooks import hook_impl
 
 import dotenv
+import math
 import os 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from .HTTPTransport import get_default_transport
+from .TokenCache import get_default_token_cache
+from .Tracer import attributes
 
 class _3PLCenterAPI:
     """
@@ -35,20 +43,34 @@ class _3PLCenterAPI:
         The client ID for the API.
     client_secret : str
         The client secret for the API.
+    timeout : float
+        Seconds to wait for each response of the API.
+    base_url : str
+        The root URL of the API.
+    max_workers : int
+        Number of inventory pages downloaded at the same time.
+    transport : HTTPTransport
+        Pooled session reused by all requests, retries 429 and 5xx responses. Its pool
+        for base_url keeps max_workers connections.
+    token_cache : TokenCache
+        Cache keeping the access token between runs until it expires.
     token : str
         The access token for the API.
 
     Methods
     -------
-    _get_access_token()
-        Gets the access token for the API.
-    _get_inventory_data()
+    _get_access_token(refresh=False)
+        Gets the access token for the API, from the cache unless refresh is set.
+    _get(url, **kwargs)
+        Sends an authorized GET request, signing in again once on a 401.
+    _get_inventory_data(parallel=True)
         Gets the inventory data from the API.
     save_inventory_data_to_csv(filename)
         Saves the inventory data to a CSV file.
     """
 
-    def __init__(self, client_id, client_secret):
+    def __init__(self, client_id, client_secret, timeout=60, base_url="https://secure-wms.com", max_workers=4,
+                 transport=None, token_cache=None):
         """
         Parameters
         ----------
@@ -56,27 +78,58 @@ class _3PLCenterAPI:
             The client ID for the API.
         client_secret : str
             The client secret for the API.
+        timeout : float, optional
+            Seconds to wait for each response of the API, by default 60
+        base_url : str, optional
+            The root URL of the API, by default https://secure-wms.com
+        max_workers : int, optional
+            Number of inventory pages downloaded at the same time, by default 4
+        transport : HTTPTransport, optional
+            Transport sending the requests, by default the one shared by all clients
+        token_cache : TokenCache, optional
+            Cache of the access token, by default the one shared by all clients
         """
         self.client_id = client_id
         self.client_secret = client_secret
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.transport = transport or get_default_transport()
+        # one kept-alive connection per page downloaded at the same time
+        self.transport.set_pool_size(self.base_url, max_workers)
+        self.token_cache = token_cache or get_default_token_cache()
+        self._token_key = self.token_cache.key("3plcenter", self.base_url, client_id)
+        self._token_lock = threading.Lock()
         self.token = self._get_access_token()
 
-    def _get_access_token(self):
+    def _get_access_token(self, refresh=False):
         """
         Gets the access token for the API.
 
+        Parameters
+        ----------
+        refresh : bool, optional
+            Ignore the cached token and sign in again, by default False
+
         Returns
         -------
         str
             The access token for the API.
         """
-        url = 'https://secure-wms.com/AuthServer/api/Token'
+        if refresh:
+            self.token_cache.invalidate(self._token_key)
+        else:
+            token = self.token_cache.get(self._token_key)
+            if token:
+                return token
+
+        url = f'{self.base_url}/AuthServer/api/Token'
         credentials = f"{self.client_id}:{self.client_secret}"
         credentials_bytes = credentials.encode("utf-8")
         encoded_credentials = base64.b64encode(credentials_bytes)
         encoded_credentials_str = encoded_credentials.decode("utf-8")
         headers = {
-            'Host': 'secure-wms.com',
+            'Host': urlparse(self.base_url).netloc,
             'Connection': 'keep-alive',
             'Content-Type': 'application/json; charset=utf-8',
             'Accept': 'application/hal+json',
@@ -88,45 +141,96 @@ class _3PLCenterAPI:
             "grant_type": "client_credentials",
             "user_login_id": "1523"
         }
-        response = requests.post(url, headers=headers, json=data)
+        response = self.transport.post(url, headers=headers, json=data, timeout=self.timeout)
         response_data = response.json()
+        self.token_cache.set(self._token_key, response_data["access_token"], response_data.get("expires_in", 3600))
         return response_data["access_token"]
 
-    def _get_inventory_data(self):
+    def _get(self, url, **kwargs):
         """
-        Gets the inventory data from the API.
+        Sends an authorized GET request, signing in again once if the token is rejected.
+
+        Parameters
+        ----------
+        url : str
+            The URL to request.
+        **kwargs
+            Passed on to the transport.
 
         Returns
         -------
-        list
-            A list of dictionaries containing the inventory data.
+        requests.Response
+            The response of the request.
         """
-        url = "https://secure-wms.com/inventory/stocksummaries"
         headers = {
-            "Authorization": f"Bearer {self.token}",
             "Accept-Language": "en-US,en;q=0.8",
-            "Host": "secure-wms.com",
+            "Host": urlparse(self.base_url).netloc,
             "Content-Type": "application/json; charset=utf-8",
             "Accept": "application/hal+json"
         }
+        token = self.token
+        response = self.transport.get(url, headers={**headers, "Authorization": f"Bearer {token}"}, **kwargs)
+        if response.status_code != 401:
+            return response
+
+        with self._token_lock:
+            # another page may already have refreshed the token
+            if self.token == token:
+                self.token = self._get_access_token(refresh=True)
+        return self.transport.get(url, headers={**headers, "Authorization": f"Bearer {self.token}"}, **kwargs)
+
+    def _get_inventory_data(self, parallel=True):
+        """
+        Gets the inventory data from the API.
+
+        The first page tells the total number of records, the remaining pages are then
+        downloaded concurrently and put back in page order. Without a total the pages
+        are followed one by one through the next links.
+
+        Parameters
+        ----------
+        parallel : bool, optional
+            Download the pages after the first one concurrently, by default True
+
+        Returns
+        -------
+        list
+            A list of dictionaries containing the inventory data.
+        """
+        url = f"{self.base_url}/inventory/stocksummaries"
+        page_size = 500  # Number of records per page
         params = {
-            "pgsiz": 500,  # Number of records per page
+            "pgsiz": page_size,
             "pgnum": 1,    # Start with page number 1
         }
-        all_inventory_data = []
-        while True:
-            response = requests.get(url, headers=headers, params=params)
-            if response.status_code == 200:
-                data = response.json()
-                all_inventory_data.extend(data["summaries"])
-                if "next" in data["_links"]:
-                    url = "https://secure-wms.com" + data["_links"]["next"]["href"]
-                    params = None
-                else:
-                    break
-            else:
+
+        def get_page(pgnum):
+            with attributes(page=pgnum):
+                response = self._get(url, params={**params, "pgnum": pgnum}, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+        data = get_page(1)
+        all_inventory_data = list(data["summaries"])
+
+        if parallel and "totalResults" in data:
+            page_count = math.ceil(data["totalResults"] / page_size)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # map keeps the page order whatever order the responses arrive in
+                for page in executor.map(get_page, range(2, page_count + 1)):
+                    all_inventory_data.extend(page["summaries"])
+            return all_inventory_data
+
+        pgnum = 1
+        while "next" in data["_links"]:
+            pgnum += 1
+            with attributes(page=pgnum):
+                response = self._get(self.base_url + data["_links"]["next"]["href"], timeout=self.timeout)
+            if response.status_code != 200:
                 print(f"Request failed with status code: {response}")
                 break
+            data = response.json()
+            all_inventory_data.extend(data["summaries"])
         return all_inventory_data
 
     def save_inventory_data_to_csv(self, filename=r'data/01_raw/InventoryReportTPLC.csv'):
@@ -0,0 +1 @@
+"""``extras`` holds the project-specific Kedro extensions."""
@@ -0,0 +1,5 @@
+"""Custom Kedro datasets of the project."""
+from .copy_on_write_memory_dataset import CopyOnWriteMemoryDataset
+from .daily_partitioned_dataset import DailyPartitionedDataSet
+
+__all__ = ["CopyOnWriteMemoryDataset", "DailyPartitionedDataSet"]
@@ -0,0 +1,39 @@
+"""``CopyOnWriteMemoryDataset`` keeps the intermediate frames of a run without copying them.
+
+``MemoryDataset`` deep copies a frame when it is saved and again every time it is loaded,
+so that a node mutating its input cannot change what the other nodes read. With pandas
+Copy-on-Write enabled, a shallow copy gives the same guarantee: every node gets its own
+frame, the data of which is copied the first time that node modifies it, and only then.
+"""
+from typing import Any
+
+import pandas as pd
+from kedro.io import MemoryDataset
+
+
+def copy_on_write_enabled() -> bool:
+    """Whether pandas Copy-on-Write is enabled, see ``settings.py``"""
+    return pd.options.mode.copy_on_write is True
+
+
+def _is_frame(data: Any) -> bool:
+    return isinstance(data, (pd.DataFrame, pd.Series))
+
+
+class CopyOnWriteMemoryDataset(MemoryDataset):
+    """MemoryDataset handing out copy-on-write views of frames
+
+    Frames and series are shallow copied when pandas Copy-on-Write is enabled, every other
+    object, and every frame when it is disabled, is copied like ``MemoryDataset`` does.
+    """
+
+    def _load(self) -> Any:
+        if _is_frame(self._data) and copy_on_write_enabled():
+            return self._data.copy(deep=False)
+        return super()._load()
+
+    def _save(self, data: Any) -> None:
+        if _is_frame(data) and copy_on_write_enabled():
+            self._data = data.copy(deep=False)
+        else:
+            super()._save(data)
@@ -0,0 +1,133 @@
+"""``DailyPartitionedDataSet`` stores a time series as one Parquet file per day.
+
+Saving a frame writes the partitions of the days it holds and leaves the other days
+untouched, so the daily run appends its day without reading the history. Retention drops
+whole partitions, which costs the same whatever the size of a day.
+"""
+import datetime
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+from kedro.io import AbstractDataset, DatasetError
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "date="
+PARTITION_FILE = "part.parquet"
+
+
+class DailyPartitionedDataSet(AbstractDataset):
+    """Append-only time series partitioned by day
+
+    Partitions are ``<filepath>/date=YYYY-MM-DD/part.parquet``. Loading returns the rows of
+    every kept day, or of the ``load_days`` most recent ones, oldest day first, in the order
+    they were saved.
+
+    Example catalog entry::
+
+        total_inventory_history:
+          type: bearaby_ops.extras.datasets.DailyPartitionedDataSet
+          filepath: data/04_feature/total_inventory_history
+          date_column: Date
+          date_format: "%m/%d/%Y"
+          retention_days: 31
+    """
+
+    def __init__(
+            self,
+            filepath: str,
+            date_column: str = "Date",
+            date_format: str = None,
+            retention_days: int = None,
+            load_days: int = None,
+    ):
+        """
+        Args:
+            filepath: directory holding the partitions
+            date_column: column holding the day of every row
+            date_format: strptime format of ``date_column`` when it holds strings
+            retention_days: number of most recent days kept, all days when None
+            load_days: number of most recent days loaded, all kept days when None
+        """
+        self._filepath = Path(filepath)
+        self._date_column = date_column
+        self._date_format = date_format
+        self._retention_days = retention_days
+        self._load_days = load_days
+
+    def _describe(self) -> Dict[str, Any]:
+        return {
+            "filepath": str(self._filepath),
+            "date_column": self._date_column,
+            "retention_days": self._retention_days,
+            "load_days": self._load_days,
+        }
+
+    def partitions(self) -> List[datetime.date]:
+        """Days stored, oldest first"""
+        if not self._filepath.is_dir():
+            return []
+        return sorted(
+            datetime.date.fromisoformat(path.name[len(PARTITION_PREFIX):])
+            for path in self._filepath.iterdir()
+            if path.name.startswith(PARTITION_PREFIX) and (path / PARTITION_FILE).exists()
+        )
+
+    def _partition_path(self, day: datetime.date) -> Path:
+        return self._filepath / f"{PARTITION_PREFIX}{day.isoformat()}" / PARTITION_FILE
+
+    def _exists(self) -> bool:
+        return bool(self.partitions())
+
+    def _load(self) -> pd.DataFrame:
+        days = self.partitions()
+        if not days:
+            raise DatasetError(f"No partitions found in '{self._filepath}'")
+        if self._load_days is not None:
+            days = days[-self._load_days:]
+        return pd.concat(
+            [pd.read_parquet(self._partition_path(day)) for day in days], ignore_index=True
+        )
+
+    def _days(self, data: pd.DataFrame) -> pd.Series:
+        dates = data[self._date_column]
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            return dates.dt.date
+        return pd.to_datetime(dates, format=self._date_format).dt.date
+
+    def _save(self, data: pd.DataFrame) -> None:
+        days = self._days(data)
+        for day, rows in data.groupby(days.to_numpy(), sort=True):
+            path = self._partition_path(day)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # a run saving the same day again replaces its partition atomically
+            fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=path.parent)
+            os.close(fd)
+            try:
+                rows.reset_index(drop=True).to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        self.prune()
+
+    def prune(self) -> List[datetime.date]:
+        """Drop the days beyond the retention
+
+        Returns:
+            List[datetime.date]: the dropped days
+        """
+        if self._retention_days is None:
+            return []
+        days = self.partitions()
+        dropped = days[:max(0, len(days) - self._retention_days)]
+        for day in dropped:
+            shutil.rmtree(self._partition_path(day).parent)
+        if dropped:
+            logger.info("Dropped %d days from %s, oldest kept: %s", len(dropped), self._filepath, days[len(dropped)])
+        return dropped
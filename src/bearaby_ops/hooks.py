@@ -1,18 +1,14 @@
 import datetime
-import json
 import logging
 import os
 
 import dotenv
 import pandas as pd
-import requests
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import build_http
 from kedro.framework.hooks import hook_impl
+from kedro.io import DataCatalog
 
 dotenv.load_dotenv()
 import sys
@@ -20,56 +16,160 @@ import sys
 project_url = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append("src/bearaby_ops")
 
+from .alerting import DEFAULT_TIMEOUT as DEFAULT_ALERT_TIMEOUT
+from .alerting import AlertDispatcher, SlackSink
 from .customClasses.BergenAPI import BergenAPI
 from .customClasses._3PLCenterAPI import _3PLCenterAPI
+from .customClasses.GoogleClientFactory import DRIVE_SCOPES, get_default_client_factory
 from .customClasses.GoogleSheetUpdater import GoogleSheetUpdater
+from .customClasses.ThinkLogisticsAPI import ThinkLogisticsAPI
+from .customClasses.Tracer import TracedHttp, get_default_tracer
+from .ingestion import DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT, InventorySource, run_ingestion
+from .uploads import DEFAULT_MAX_WORKERS as DEFAULT_UPLOAD_WORKERS
+from .uploads import drive_upload, run_uploads
+
+# Warehouse downloads running at the same time and the seconds each one may take
+INGESTION_MAX_WORKERS = int(os.getenv("INGESTION_MAX_WORKERS", DEFAULT_MAX_WORKERS))
+INGESTION_TIMEOUT = float(os.getenv("INGESTION_TIMEOUT", DEFAULT_TIMEOUT))
+# Drive uploads running at the same time
+UPLOAD_MAX_WORKERS = int(os.getenv("UPLOAD_MAX_WORKERS", DEFAULT_UPLOAD_WORKERS))
+# Write the API trace as OpenTelemetry OTLP/JSON instead of the plain span list
+TRACE_OTLP = os.getenv("TRACE_OTLP", "").lower() in ("1", "true", "yes")
+# Seconds the post-run hook waits for the alerts still being sent
+ALERT_TIMEOUT = float(os.getenv("ALERT_TIMEOUT", 3 * DEFAULT_ALERT_TIMEOUT))
+
+
+def _bergen_fetch(web_address, username, password):
+    def fetch(csv_filename, validators):
+        rex_api = BergenAPI(web_address, username, password)
+        if not rex_api.get_authentication_token():
+            raise RuntimeError("Authentication token is missing. Please authenticate first.")
+        if rex_api.stream_inventory_to_csv(csv_filename, validators) is None:
+            raise RuntimeError("Bergen returned no inventory")
+    return fetch
+
+
+def _tpl_center_fetch(client_id, client_secret):
+    def fetch(csv_filename):
+        api = _3PLCenterAPI(client_id, client_secret)
+        api.save_inventory_data_to_csv(csv_filename)
+    return fetch
+
+
+def _think_logistics_fetch(login, password):
+    def fetch(csv_filename):
+        api = ThinkLogisticsAPI(login, password)
+        api.save_inventory_to_excel(api.retrieve_inventory(), csv_filename)
+    return fetch
+
+
+def _inventory_sources(raw_folder):
+    """Build the warehouse sources whose credentials are configured in the environment"""
+    credentials_list = [
+        (
+            os.getenv("USER_NJ_EMAIL"),
+            os.getenv("USER_NJ_USERNAME"),
+            os.getenv("USER_NJ_PASSWORD"),
+            "/BergenInventoryNJ.csv"
+        ),
+    ]
+    sources = []
+    for web_address, username, password, file_name in credentials_list:
+        if all((web_address, username, password)):
+            sources.append(InventorySource(
+                "Bergen" + file_name, _bergen_fetch(web_address, username, password),
+                raw_folder + file_name, INGESTION_TIMEOUT, conditional=True,
+            ))
+
+    client_id = os.getenv("TPL_CLIENT_ID")
+    client_secret = os.getenv("TPL_CLIENT_SECRET")
+    if client_id and client_secret:
+        sources.append(InventorySource(
+            "3PL Center", _tpl_center_fetch(client_id, client_secret),
+            raw_folder + "/InventoryReportTPLC.csv", INGESTION_TIMEOUT,
+        ))
+
+    tl_login = os.getenv("TL_LOGIN")
+    tl_password = os.getenv("TL_PASSWORD")
+    if tl_login and tl_password:
+        sources.append(InventorySource(
+            "Think Logistics", _think_logistics_fetch(tl_login, tl_password),
+            raw_folder + "/InventoryReportTL.csv", INGESTION_TIMEOUT,
+        ))
+
+    if not sources:
+        logging.warning("No warehouse credentials are configured, using the existing raw files")
+    return sources
+
+
+def _export_trace(folder):
+    """Log the latency of every API endpoint called during the run and write the spans"""
+    tracer = get_default_tracer()
+    for endpoint, stats in tracer.summary().items():
+        logging.info(
+            f"{endpoint}: {stats['calls']} calls, {stats['errors']} errors, total {stats['total']:.2f}s, "
+            f"p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s, p99 {stats['p99']:.3f}s"
+        )
+    suffix = ".otlp.json" if TRACE_OTLP else ".json"
+    path = f"{folder}/api_trace_{datetime.datetime.now():%Y%m%d-%H%M%S}{suffix}"
+    try:
+        tracer.export(path, otlp=TRACE_OTLP)
+    except OSError as error:
+        logging.warning(f"The API trace could not be written: {error}")
 
-# If modifying these scopes, delete the file token.json.
-SCOPES = ['https://www.googleapis.com/auth/drive']
     
 class APIAccessHooks:
     
     @staticmethod
     @hook_impl
     def after_catalog_created(  ) -> None:
-        logging.info("Downloading inventory data from the Bergen API...")
-        # Loop through credentials and fetch/write data
-
-        credentials_list = [
-            (
-                os.getenv("USER_NJ_EMAIL"),
-                os.getenv("USER_NJ_USERNAME"),
-                os.getenv("USER_NJ_PASSWORD"),
-                "/BergenInventoryNJ.csv"
-            ),
-        ]
-        for creds in credentials_list:
-            web_address, username, password, file_name = creds
-            rex_api = BergenAPI(web_address, username, password)
-            authentication_token = rex_api.get_authentication_token()
-
-            if not authentication_token:
-                print("Authentication token is missing. Please authenticate first.")
-            if authentication_token:
-                logging.info("Authentication token:", authentication_token)
-                inventory = rex_api.get_inventory()
-                if inventory:
-                    csv_filename = project_url + r"/data/01_raw" + file_name
-                    
-                    rex_api.write_inventory_to_csv(inventory, csv_filename)
-                    
-        
-        logging.info("Downloading inventory data from the 3PL Center API...")            
-    
-        client_id = os.getenv("TPL_CLIENT_ID")
-        client_secret = os.getenv("TPL_CLIENT_SECRET")
+        logging.info("Downloading inventory data from the warehouse APIs...")
+        # the trace of this run starts with the warehouse downloads
+        get_default_tracer().clear()
+        raw_folder = project_url + r"/data/01_raw"
+        # unchanged sources keep their raw file, see the state file for what was fresh or cached
+        run_ingestion(
+            _inventory_sources(raw_folder),
+            max_workers=INGESTION_MAX_WORKERS,
+            state_file=raw_folder + "/.ingestion_state.json",
+        )
 
-        api = _3PLCenterAPI(client_id, client_secret)
-        api.save_inventory_data_to_csv()
+    @staticmethod
+    @hook_impl
+    def before_pipeline_run(catalog: DataCatalog) -> None:
+        # the history used to live in the Sheet only, it is copied once to the local store
+        sheet_id = os.getenv("SHEETS_TIME_SERIES")
+        if sheet_id and not catalog.exists("total_inventory_history"):
+            logging.info("Seeding the total_inventory history from the Google Sheet...")
+            updater = GoogleSheetUpdater(
+                (project_url + r'/data/03_primary/total_inventory.xlsx', "new", sheet_id),
+                'token_.json', project_url + r'/src/bearaby_ops/credentials.json',
+            )
+            history = updater.read_sheet('total_inventory', sheet_id)
+            if history is not None and not history.empty:
+                for column in ("Total Available", "Weight (lbs)"):
+                    if column in history:
+                        history[column] = pd.to_numeric(history[column], errors="coerce")
+                catalog.save("total_inventory_history", history)
+
+    @staticmethod
+    @hook_impl
+    def after_pipeline_run(catalog: DataCatalog) -> None:
+        try:
+            APIAccessHooks._publish(catalog)
+        finally:
+            # the trace is written even when an upload or a sheet update failed
+            _export_trace(project_url + r"/data/09_tracking")
 
     @staticmethod
     @hook_impl
-    def after_pipeline_run() -> None:
+    def on_pipeline_error() -> None:
+        # the runs that failed are the ones whose slow or failing APIs are worth knowing
+        _export_trace(project_url + r"/data/09_tracking")
+
+    @staticmethod
+    def _publish(catalog: DataCatalog) -> None:
+        """Send the alerts, upload the outputs to Drive and update the Sheets"""
         file_info = [(
             project_url + r"/data/01_raw/BergenInventoryNJ.csv",
             "BergenInventoryNJ",
@@ -84,150 +184,61 @@ class APIAccessHooks:
             os.getenv("SHEETS_ID_TPLC")
         )]
         logging.info("Pipeline has run successfully! Uploading the file to the drive...")
-        
-        for info in file_info:
-            filename_path, filename, folder_location = info
-            creds = None
-            # The file token.json stores the user's access and refresh tokens, and is
-            # created automatically when the authorization flow completes for the first
-            # time.
-            if os.path.exists('token.json'):
-                creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-            # If there are no (valid) credentials available, let the user log in.
-            if not creds or not creds.valid:
-                if creds and creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
-                else:
-                    flow = InstalledAppFlow.from_client_secrets_file(project_url + r'/src/bearaby_ops/credentials.json', SCOPES)
-                    creds = flow.run_local_server(port=0)
-                # Save the credentials for the next run
-                with open('token.json', 'w') as token:
-                    token.write(creds.to_json())
-            try:
-                service = build('drive', 'v3', credentials=creds)
-
-               
-                # get the current date in the format of 081523
-                date = datetime.datetime.now().strftime("%m%d%y")
-                # get formated date to 08-18-2023
-            
-                formated_date = datetime.datetime.now().strftime("%m-%d-%Y")
-                # Upload a CSV file
-            
-                if filename == "":
-                    # filename as mm-dd-yy.xlsx
-                    csv_file_metadata = {
-                        'name' : formated_date + ".xlsx",
-                        'parents': [folder_location]
-                    }
-                    media = MediaFileUpload(filename_path, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-                    
-                elif filename == "display":
-                    csv_file_metadata = {
-                        'name' : "display",
-                        'parents': [folder_location]
-                    }
-                    media = MediaFileUpload(filename_path, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-                else:
-                    csv_file_metadata = {
-                        'name': f'{filename}{date}.csv',
-                        'parents': [folder_location]
-                    }
-                    
-                    media = MediaFileUpload(filename_path, mimetype='text/csv')
-    
-                # Check if the file with the same name already exists in the folder
-                existing_file = None
-                results = service.files().list(
-                   ).execute()
-                
-                
-                if csv_file_metadata['name'] in results:
-                    existing_files = results['files']
-                    if existing_files:
-                        existing_file = existing_files[0]['id']
-
-                # If an existing file with the same name is found, replace it
-                if existing_file:
-                    uploaded_file = service.files().update(
-                        fileId=existing_file, media_body=media).execute()
-                else:
-                    uploaded_file = service.files().create(
-                        body=csv_file_metadata, media_body=media, fields='id', supportsAllDrives=True).execute()
-
-                logging.info('CSV file uploaded. File ID: %s' % uploaded_file.get('id'))
 
+        slack_url = os.getenv("SLACK_URL")
+        dispatcher = AlertDispatcher(
+            [SlackSink(slack_url)] if slack_url else [],
+            state_file=project_url + r"/data/09_tracking/.alerts_sent.json",
+        ).start()
+        # the alerts already sent are remembered even when an upload or a sheet update fails,
+        # so the rerun does not post them again
+        try:
+            # the pipeline computed the alerts, they are sent in the background while the
+            # files are uploaded
+            for alert in catalog.load("inventory_alerts"):
+                dispatcher.submit(alert)
+
+            # Drive and Sheets clients are built once and shared by every upload and sheet update
+            client_factory = get_default_client_factory()
+            credentials_file = project_url + r'/src/bearaby_ops/credentials.json'
+
+            try:
+                # The file token.json stores the user's access and refresh tokens, and is
+                # created automatically when the authorization flow completes for the first
+                # time.
+                service = client_factory.drive('token.json', credentials_file)
+                creds = client_factory.credentials('token.json', DRIVE_SCOPES, credentials_file)
+                uploads = [
+                    drive_upload(filename_path, filename, folder_location)
+                    for filename_path, filename, folder_location in file_info if folder_location
+                ]
+                # every upload worker runs its requests on its own authorized connection
+                run_uploads(
+                    service, uploads,
+                    http_factory=lambda: TracedHttp(AuthorizedHttp(creds, http=build_http())),
+                    max_workers=UPLOAD_MAX_WORKERS,
+                )
             except HttpError as error:
                 logging.info(f'An error occurred: {error}')
-                
-            
-        file_to_edit = (
-            project_url + r"/data/03_primary/final_SKU_table.xlsx",
-            "display",
-            os.getenv("SHEETS_LOOKER_DISPLAY")
-        )
-            
-
-        token_file = 'token_.json'
-        credentials_file = project_url+r'/src/bearaby_ops/credentials.json'
-
-        updater = GoogleSheetUpdater(file_to_edit, token_file, credentials_file)
-        updater.update_sheet(sheet_name='Sheet1', update_range='A1')
-        
-        updater.download_sheet('total_inventory',  os.getenv("SHEETS_TIME_SERIES"), project_url+r'/data/02_intermediate/test.csv')
-        
-        # open the file and read the data as dataframe
-        df = pd.read_csv(project_url+r'/data/02_intermediate/test.csv')
-        df2 = pd.read_csv(project_url+r'/data/03_primary/total_inventory.csv')
-        
-        # concat the dataframes
-        df3 = pd.concat([df, df2])
-        
-        # check the number of unique elements Date column and if len > 30 remove the oldest date
-        while len(df3['Date'].unique()) > 31:
-            # oldest date
-            oldest_date = df3['Date'].unique()[0]
-            # remove the rows with the oldest date
-            df3 = df3[df3['Date'] != oldest_date]
-            
-        # get the sum of "Total Available" for last 2 days
-        total = df3.copy()
-        total["Date"] = pd.to_datetime(total["Date"]).dt.date
-        total = total.groupby(['Date']).sum(numeric_only=True)
-        # sort by the date
-        total = total.sort_values(by=['Date'])
-        total = total.reset_index()
-        total = total.tail(2)
-        # get difference between the 2 days
-        difference =  total["Total Available"].iloc[1] - total["Total Available"].iloc[0] 
-        logging.info(total)
-        logging.info(total["Total Available"].iloc[1], total["Total Available"].iloc[0] , difference)
-        
-        if abs(difference) >= 500:
-             
-            # send Slack message
-            slack_text = f"Inventory diff is {difference} from yesterday. Date: {datetime.datetime.now().strftime('%m/%d/%Y')}."
-            slack_message = {"text": slack_text}
-            slack_message = json.dumps(slack_message)
-            slack_message = slack_message.encode('utf-8')
-            slack_url = os.getenv("SLACK_URL")
-            slack_url = slack_url.encode('utf-8')
-            
-            slack_headers = {'Content-type': 'application/json'}
-            
-            
-            slack_response = requests.post(slack_url, data=slack_message, headers=slack_headers)
-            logging.info(slack_response)
-            
-            
-         
-        # save it as excel 
-        df3.to_excel(project_url+r'/data/03_primary/total_inventory.xlsx', index=False)
-       
-        file_to_edit_ = (
-            project_url+r'/data/03_primary/total_inventory.xlsx',
-            "new",
-            os.getenv("SHEETS_TIME_SERIES")
-        )
-        update_timeseries = GoogleSheetUpdater(file_to_edit_, token_file, credentials_file)
-        update_timeseries.update_sheet(sheet_name='total_inventory', update_range='A1')
+
+            file_to_edit = (
+                project_url + r"/data/03_primary/final_SKU_table.xlsx",
+                "display",
+                os.getenv("SHEETS_LOOKER_DISPLAY")
+            )
+
+            token_file = 'token_.json'
+
+            updater = GoogleSheetUpdater(file_to_edit, token_file, credentials_file, client_factory)
+            updater.update_sheet(sheet_name='Sheet1', update_range='A1', diff=True)
+
+            # the Sheet only mirrors the store, the pipeline exported it to total_inventory.xlsx
+            file_to_edit_ = (
+                project_url+r'/data/03_primary/total_inventory.xlsx',
+                "new",
+                os.getenv("SHEETS_TIME_SERIES")
+            )
+            update_timeseries = GoogleSheetUpdater(file_to_edit_, token_file, credentials_file, client_factory)
+            update_timeseries.update_sheet(sheet_name='total_inventory', update_range='A1', diff=True)
+        finally:
+            dispatcher.close(timeout=ALERT_TIMEOUT)
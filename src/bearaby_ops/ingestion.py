@@ -0,0 +1,213 @@
+"""Concurrent, incremental download of the raw warehouse inventory files.
+
+Every warehouse source runs on its own worker so the ingestion takes about as long as
+the slowest source. Each source writes to a temporary file next to its target and the
+file is only moved into place once the source finished in time, so a failed or slow
+source leaves the previous raw file untouched.
+
+A hash of every downloaded payload is kept in a state file. When the payload did not
+change, or the API answered a conditional request with 304 Not Modified, the raw file
+is left as it is so its modification time shows it is still the cached copy.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_TIMEOUT = 300
+
+FRESH = "fresh"
+CACHED = "cached"
+
+
+class InventorySource:
+    """A warehouse inventory download
+
+    Attributes:
+        name: name of the source in the logs and the run summary
+        fetch: callable writing the raw inventory CSV to the path it is given
+        filename: path of the raw CSV file
+        timeout: seconds the source may take before it is abandoned
+        conditional: the source supports conditional requests, ``fetch`` is then also
+            given a dict with the stored ``etag`` and ``last_modified`` validators, which
+            it updates from the response and where it sets ``not_modified`` on a 304
+    """
+
+    def __init__(
+            self,
+            name: str,
+            fetch: Callable[..., None],
+            filename: str,
+            timeout: float = DEFAULT_TIMEOUT,
+            conditional: bool = False,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.filename = filename
+        self.timeout = timeout
+        self.conditional = conditional
+
+    def __repr__(self):
+        return f"InventorySource({self.name!r}, {self.filename!r})"
+
+
+def payload_hash(filename: str) -> str:
+    """Hash a raw CSV independently of the order of its rows
+
+    Args:
+        filename: path of the CSV file
+
+    Returns:
+        str: SHA-256 of the header followed by the sorted rows
+    """
+    with open(filename, "rb") as f:
+        header, *rows = f.read().splitlines() or [b""]
+    digest = hashlib.sha256(header)
+    for row in sorted(rows):
+        digest.update(b"\n" + row)
+    return digest.hexdigest()
+
+
+def load_state(state_file: Optional[str]) -> Dict[str, dict]:
+    """Read the ingestion state, empty when there is no state file yet or it cannot be read
+
+    Args:
+        state_file: JSON file written by ``run_ingestion``
+
+    Returns:
+        Dict[str, dict]: payload hash, validators and timestamps by source name, empty for
+        a truncated or corrupt state file so every source is downloaded again
+    """
+    if not state_file or not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file, encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning("Ignoring the ingestion state %s, every source is fresh: %s", state_file, e)
+        return {}
+
+
+def _save_state(state_file: str, state: Dict[str, dict]) -> None:
+    directory = os.path.dirname(os.path.abspath(state_file))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_file)
+
+
+def _ingest(source: InventorySource, previous: dict, abandoned: threading.Event) -> dict:
+    """Run one source into a temporary file and move it in place unless abandoned or unchanged
+
+    Returns:
+        dict: the new state of the source
+    """
+    directory = os.path.dirname(os.path.abspath(source.filename))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    os.close(fd)
+    os.remove(tmp_path)
+    has_file = os.path.exists(source.filename)
+    validators = {}
+    if source.conditional and has_file:
+        validators = {k: previous[k] for k in ("etag", "last_modified") if previous.get(k)}
+    try:
+        if source.conditional:
+            source.fetch(tmp_path, validators)
+        else:
+            source.fetch(tmp_path)
+        if abandoned.is_set():
+            raise TimeoutError(f"finished after its {source.timeout}s timeout")
+
+        state = dict(previous)
+        state.update({k: validators[k] for k in ("etag", "last_modified") if validators.get(k)})
+        if validators.get("not_modified") and has_file:
+            state["status"] = CACHED
+            return state
+        if not os.path.exists(tmp_path):
+            raise RuntimeError("the source returned no data")
+
+        state["sha256"] = payload_hash(tmp_path)
+        if has_file and state["sha256"] == previous.get("sha256"):
+            state["status"] = CACHED
+            return state
+        os.replace(tmp_path, source.filename)
+        state["status"] = FRESH
+        state["updated_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+        return state
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def run_ingestion(
+        sources: List[InventorySource],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        state_file: Optional[str] = None,
+) -> Dict[str, str]:
+    """Download all sources concurrently
+
+    Args:
+        sources: the warehouse sources to download
+        max_workers: number of sources downloading at the same time
+        state_file: JSON file keeping the payload hash and validators of every source
+            between runs, without it every successful download rewrites its file
+
+    Returns:
+        Dict[str, str]: "fresh", "cached" or the error message for every source name
+    """
+    summary = {}
+    if not sources:
+        return summary
+
+    state = load_state(state_file)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingestion")
+    started = time.monotonic()
+    abandoned = {source.name: threading.Event() for source in sources}
+    futures = {
+        source.name: executor.submit(_ingest, source, state.get(source.name, {}), abandoned[source.name])
+        for source in sources
+    }
+
+    for source in sources:
+        future = futures[source.name]
+        remaining = max(0.0, started + source.timeout - time.monotonic())
+        try:
+            source_state = future.result(timeout=remaining)
+        except Exception as error:  # a failing warehouse must not stop the others
+            if not future.done():
+                abandoned[source.name].set()
+                future.cancel()
+                summary[source.name] = f"timed out after {source.timeout}s"
+                logger.error("Download of %s timed out after %ss, keeping the previous file", source.name, source.timeout)
+            else:
+                summary[source.name] = str(error) or type(error).__name__
+                logger.error("Download of %s failed, keeping the previous file: %s", source.name, error)
+        else:
+            summary[source.name] = source_state.pop("status")
+            source_state["checked_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+            state[source.name] = source_state
+            logger.info("%s: %s (%s)", source.name, summary[source.name], source.filename)
+
+    # do not wait on abandoned downloads, their results are discarded anyway
+    executor.shutdown(wait=False, cancel_futures=True)
+    if state_file:
+        _save_state(state_file, state)
+
+    fresh = [name for name, status in summary.items() if status == FRESH]
+    cached = [name for name, status in summary.items() if status == CACHED]
+    failed = [name for name in summary if name not in fresh and name not in cached]
+    logger.info(
+        "Ingestion finished in %.1fs, fresh: %s, cached: %s, failed: %s",
+        time.monotonic() - started, fresh or "none", cached or "none", failed or "none",
+    )
+    return summary
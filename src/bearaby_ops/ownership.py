@@ -0,0 +1,133 @@
+"""Which node owns the frames it is given, and a check that the others leave them alone.
+
+A node decorated with ``consumes`` declares the arguments it modifies in place. Every
+other input is shared: the node reads it and builds new frames from it. With pandas
+Copy-on-Write enabled (see ``settings.py``) and the intermediate results kept in
+``CopyOnWriteMemoryDataset``, neither needs a copy: a consumed input is copied by pandas
+the first time it is modified, and only when another node still reads its data.
+
+``MutationGuardHooks`` is the debug mode of this contract. It fingerprints the inputs a
+node does not consume before the node runs and raises ``InputMutatedError`` when one of
+them changed once it ran. Enable it with ``CHECK_MUTATIONS=1``.
+"""
+import inspect
+import logging
+import threading
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Optional
+
+import pandas as pd
+from kedro.framework.hooks import hook_impl
+from kedro.pipeline.node import Node
+
+logger = logging.getLogger(__name__)
+
+CONSUMES_ATTRIBUTE = "__consumes__"
+
+
+class InputMutatedError(RuntimeError):
+    """A node modified an input it does not consume"""
+
+
+def consumes(*arguments: str) -> Callable:
+    """Declare the arguments a node function modifies in place
+
+    Args:
+        *arguments: names of the arguments of the decorated function
+
+    Returns:
+        Callable: decorator returning the function itself, so it pickles for ParallelRunner
+    """
+    def decorator(func: Callable) -> Callable:
+        parameters = inspect.signature(func).parameters
+        unknown = set(arguments) - set(parameters)
+        if unknown:
+            raise ValueError(f"{func.__name__} has no argument {sorted(unknown)}")
+        setattr(func, CONSUMES_ATTRIBUTE, frozenset(arguments))
+        return func
+
+    return decorator
+
+
+def consumed_arguments(func: Callable) -> FrozenSet[str]:
+    """Arguments declared by ``consumes``, empty for an undecorated function"""
+    return getattr(func, CONSUMES_ATTRIBUTE, frozenset())
+
+
+def consumed_inputs(node: Node) -> FrozenSet[str]:
+    """Datasets a node modifies in place, from the arguments its function consumes"""
+    arguments = consumed_arguments(node.func)
+    if not arguments:
+        return frozenset()
+    # kedro's private mapping, as given to node(): a dataset name, a list or a dict
+    inputs = node._inputs  # pylint: disable=protected-access
+    if isinstance(inputs, dict):
+        return frozenset(name for argument, name in inputs.items() if argument in arguments)
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    parameters = list(inspect.signature(node.func).parameters)
+    return frozenset(name for argument, name in zip(parameters, inputs or []) if argument in arguments)
+
+
+def fingerprint(data: Any) -> Optional[Hashable]:
+    """Hash of the values, index, columns and dtypes of a frame
+
+    Args:
+        data: a node input
+
+    Returns:
+        Optional[Hashable]: None for the inputs that are not frames or series, or that
+        hold values pandas cannot hash
+    """
+    if not isinstance(data, (pd.DataFrame, pd.Series)):
+        return None
+    try:
+        values = int(pd.util.hash_pandas_object(data, index=True).sum())
+    except TypeError:
+        return None
+    if isinstance(data, pd.DataFrame):
+        return values, tuple(data.columns), tuple(map(str, data.dtypes))
+    return values, data.name, str(data.dtype)
+
+
+class MutationGuardHooks:
+    """Raises InputMutatedError when a node modifies an input it does not consume
+
+    Hashing every input twice per node is slow, register these hooks to debug a pipeline,
+    not for the daily run.
+    """
+
+    def __init__(self):
+        self._fingerprints: Dict[Any, Dict[str, Hashable]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(node: Node):
+        return node.name, threading.get_ident()
+
+    @hook_impl
+    def before_node_run(self, node: Node, inputs: Dict[str, Any]) -> None:
+        consumed = consumed_inputs(node)
+        fingerprints = {}
+        for name, data in inputs.items():
+            if name not in consumed:
+                value = fingerprint(data)
+                if value is not None:
+                    fingerprints[name] = value
+        with self._lock:
+            self._fingerprints[self._key(node)] = fingerprints
+
+    @hook_impl
+    def after_node_run(self, node: Node, inputs: Dict[str, Any]) -> None:
+        with self._lock:
+            fingerprints = self._fingerprints.pop(self._key(node), {})
+        mutated = sorted(name for name, value in fingerprints.items() if fingerprint(inputs[name]) != value)
+        if mutated:
+            raise InputMutatedError(
+                f"Node '{node.name}' modified its inputs {mutated} in place, copy them or declare "
+                f"them with @consumes"
+            )
+
+    @hook_impl
+    def on_node_error(self, node: Node) -> None:
+        with self._lock:
+            self._fingerprints.pop(self._key(node), None)
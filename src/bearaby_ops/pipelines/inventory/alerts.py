@@ -0,0 +1,100 @@
+"""Day-over-day inventory deltas and the thresholds that turn them into alerts.
+
+Deltas only need the last two stored days of the SKU x warehouse snapshot, the older
+history is never read. Every level (total, collection, warehouse, SKU) is one groupby
+over those two days.
+"""
+from typing import Any, Dict, List
+
+import pandas as pd
+
+# the snapshot column grouped on at every level, the total is one group
+LEVEL_COLUMNS = {
+    "total": None,
+    "collection": "Collection",
+    "warehouse": "Warehouse",
+    "sku": "SKU",
+}
+
+
+def compute_deltas(snapshots: pd.DataFrame, level: str, date_format: str = "%m/%d/%Y") -> pd.DataFrame:
+    """Change of the available inventory between the last two days of the snapshots
+
+    Args:
+        snapshots: Columns Date,SKU,Collection,Warehouse,Available
+        level: "total", "collection", "warehouse" or "sku"
+        date_format: format of the Date column
+
+    Returns:
+        pd.DataFrame: Columns name,previous,current,delta, empty with less than two days
+    """
+    columns = ["name", "previous", "current", "delta"]
+    days = pd.to_datetime(snapshots["Date"], format=date_format)
+    last_days = sorted(days.unique())[-2:]
+    if len(last_days) < 2:
+        return pd.DataFrame(columns=columns)
+    previous_day, current_day = last_days
+
+    column = LEVEL_COLUMNS[level]
+    names = snapshots[column].astype(str) if column else pd.Series(level, index=snapshots.index)
+    totals = (
+        snapshots["Available"]
+        .groupby([names.rename("name"), days.rename("day")])
+        .sum()
+        .unstack("day", fill_value=0)
+        .reindex(columns=[previous_day, current_day], fill_value=0)
+    )
+    deltas = pd.DataFrame({
+        "name": totals.index.to_numpy(),
+        "previous": totals[previous_day].to_numpy(),
+        "current": totals[current_day].to_numpy(),
+    })
+    deltas["delta"] = deltas["current"] - deltas["previous"]
+    return deltas[columns]
+
+
+def _level_thresholds(names: pd.Series, thresholds) -> pd.Series:
+    if thresholds is None:
+        return pd.Series(float("nan"), index=names.index)
+    if not isinstance(thresholds, dict):
+        return pd.Series(float(thresholds), index=names.index)
+    return names.map(thresholds).fillna(thresholds.get("default", float("nan"))).astype(float)
+
+
+def evaluate_thresholds(
+        snapshots: pd.DataFrame,
+        thresholds: Dict[str, Any],
+        date_format: str = "%m/%d/%Y",
+) -> List[Dict[str, Any]]:
+    """Alerts for the deltas that reach their threshold
+
+    Args:
+        snapshots: Columns Date,SKU,Collection,Warehouse,Available of at least the last two days
+        thresholds: absolute delta per level, a number or a mapping of name to number with
+            an optional "default" for the names that are not listed
+        date_format: format of the Date column
+
+    Returns:
+        List[Dict[str, Any]]: date, level, name, previous, current, delta and threshold of
+        every alert
+    """
+    if snapshots.empty:
+        return []
+    date = pd.to_datetime(snapshots["Date"], format=date_format).max().strftime(date_format)
+    alerts = []
+    for level in LEVEL_COLUMNS:
+        if level not in thresholds:
+            continue
+        deltas = compute_deltas(snapshots, level, date_format)
+        deltas["threshold"] = _level_thresholds(deltas["name"], thresholds[level]).to_numpy()
+        for row in deltas[deltas["delta"].abs() >= deltas["threshold"]].itertuples(index=False):
+            alerts.append({
+                "date": date,
+                "level": level,
+                "name": row.name,
+                "previous": float(row.previous),
+                "current": float(row.current),
+                "delta": float(row.delta),
+                "threshold": float(row.threshold),
+            })
+    return alerts
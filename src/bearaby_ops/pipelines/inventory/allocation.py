@@ -0,0 +1,64 @@
+"""Columnar quota allocation for the inventory pipeline.
+
+The quota for each SKU is taken from the warehouse holding the most stock; ties go
+to the warehouse that comes first in the priority order.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def priority_order(warehouses: List[str], warehouse_priority: Optional[List[str]] = None) -> List[str]:
+    """Order the configured warehouses for tie-breaking
+
+    Args:
+        warehouses: warehouses present in the allocation
+        warehouse_priority: preferred order, warehouses that are not listed keep
+            their configured order after the listed ones
+
+    Returns:
+        List[str]: warehouses in tie-breaking order
+    """
+    warehouse_priority = warehouse_priority or []
+    preferred = [w for w in warehouse_priority if w in warehouses]
+    return preferred + [w for w in warehouses if w not in preferred]
+
+
+def allocate_quota(
+        stock: pd.DataFrame,
+        quota: pd.Series,
+        warehouses: List[str],
+        warehouse_priority: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Allocate the quota of every row to a warehouse in one vectorized pass
+
+    Args:
+        stock: available inventory with one column per warehouse, missing warehouses
+            count as empty
+        quota: quota amount per row of ``stock``
+        warehouses: warehouses to allocate from, in output column order
+        warehouse_priority: tie-breaking order when warehouses hold the same stock
+
+    Returns:
+        pd.DataFrame: columns Warehouse, Updated_<warehouse> for every warehouse,
+        Total Inventory and Total Available, on the index of ``stock``
+    """
+    matrix = stock.reindex(columns=warehouses, fill_value=0).to_numpy()
+    amount = quota.to_numpy()
+
+    # argmax returns the first maximum, so scan the columns in priority order
+    ordered = priority_order(warehouses, warehouse_priority)
+    order = np.array([warehouses.index(w) for w in ordered], dtype=np.intp)
+    chosen = order[matrix[:, order].argmax(axis=1)]
+
+    updated = matrix.astype(np.result_type(matrix, amount), copy=True)
+    updated[np.arange(len(updated)), chosen] -= amount
+
+    allocation = pd.DataFrame(
+        updated, columns=[f"Updated_{w}" for w in warehouses], index=stock.index
+    )
+    allocation.insert(0, "Warehouse", np.asarray(warehouses, dtype=object)[chosen])
+    allocation["Total Inventory"] = matrix.sum(axis=1)
+    allocation["Total Available"] = updated.sum(axis=1)
+    return allocation
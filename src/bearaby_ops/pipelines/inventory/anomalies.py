@@ -0,0 +1,120 @@
+"""Outliers of the available inventory of every SKU in every warehouse.
+
+The snapshot history is pivoted into a dense day x series matrix once, then every series
+is scored in the same NumPy operations: the latest day is compared to the median of the
+days before it, scaled by their median absolute deviation (robust z-score). Days a series
+was not stored are NaN and do not count towards its history.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# MAD of a normal distribution is 0.6745 standard deviations
+MAD_TO_STD = 1.4826
+
+ANOMALY_COLUMNS = [
+    "Rank", "Date", "SKU", "Collection", "Warehouse", "Available", "Median", "MAD", "Score", "History",
+]
+
+
+def series_matrix(
+        snapshots: pd.DataFrame,
+        date_format: str = "%m/%d/%Y",
+) -> Tuple[pd.DatetimeIndex, pd.DataFrame, np.ndarray]:
+    """Dense day x series matrix of the available inventory
+
+    Args:
+        snapshots: Columns Date,SKU,Collection,Warehouse,Available
+        date_format: format of the Date column
+
+    Returns:
+        Tuple: the days (rows), one row of SKU,Collection,Warehouse per series (columns)
+        and the float matrix, NaN where a series has no snapshot for a day. Series are in
+        the order they first appear
+    """
+    # dates are parsed once per distinct day, not once per row
+    raw_codes, raw_days = pd.factorize(snapshots["Date"])
+    parsed = pd.to_datetime(raw_days, format=date_format)
+    order = np.argsort(parsed.to_numpy(), kind="stable")
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    day_codes, days = rank[raw_codes], parsed[order]
+
+    sku_codes, skus = pd.factorize(snapshots["SKU"].astype(str))
+    warehouse_codes, warehouses = pd.factorize(snapshots["Warehouse"].astype(str))
+    series_codes, pairs = pd.factorize(sku_codes * len(warehouses) + warehouse_codes)
+    matrix = np.full((len(days), len(pairs)), np.nan)
+    # a series stored twice on the same day keeps its last row, as the store does
+    matrix[day_codes, series_codes] = snapshots["Available"].to_numpy(dtype=float)
+
+    first_row = np.unique(series_codes, return_index=True)[1]
+    keys = pd.DataFrame({
+        "SKU": np.asarray(skus)[pairs // len(warehouses)],
+        "Collection": snapshots["Collection"].to_numpy()[first_row],
+        "Warehouse": np.asarray(warehouses)[pairs % len(warehouses)],
+    })
+    return pd.DatetimeIndex(days), keys, matrix
+
+
+def robust_zscores(matrix: np.ndarray, min_history: int = 7, min_scale: float = 1.0) -> pd.DataFrame:
+    """Robust z-score of the last row of the matrix against the rows before it
+
+    Args:
+        matrix: day x series, NaN for the missing days
+        min_history: days a series needs before its last day to be scored
+        min_scale: lower bound of the scale, so flat series are scored in units and not
+            divided by zero
+
+    Returns:
+        pd.DataFrame: Columns Available,Median,MAD,Score,History, one row per series,
+        Score is NaN for the series with too little history or no value on the last day
+    """
+    current = matrix[-1]
+    history = matrix[:-1]
+    observed = np.count_nonzero(~np.isnan(history), axis=0)
+    scored = (observed >= max(min_history, 1)) & ~np.isnan(current)
+
+    median = np.full(matrix.shape[1], np.nan)
+    mad = np.full(matrix.shape[1], np.nan)
+    if scored.any():
+        kept = history[:, scored]
+        median[scored] = np.nanmedian(kept, axis=0)
+        mad[scored] = np.nanmedian(np.abs(kept - median[scored]), axis=0)
+    scale = np.maximum(MAD_TO_STD * mad, min_scale)
+    score = np.where(scored, (current - median) / scale, np.nan)
+    return pd.DataFrame({
+        "Available": current, "Median": median, "MAD": mad, "Score": score, "History": observed,
+    })
+
+
+def detect_anomalies(
+        snapshots: pd.DataFrame,
+        z_threshold: float = 3.5,
+        min_history: int = 7,
+        max_rows: int = None,
+        date_format: str = "%m/%d/%Y",
+) -> pd.DataFrame:
+    """Series whose latest day is an outlier, most extreme first
+
+    Args:
+        snapshots: Columns Date,SKU,Collection,Warehouse,Available
+        z_threshold: absolute robust z-score from which a day is an outlier
+        min_history: days a series needs before the latest one to be scored
+        max_rows: number of outliers kept, all when None
+        date_format: format of the Date column
+
+    Returns:
+        pd.DataFrame: Columns Rank,Date,SKU,Collection,Warehouse,Available,Median,MAD,Score,History
+    """
+    if snapshots.empty:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    days, keys, matrix = series_matrix(snapshots, date_format)
+    scores = pd.concat([keys, robust_zscores(matrix, min_history)], axis=1)
+
+    outliers = scores[scores["Score"].abs() >= z_threshold]
+    order = np.argsort(-outliers["Score"].abs().to_numpy(), kind="stable")
+    outliers = outliers.iloc[order[:max_rows]].reset_index(drop=True)
+    outliers.insert(0, "Rank", np.arange(1, len(outliers) + 1))
+    outliers.insert(1, "Date", days[-1].strftime(date_format))
+    return outliers[ANOMALY_COLUMNS]
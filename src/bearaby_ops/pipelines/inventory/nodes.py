@@ -1,10 +1,77 @@
 import datetime
+import logging
+from typing import List
 
 import matplotlib.pyplot as plt
 import pandas as pd
 import plotly.express as px
 
+from ...ownership import consumes
+from .alerts import evaluate_thresholds
+from .anomalies import detect_anomalies
+from .plots import OTHER, bounded_figure, top_n
+from .allocation import allocate_quota
+from .schemas import (
+    FINAL_SKU_TABLE_SCHEMA, INVENTORY_CUBE_SCHEMA, INVENTORY_SCHEMA, MERGED_TABLE_SCHEMA, METRICS_TABLE_SCHEMA,
+    apply_schema, fill_missing, to_upc,
+)
+from .sku import TL_PREFIX_LENGTH, canonical_sku
 
+logger = logging.getLogger(__name__)
+
+MISSING_SKU = "Missing_SKU_"
+
+
+def _build_upc_sku_index(all_SKU_shopify: pd.DataFrame) -> pd.Series:
+    """Build a UPC -> SKU lookup from the Shopify catalog
+
+    Args:
+        all_SKU_shopify: Shopify catalog with SKU and UPCCODE columns
+
+    Returns:
+        pd.Series: SKU indexed by normalized UPC, first SKU kept for repeated UPCs
+    """
+    catalog = all_SKU_shopify.dropna(subset=["UPCCODE", "SKU"])
+    index = pd.Series(catalog["SKU"].values, index=to_upc(catalog["UPCCODE"]).values)
+    return index[~index.index.duplicated(keep="first")]
+
+
+def _backfill_missing_sku(merged_data: pd.DataFrame, all_SKU_shopify: pd.DataFrame) -> pd.Series:
+    """Resolve Missing_SKU_ rows through the UPC -> SKU index
+
+    UPCs that are not in the Shopify catalog keep the Missing_SKU_ placeholder, so they
+    end up in their own bucket and are reported in the log instead of failing the run.
+
+    Args:
+        merged_data: Columns UPCCODE,WAREHOUSEID,SKU,ACTUALQTY,AVAILABLE,PENDINGPICKING
+        all_SKU_shopify: Shopify catalog with SKU and UPCCODE columns
+
+    Returns:
+        pd.Series: the SKU column with missing SKUs filled in
+    """
+    sku = merged_data["SKU"]
+    missing = (sku == MISSING_SKU).to_numpy()
+    if not missing.any():
+        return sku
+
+    upc_to_sku = _build_upc_sku_index(all_SKU_shopify)
+    missing_upc = to_upc(merged_data["UPCCODE"][missing])
+    resolved = missing_upc.map(upc_to_sku)
+
+    unresolved = resolved.isna()
+    if unresolved.any():
+        logger.warning(
+            "%d %s rows have no match in all_SKU_shopify, UPCs: %s",
+            unresolved.sum(), MISSING_SKU, sorted(missing_upc[unresolved].unique()),
+        )
+
+    # resolved SKUs are not among the categories of the inventory record
+    sku = sku.astype(object)
+    sku[missing] = resolved.fillna(MISSING_SKU).to_numpy()
+    return sku.astype("category")
+
+
+@consumes("inventory")
 def preprocess_bergenInventory_products(inventory: pd.DataFrame) -> pd.DataFrame:
     
     """ Preprocess Bergen County Inventory Data 
@@ -15,19 +82,19 @@ def preprocess_bergenInventory_products(inventory: pd.DataFrame) -> pd.DataFrame
         DESCRIPTION	UPCCODE	ACTUALQTY	PENDINGPICKING	
         AVAILABLE	SKU	ACCOUNTNAME	SEASON
     Returns:
-        
+        pd.DataFrame: inventory record, see INVENTORY_SCHEMA
     """
     
     inventory.dropna(subset=["UPCCODE"], inplace=True)
     warehouse_mapping = {"Bergen Logistics NJ299": "BLNJ"}
     inventory["WAREHOUSEID"] = inventory["WAREHOUSENAME"].map(warehouse_mapping)    
     # if the sku is null then fill it
-    inventory["SKU"] = inventory["SKU"].fillna("Missing_SKU_")  
+    inventory["SKU"] = inventory["SKU"].fillna(MISSING_SKU)
     # inventory["SKU"] = inventory["SKU"].apply(lambda x: x.split("-")[0] if "-" in x else x)
         
     return_inventory = inventory[[ "UPCCODE", "WAREHOUSEID","SKU", "ACTUALQTY", "AVAILABLE", "PENDINGPICKING"]]
     
-    return return_inventory
+    return apply_schema(return_inventory, INVENTORY_SCHEMA)
 
 
 def preprocess_TL(thinkLogistics: pd.DataFrame, sku_preprocessed) -> pd.DataFrame:
@@ -51,13 +118,8 @@ def preprocess_TL(thinkLogistics: pd.DataFrame, sku_preprocessed) -> pd.DataFram
     '''
     # add a column UPCCODE and fill it using the sku_preprocessed dataframe on the SKU column
     # rename upc to UPCCODE
-    # Create a copy of the DataFrame before making changes
-    thinkLogistics_copy = thinkLogistics.copy()
-
-    # Rename columns in the copied DataFrame
-    thinkLogistics_copy.rename(columns={"StockCode": "SKU", "Available": "AVAILABLE", "OnHandQty": "ACTUALQTY", "AllocatedQty": "PENDINGPICKING"}, inplace=True)
-
-    # Now, you can use thinkLogistics_copy for further processing without raising the warning.
+    # rename returns a new frame, the selection above is not modified
+    thinkLogistics_copy = thinkLogistics.rename(columns={"StockCode": "SKU", "Available": "AVAILABLE", "OnHandQty": "ACTUALQTY", "AllocatedQty": "PENDINGPICKING"})
 
     # thinkLogistics_copy = thinkLogistics_copy[thinkLogistics_copy["InvtClass"] == 1]
     # thinkLogistics_copy.drop(columns=["InvtClass"], inplace=True)
@@ -65,14 +127,14 @@ def preprocess_TL(thinkLogistics: pd.DataFrame, sku_preprocessed) -> pd.DataFram
     # set all the WAREHOUSEID to THINKLOGISTICS
     thinkLogistics_copy["WAREHOUSEID"] = "THINKLOGISTICS"
     
-    thinkLogistics_copy["SKU"] = thinkLogistics_copy["SKU"].apply(lambda x: x[2:] if len(x) > 2 else 0)
-    thinkLogistics_copy["SKU"] = thinkLogistics_copy["SKU"].apply(lambda x: x.split("-")[0] + x.split("-")[1] if len(x.split("-")) > 2 else x.split("-")[0] )
+    thinkLogistics_copy["SKU"] = canonical_sku(thinkLogistics_copy["SKU"], prefix_length=TL_PREFIX_LENGTH)
     thinkLogistics_copy = pd.merge(thinkLogistics_copy, sku_preprocessed[['SKU', 'UPC']], on='SKU', how='left')
     thinkLogistics_copy.rename(columns={"UPC": "UPCCODE"}, inplace=True)
         
     return thinkLogistics_copy
 
 
+@consumes("tplCenter")
 def preprocess_tplCenter(tplCenter: pd.DataFrame, sku_preprocessed) -> pd.DataFrame:
     """Preprocess Think logistics Inventory Data
 
@@ -83,7 +145,7 @@ def preprocess_tplCenter(tplCenter: pd.DataFrame, sku_preprocessed) -> pd.DataFr
         Location	Primary UOM	Warehouse	 UPC
 
     Returns:
-        pd.DataFrame: dataframe
+        pd.DataFrame: inventory record, see INVENTORY_SCHEMA
     """
     tplCenter.columns = tplCenter.columns.str.strip()
      
@@ -100,9 +162,12 @@ def preprocess_tplCenter(tplCenter: pd.DataFrame, sku_preprocessed) -> pd.DataFr
     # merge["WAREHOUSEID"] = merge["facilityId"].apply(lambda x: "3PLC LA" if x == 659 else "3PLC NJ")
     
     
-    return merge[[ "WAREHOUSEID", "SKU", "AVAILABLE", "UPCCODE", "ACTUALQTY", "PENDINGPICKING"]]
+    return apply_schema(
+        merge[["UPCCODE", "WAREHOUSEID", "SKU", "ACTUALQTY", "AVAILABLE", "PENDINGPICKING"]], INVENTORY_SCHEMA
+    )
 
 
+@consumes("SKUs")
 def preprocess_sku(SKUs: pd.DataFrame) -> pd.DataFrame:
     """Preprocess SKU table
     
@@ -123,9 +188,10 @@ def preprocess_sku(SKUs: pd.DataFrame) -> pd.DataFrame:
     
     
     SKUs.dropna(subset=["UPC"], inplace=True)
-    SKUs["UPC"] = SKUs["UPC"].astype(str)
+    SKUs["UPC"] = to_upc(SKUs["UPC"])
     return SKUs
 
+@consumes("quota")
 def preprocess_quota(quota: pd.DataFrame) -> pd.DataFrame:
     """
     Normalizing the quota table; process the quota table to only have SKU and Quota columns
@@ -139,7 +205,7 @@ def preprocess_quota(quota: pd.DataFrame) -> pd.DataFrame:
     """
     # if there are two "-" in SKU, then split by "-" and take the first and second element merge them together
     # else split by "-" and take the first element
-    quota["SKU"] = quota["SKU"].apply(lambda x: x.split("-")[0] + x.split("-")[1] if len(x.split("-")) > 2 else x.split("-")[0] )
+    quota["SKU"] = canonical_sku(quota["SKU"])
     # fill the null values in Quota Amount with 0
     quota["Quota Amount"] = quota["Quota Amount"].fillna(0)
     return quota[["SKU", "Quota", "Quota Amount"]]
@@ -155,32 +221,32 @@ def merge_tables(
         tplCenter_preprocessed: Bergen County Inventory Data
         thinkLogistics:
     Returns:
-        
+        pd.DataFrame: inventory record, see INVENTORY_SCHEMA
     """
     
-    # set upccodeof tplCenter_preprocessed to str
-    tplCenter_preprocessed["UPCCODE"] = tplCenter_preprocessed["UPCCODE"].astype(str)
-    
+    # both inputs are inventory records already, UPCs are digit strings
     merged = pd.concat([
         bergenInventoryNJ_preprocessed,
         tplCenter_preprocessed,
-    ])
-   
-    # change upc to str
-    merged["UPCCODE"] = merged["UPCCODE"].astype(str)
-    # set the upccode to not have decimal points in merged
-    merged["UPCCODE"] = merged["UPCCODE"].apply(lambda x: x.split(".")[0])
+    ], ignore_index=True)
     
     # Filter UPC values that are integers and have at least 12 digits
-    merged_filtered = merged[merged["UPCCODE"].astype(str).str.match(r'^\d{12,}$')]
+    merged_filtered = merged[merged["UPCCODE"].str.fullmatch(r"\d{12,}").fillna(False).to_numpy()]
 
     # if there are repeated SKU drop one of them
     # merged_filtered.drop_duplicates(subset=["SKU"], inplace=True)
 
-    return merged_filtered
+    return apply_schema(merged_filtered, MERGED_TABLE_SCHEMA)
 
 
-def metrics(merged_data_: pd.DataFrame, retailQuot: pd.DataFrame, all_SKU_shopify) -> pd.DataFrame:
+@consumes("merged_data_")
+def metrics(
+        merged_data_: pd.DataFrame,
+        retailQuot: pd.DataFrame,
+        all_SKU_shopify,
+        warehouses: List[str] = None,
+        warehouse_priority: List[str] = None,
+) -> pd.DataFrame:
     """
     get the quota for retailers based on the quota table and see if we have enough inventory for them, then find the inventory
     that has the highest number of particular SKU
@@ -188,45 +254,43 @@ def metrics(merged_data_: pd.DataFrame, retailQuot: pd.DataFrame, all_SKU_shopif
     Args:
         mergedTable (pd.DataFrame): Columns UPCCODE,WAREHOUSEID,SKU,ACTUALQTY,AVAILABLE,PENDINGPICKING
         retailQuot (pd.DataFrame): Columns SKU,Quota
+        warehouses: warehouses to allocate from, defaults to every WAREHOUSEID in mergedTable
+        warehouse_priority: tie-breaking order when warehouses hold the same inventory
 
     Returns:
         pd.DataFrame: 
     """
     # if sku is "Missing_SKU_" then replace it with the sku from all_SKU_shopify dataframe based on the upc code
-    merged_data_["SKU"] = merged_data_.apply(lambda x: all_SKU_shopify[all_SKU_shopify["UPCCODE"] == x["UPCCODE"]]["SKU"].values[0] if x["SKU"] == "Missing_SKU_" else x["SKU"], axis=1)
+    merged_data_["SKU"] = _backfill_missing_sku(merged_data_, all_SKU_shopify)
    
     # # Merge the summary table with the retailQuot DataFrame to get the quota for each SKU
-    pivot = merged_data_.pivot_table(index=['SKU', 'UPCCODE'], columns=['WAREHOUSEID'], values='AVAILABLE', aggfunc='sum', fill_value=0)
+    pivot = merged_data_.pivot_table(index=['SKU', 'UPCCODE'], columns=['WAREHOUSEID'], values='AVAILABLE', aggfunc='sum', fill_value=0, observed=True)
+    pivot.columns = list(pivot.columns)
     pivot.reset_index(inplace=True)
+    pivot["SKU"] = pivot["SKU"].astype(object)
     merged_data = pd.merge(pivot, retailQuot, on='SKU', how='left')
     merged_data["Quota"] = merged_data["Quota"].fillna(0)
     merged_data["Quota Amount"] = merged_data["Quota Amount"].fillna(0)
 
-    
-    # set the warehouse with the highest inventory as the warehouse to fulfill the order, incase of tie, choose in the following order:  BLNJ, BLPA, TPLC, SMC
-    merged_data["Warehouse"] = merged_data[["BLNJ", "3PLC NJ","3PLC LA"]].idxmax(axis=1)
-    
-    # add 4 columns to the merged_data dataframe: "Updated_BLNJ", "Updated_BLPA", "Updated_TPLC", "Updated_SMC"
-    # based on the Warehouse column, if the warehouse is the same as the column name, then subtract the Quota Amount from the inventory 
-    # else keep the inventory the same
-    merged_data["Updated_BLNJ"] = merged_data.apply(lambda x: x["BLNJ"] - x["Quota Amount"] if x["Warehouse"] == "BLNJ" else x["BLNJ"], axis=1)
-    merged_data["Updated_3PLC NJ"] = merged_data.apply(lambda x: x["3PLC NJ"] - x["Quota Amount"] if x["Warehouse"] == "3PLC NJ" else x["3PLC NJ"], axis=1)
-    merged_data["Updated_3PLC LA"] = merged_data.apply(lambda x: x["3PLC LA"] - x["Quota Amount"] if x["Warehouse"] == "3PLC LA" else x["3PLC LA"], axis=1)
-    
-      
+    warehouses = list(warehouses or sorted(merged_data_["WAREHOUSEID"].dropna().unique()))
+    for warehouse in warehouses:
+        if warehouse not in merged_data.columns:
+            merged_data[warehouse] = 0
+
+    # set the warehouse with the highest inventory as the warehouse to fulfill the order and subtract the
+    # Quota Amount from it in the "Updated_<warehouse>" columns, in case of a tie choose by warehouse_priority
+    allocation = allocate_quota(merged_data[warehouses], merged_data["Quota Amount"], warehouses, warehouse_priority)
+    merged_data = pd.concat([merged_data, allocation], axis=1)
+
     merged_data = pd.merge(merged_data, all_SKU_shopify, on="SKU", how="outer")
     merged_data = merged_data.drop_duplicates()
 
-    merged_data['UPC'] = merged_data[['UPCCODE_x', 'UPCCODE_y']].apply(lambda row: row.dropna().iloc[0], axis=1)
+    merged_data['UPC'] = to_upc(merged_data['UPCCODE_x']).combine_first(to_upc(merged_data['UPCCODE_y'])).fillna("0")
     merged_data.drop(['UPCCODE_x', 'UPCCODE_y'], axis=1, inplace=True)
-    
-    merged_data["Total Inventory"] = merged_data["BLNJ"] + merged_data["3PLC NJ"] + merged_data["3PLC LA"]
-    merged_data["Total Available"] = merged_data["Updated_3PLC NJ"] + merged_data["Updated_BLNJ"]  + merged_data["Updated_3PLC LA"]
-    
 
     merged_data.fillna(0, inplace=True)
     
-    return merged_data
+    return apply_schema(merged_data, METRICS_TABLE_SCHEMA)
 
 
 def experiment_metrics(metrics_table: pd.DataFrame): 
@@ -234,38 +298,189 @@ def experiment_metrics(metrics_table: pd.DataFrame):
     return metrics_table[["Product Description", "Total Inventory"]].set_index("Product Description").to_dict()["Total Inventory"]
 
 
-def add_product_name_SKU(merged_data: pd.DataFrame, skus: pd.DataFrame, retailPrice: pd.DataFrame) -> pd.DataFrame:
+def add_product_name_SKU(
+        merged_data: pd.DataFrame,
+        skus: pd.DataFrame,
+        retailPrice: pd.DataFrame,
+        warehouses: List[str] = None,
+) -> pd.DataFrame:
     """Add the product name to the merged_data dataframe
     Args:
         merged_data : merged_data
         skus: skus dataframe
+        warehouses: warehouse columns to keep, in order
         
     Returns:
         merged_data: merged_data with product name added
         
     """
+    warehouses = list(warehouses or ["BLNJ", "3PLC LA", "3PLC NJ"])
     skus = skus[["SKU", "Product Description", "Collection", "Color", "Size (Inch)", "Weight (lbs)"]]
     merged_data = pd.merge(merged_data, skus, on="SKU", how="left")
     merged_data = pd.merge(merged_data, retailPrice, on="SKU", how="left")
-    merged_data.fillna(0, inplace=True)
-    return merged_data[["SKU", "UPC","Color", "Size (Inch)", "Weight (lbs)", "Product Description","Collection", "BLNJ", "3PLC LA","3PLC NJ", "Quota", "Total Inventory", "Quota Amount", "Warehouse", "Updated_BLNJ", "Updated_3PLC LA","Updated_3PLC NJ",  "Total Available", "Cost"]]
+    # the SKU attributes are categoricals when the catalog loaded them from a file
+    merged_data = fill_missing(merged_data, 0)
+    final_SKU_table = merged_data[
+        ["SKU", "UPC", "Color", "Size (Inch)", "Weight (lbs)", "Product Description", "Collection"]
+        + warehouses
+        + ["Quota", "Total Inventory", "Quota Amount", "Warehouse"]
+        + [f"Updated_{w}" for w in warehouses]
+        + ["Total Available", "Cost"]
+    ]
+    return apply_schema(final_SKU_table, FINAL_SKU_TABLE_SCHEMA)
+
+
+def export_final_SKU_table(final_SKU_table: pd.DataFrame) -> pd.DataFrame:
+    """Export the final SKU table as the Excel file uploaded to Google Drive
+
+    Args:
+        final_SKU_table: final_SKU_table
+
+    Returns:
+        final_SKU_table: unchanged, the catalog writes it as xlsx
+    """
+    return final_SKU_table
 
 def total_inventory(final_SKU_table: pd.DataFrame) -> pd.DataFrame:
-    # deep copy the final_SKU_table
-    new_table = final_SKU_table.copy(deep=True)
-    new_table["Date"] = datetime.datetime.now().strftime("%m/%d/%Y")
-    return new_table[["SKU", "Total Available", "Collection", "Date", "Color", "Weight (lbs)"]] 
+    """Today's total available inventory of every SKU
+
+    Args:
+        final_SKU_table: final_SKU_table
+
+    Returns:
+        pd.DataFrame: Columns SKU,Total Available,Collection,Date,Color,Weight (lbs), the
+        columns taken from final_SKU_table without copying the table
+    """
+    return pd.DataFrame({
+        "SKU": final_SKU_table["SKU"],
+        "Total Available": final_SKU_table["Total Available"],
+        "Collection": final_SKU_table["Collection"],
+        "Date": datetime.datetime.now().strftime("%m/%d/%Y"),
+        "Color": final_SKU_table["Color"],
+        "Weight (lbs)": final_SKU_table["Weight (lbs)"],
+    }, copy=False)
+
+
+def append_inventory_history(total_inventory: pd.DataFrame) -> pd.DataFrame:
+    """Append today's totals to the local time series
+
+    Args:
+        total_inventory: Columns SKU,Total Available,Collection,Date,Color,Weight (lbs)
+
+    Returns:
+        total_inventory: unchanged, the dataset stores it as the partition of its Date
+    """
+    return total_inventory
+
+
+def export_inventory_history(total_inventory_history: pd.DataFrame) -> pd.DataFrame:
+    """Export the kept days of the time series as the workbook mirrored to Google Sheets
+
+    Args:
+        total_inventory_history: every kept day, oldest first
+
+    Returns:
+        total_inventory_history: unchanged, the catalog writes it as xlsx
+    """
+    return total_inventory_history
+
+
+def inventory_snapshot(final_SKU_table: pd.DataFrame, warehouses: List[str] = None) -> pd.DataFrame:
+    """Available inventory of every SKU in every warehouse, one row per pair
+
+    Args:
+        final_SKU_table: final_SKU_table
+        warehouses: warehouses with an Updated_<warehouse> column
+
+    Returns:
+        pd.DataFrame: Columns Date,SKU,Collection,Warehouse,Available
+    """
+    warehouses = list(warehouses or ["BLNJ", "3PLC LA", "3PLC NJ"])
+    snapshot = final_SKU_table.melt(
+        id_vars=["SKU", "Collection"],
+        value_vars=[f"Updated_{w}" for w in warehouses],
+        var_name="Warehouse",
+        value_name="Available",
+    )
+    snapshot["Warehouse"] = snapshot["Warehouse"].str.slice(len("Updated_"))
+    snapshot.insert(0, "Date", datetime.datetime.now().strftime("%m/%d/%Y"))
+    return snapshot
+
+
+def append_inventory_snapshot(inventory_snapshot: pd.DataFrame) -> pd.DataFrame:
+    """Append today's snapshot to the local snapshot history
+
+    Args:
+        inventory_snapshot: Columns Date,SKU,Collection,Warehouse,Available
+
+    Returns:
+        inventory_snapshot: unchanged, the dataset stores it as the partition of its Date
+    """
+    return inventory_snapshot
+
+
+def inventory_alerts(inventory_snapshot_history: pd.DataFrame, alert_thresholds: dict) -> list:
+    """Day-over-day changes of the available inventory that reach their threshold
+
+    Args:
+        inventory_snapshot_history: the last two days of snapshots
+        alert_thresholds: absolute delta per level, see parameters/inventory.yml
+
+    Returns:
+        list: one dict per alert, see alerts.evaluate_thresholds
+    """
+    alerts = evaluate_thresholds(inventory_snapshot_history, alert_thresholds or {})
+    logger.info("%d inventory alerts", len(alerts))
+    return alerts
+
+
+def inventory_anomalies(inventory_snapshot_history: pd.DataFrame, anomaly_detection: dict) -> pd.DataFrame:
+    """Ranked outliers of today's available inventory per SKU and warehouse
+
+    Args:
+        inventory_snapshot_history: every stored day of snapshots
+        anomaly_detection: z_threshold, min_history and max_rows, see parameters/inventory.yml
+
+    Returns:
+        pd.DataFrame: Columns Rank,Date,SKU,Collection,Warehouse,Available,Median,MAD,Score,History
+    """
+    anomalies = detect_anomalies(inventory_snapshot_history, **(anomaly_detection or {}))
+    logger.info("%d inventory anomalies", len(anomalies))
+    return anomalies
+
+
+def inventory_cube(merged_data: pd.DataFrame, metrics_table: pd.DataFrame, skus: pd.DataFrame) -> pd.DataFrame:
+    """Available inventory and allocated quota per warehouse and SKU, read by every plot
+
+    Args:
+        merged_data: Columns UPCCODE,WAREHOUSEID,SKU,ACTUALQTY,AVAILABLE,PENDINGPICKING
+        metrics_table: metrics_table, its quota is counted in the warehouse it is allocated to
+        skus: SKUs_preprocessed, first Collection and Product Description of every SKU
+
+    Returns:
+        pd.DataFrame: see INVENTORY_CUBE_SCHEMA
+    """
+    available = merged_data.groupby(["WAREHOUSEID", "SKU"], observed=True)["AVAILABLE"].sum()
+    quota = metrics_table[metrics_table["Quota Amount"] > 0]
+    quota = quota.groupby([quota["Warehouse"].rename("WAREHOUSEID"), "SKU"], observed=True)["Quota Amount"].sum()
+    # SKU categories differ between the two tables, the keys are aligned as text
+    available.index = available.index.set_levels([level.astype(str) for level in available.index.levels])
+    quota.index = quota.index.set_levels([level.astype(str) for level in quota.index.levels])
+
+    cube = pd.concat([available, quota], axis=1).fillna(0).reset_index()
+    attributes = skus.drop_duplicates(subset=["SKU"])[["SKU", "Collection", "Product Description"]]
+    cube = cube.merge(attributes.astype({"SKU": str}), on="SKU", how="left")
+    return apply_schema(cube[list(INVENTORY_CUBE_SCHEMA)], INVENTORY_CUBE_SCHEMA)
+
 
 # -------------------------  Plotting Functions ------------------------- #
 
 
-def barplot_of_available_inventory_per_warehouse(merged_data: pd.DataFrame) ->plt:
+def barplot_of_available_inventory_per_warehouse(inventory_cube: pd.DataFrame) ->plt:
     """Create a bar plot of the experiment metrics
     
     Args:
-        experiment_metrics : merged_data
-        UPCCODE,WAREHOUSEID,SKU,ACTUALQTY,AVAILABLE,PENDINGPICKING
-
+        inventory_cube: see INVENTORY_CUBE_SCHEMA
         
     Returns:
         plt: bar plot with warehouse as x-axis and total available quantity as y-axis
@@ -273,69 +488,63 @@ def barplot_of_available_inventory_per_warehouse(merged_data: pd.DataFrame) ->pl
     """
     
     # get the total available quantity for each warehouse
-    warehouse_available = merged_data.groupby("WAREHOUSEID")["AVAILABLE"].sum().reset_index()
+    warehouse_available = inventory_cube.groupby("WAREHOUSEID", observed=True)["AVAILABLE"].sum().reset_index()
     warehouse_available.rename(columns={"AVAILABLE": "Total Available"}, inplace=True)
-    # warehouse_available["Total Available"] = warehouse_available["Total Available"].apply(lambda x: math.ceil(x))
     warehouse_available.sort_values(by="Total Available", ascending=False, inplace=True)
-    warehouse_available["WAREHOUSEID"] = warehouse_available["WAREHOUSEID"].apply(lambda x: x.upper())
+    warehouse_available["WAREHOUSEID"] = warehouse_available["WAREHOUSEID"].astype(str).str.upper()
     
     # plot the bar plot
     plt = px.bar(warehouse_available, x="WAREHOUSEID", y="Total Available", color="WAREHOUSEID", title="Total Available Quantity for Each Warehouse")
     return plt
    
    
-def quota_barplot(merged_data: pd.DataFrame, skus) ->plt:
+def quota_barplot(inventory_cube: pd.DataFrame, plot_options: dict = None) ->plt:
     """Create a bar plot of the total quota for each SKU
     Args:
-        experiment_metrics : merged_data
-        SKU,BLNJ,SMC,TPLC,Quota,Total Inventory,Quota Amount,Warehouse
-
+        inventory_cube: see INVENTORY_CUBE_SCHEMA
+        plot_options: top_n and max_bytes, see parameters/inventory.yml
         
     Returns:
-        plt: bar plot with warehouse as x-axis and total available quantity as y-axis
+        plt: bar plot with SKU as x-axis and total quota as y-axis, SKUs beyond top_n summed
+        in "Other"
         
     """
     
     # get the total quota for each SKU
-    warehouse = merged_data.groupby("SKU")["Quota Amount"].sum().reset_index()
+    warehouse = inventory_cube.groupby("SKU", observed=True)["Quota Amount"].sum().reset_index()
     warehouse.rename(columns={"Quota Amount": "Total Quota"}, inplace=True)
-    warehouse.sort_values(by="Total Quota", ascending=False, inplace=True)
-    
     warehouse_with_quota = warehouse[warehouse["Total Quota"] > 0]
     
-    # plot the bar plot with highest 10 quota
-    plt = px.bar(warehouse_with_quota, x="SKU", y="Total Quota",   title="Quota for each SKU")
-    
+    def build(n):
+        bars = top_n(warehouse_with_quota, "SKU", "Total Quota", n)
+        return px.bar(bars, x="SKU", y="Total Quota", title="Quota for each SKU")
     
-    return plt
+    return bounded_figure(build, **(plot_options or {}))
 
 
-def SKU_barplot(final_SKU_table: pd.DataFrame) ->plt:
-    """Create a bar plot of the total quota for each SKU
+def SKU_barplot(inventory_cube: pd.DataFrame, plot_options: dict = None) ->plt:
+    """Create a bar plot of the total inventory for each SKU
     Args:
-        experiment_metrics : merged_data
-        SKU,BLNJ,SMC,TPLC,Quota,Total Inventory,Quota Amount,Warehouse
-
+        inventory_cube: see INVENTORY_CUBE_SCHEMA
+        plot_options: top_n and max_bytes, see parameters/inventory.yml
         
     Returns:
-        plt: bar plot with warehouse as x-axis and total available quantity as y-axis
+        plt: bar plot with SKU as x-axis and available quantity as y-axis, SKUs beyond top_n
+        summed in "Other"
         
     """
     
-    # get the total quota for each SKU and the Product Description
-    warehouse = final_SKU_table.groupby("SKU").agg({"Total Inventory": "sum", "Product Description": "first"}).reset_index()
-    # warehouse.rename(columns={"Total Inventory": "Total Inventory"}, inplace=True)
-    # warehouse.sort_values(by="Total Inventory", ascending=False, inplace=True)
-    
-    
-    
-    # plot the bar plot but get the Product Name instead of SKU, product name is on the skus dataframe 
-    # warehouse = pd.merge(warehouse, skus, on="SKU", how="left")
-    # plot the bar plot with highest 10 quota
-    plt = px.bar(warehouse, x="SKU", y="Total Inventory", color="Product Description", title="SKUs with highest inventory (10)")
+    # get the total inventory for each SKU and the Product Description
+    warehouse = inventory_cube.groupby(["SKU", "Product Description"], observed=True)["AVAILABLE"].sum().reset_index()
+    warehouse.rename(columns={"AVAILABLE": "Total Inventory"}, inplace=True)
+    descriptions = pd.Series(warehouse["Product Description"].astype(str).to_numpy(), index=warehouse["SKU"].astype(str))
     
+    def build(n):
+        bars = top_n(warehouse, "SKU", "Total Inventory", n)
+        bars["Product Description"] = bars["SKU"].map(descriptions).fillna(OTHER)
+        return px.bar(bars, x="SKU", y="Total Inventory", color="Product Description", title="SKUs with highest inventory")
     
-    return plt
+    return bounded_figure(build, **(plot_options or {}))
 
 
 def SKU_PA_barplot(final_SKU_table: pd.DataFrame) ->plt:
@@ -366,21 +575,21 @@ def SKU_PA_barplot(final_SKU_table: pd.DataFrame) ->plt:
     return plt
 
 
-def stacked_barplot(merged_data, skus):
-    """_summary_
+def stacked_barplot(inventory_cube: pd.DataFrame, plot_options: dict = None) ->plt:
+    """Create a stacked bar plot of the available inventory of every product per warehouse
 
     Args:
-        merged_data (_Collection_): columns: UPCCODE,WAREHOUSEID,SKU,ACTUALQTY,AVAILABLE,PENDINGPICKING
+        inventory_cube: see INVENTORY_CUBE_SCHEMA
+        plot_options: top_n and max_bytes, see parameters/inventory.yml
 
+    Returns:
+        plt: bar plot with product description as x-axis and one segment per warehouse,
+        products beyond top_n summed in "Other"
     """
-    # plt = px.bar(merged_data, x="SKU", y="AVAILABLE", color="WAREHOUSEID", barmode="stack")
+    products = inventory_cube.groupby(["Product Description", "WAREHOUSEID"], observed=True)["AVAILABLE"].sum().reset_index()
 
-    # merge the data with the skus dataframe to get the product description
-    merged_data = pd.merge(merged_data, skus, on="SKU", how="left")
-    # merged_data.dropna(subset=["Collection_y"], inplace=True)
-    # merged_data = merged_data[merged_data["Collection_y"] != 0]
- 
-    plt = px.bar(merged_data, x=merged_data[ "Product Description" ], y="AVAILABLE", color="WAREHOUSEID", barmode="stack", title="Inventory in each warehouse")
-    # q: change the x-axis to product description and Collection_y and y to AVAILABLE and color to WAREHOUSEID
-    return plt
+    def build(n):
+        bars = top_n(products, "Product Description", "AVAILABLE", n, by=["WAREHOUSEID"])
+        return px.bar(bars, x="Product Description", y="AVAILABLE", color="WAREHOUSEID", barmode="stack", title="Inventory in each warehouse")
 
+    return bounded_figure(build, **(plot_options or {}))
@@ -1,8 +1,12 @@
 from kedro.pipeline import Pipeline, node, pipeline
 
-from .nodes import add_product_name_SKU, barplot_of_available_inventory_per_warehouse, experiment_metrics, \
-    merge_tables, metrics, preprocess_bergenInventory_products, preprocess_quota, preprocess_sku, \
-    preprocess_tplCenter, quota_barplot, stacked_barplot, total_inventory
+from .nodes import (
+    add_product_name_SKU, append_inventory_history, append_inventory_snapshot,
+    barplot_of_available_inventory_per_warehouse, experiment_metrics, export_final_SKU_table,
+    export_inventory_history, inventory_alerts, inventory_anomalies, inventory_cube, inventory_snapshot,
+    merge_tables, metrics, preprocess_bergenInventory_products, preprocess_quota, preprocess_sku,
+    preprocess_tplCenter, quota_barplot, stacked_barplot, total_inventory,
+)
 
 
 # SKU_NJ_barplot, SKU_PA_barplot, SKU_TPLC_barplot,
@@ -41,7 +45,8 @@ def create_pipeline(**kwargs) -> Pipeline:
         ),
         node(
             func=metrics,
-            inputs=["merged_table", "retailQuota_preprocessed", "all_SKU_shopify"],
+            inputs=["merged_table", "retailQuota_preprocessed", "all_SKU_shopify", "params:warehouses",
+                    "params:warehouse_priority"],
             outputs="metrics_table",
             name="metrics_node",
         ),
@@ -52,28 +57,40 @@ def create_pipeline(**kwargs) -> Pipeline:
             name="experiment_metrics_node",    
         ),
        
+        node(
+            func=inventory_cube,
+            inputs=["merged_table", "metrics_table", "SKUs_preprocessed"],
+            outputs="inventory_cube",
+            name="inventory_cube_node",
+        ),
         node(
             func=barplot_of_available_inventory_per_warehouse,
-            inputs=["merged_table"],
+            inputs=["inventory_cube"],
             outputs="barplot_of_available_inventory_per_warehouse",
             name="warehouse_available_barplot_node",
         ),
         
         node(
             func=quota_barplot,
-            inputs=["metrics_table", "SKUs_preprocessed"],
+            inputs=["inventory_cube", "params:plot_options"],
             outputs="quota_barplot",
             name="quota_barplot",
         ),
         node(
             func=add_product_name_SKU,
-            inputs=["metrics_table", "SKUs_preprocessed", "retailPrice"],
+            inputs=["metrics_table", "SKUs_preprocessed", "retailPrice", "params:warehouses"],
             outputs="final_SKU_table",
             name="add_product_name_SKU_node",
         ),
+        node(
+            func=export_final_SKU_table,
+            inputs=["final_SKU_table"],
+            outputs="final_SKU_table_export",
+            name="export_final_SKU_table_node",
+        ),
         node(
             func=stacked_barplot,
-            inputs=["merged_table", "SKUs_preprocessed"],
+            inputs=["inventory_cube", "params:plot_options"],
             outputs="stacked_barplot_for_sku",
             name="stacked_barplot_node",
         ),
@@ -82,7 +99,43 @@ def create_pipeline(**kwargs) -> Pipeline:
             inputs=["final_SKU_table"],
             outputs="total_inventory",
             name="total_inventory_node",
-        )
+        ),
+        node(
+            func=append_inventory_history,
+            inputs=["total_inventory"],
+            outputs="total_inventory_history",
+            name="append_inventory_history_node",
+        ),
+        node(
+            func=export_inventory_history,
+            inputs=["total_inventory_history"],
+            outputs="total_inventory_history_export",
+            name="export_inventory_history_node",
+        ),
+        node(
+            func=inventory_snapshot,
+            inputs=["final_SKU_table", "params:warehouses"],
+            outputs="inventory_snapshot",
+            name="inventory_snapshot_node",
+        ),
+        node(
+            func=append_inventory_snapshot,
+            inputs=["inventory_snapshot"],
+            outputs="inventory_snapshot_history@all",
+            name="append_inventory_snapshot_node",
+        ),
+        node(
+            func=inventory_alerts,
+            inputs=["inventory_snapshot_history@recent", "params:alert_thresholds"],
+            outputs="inventory_alerts",
+            name="inventory_alerts_node",
+        ),
+        node(
+            func=inventory_anomalies,
+            inputs=["inventory_snapshot_history@all", "params:anomaly_detection"],
+            outputs="inventory_anomalies",
+            name="inventory_anomalies_node",
+        ),
         #  node(
         #     func=test, 
         #     inputs=["bergenInventoryPAAPI"],
@@ -0,0 +1,90 @@
+"""Size bounds of the plotly figures written to ``data/08_reporting``.
+
+Plots over SKUs or products keep the ``top_n`` largest categories and sum the others into
+one "Other" bar, so the number of bars does not grow with the catalog. Values are passed
+to plotly as NumPy arrays, which plotly serializes as binary typed arrays instead of JSON
+numbers. A figure larger than ``max_bytes`` is rebuilt with half as many bars.
+"""
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+OTHER = "Other"
+
+DEFAULT_TOP_N = 25
+DEFAULT_MAX_BYTES = 500_000
+
+
+def top_n(
+        frame: pd.DataFrame,
+        category: str,
+        value: str,
+        n: int,
+        by: Optional[List[str]] = None,
+        other_label: str = OTHER,
+) -> pd.DataFrame:
+    """Keep the n categories with the largest total and sum the others into one
+
+    Args:
+        frame: one row per category, or per category and ``by`` values
+        category: column holding the categories, e.g. SKU or Product Description
+        value: column summed to rank the categories
+        n: number of categories kept
+        by: other key columns, kept apart in the "Other" rows, e.g. the warehouse
+        other_label: category of the summed rows
+
+    Returns:
+        pd.DataFrame: category, ``by`` and value columns, kept categories ordered by their
+        total, the "Other" rows last. Category and key columns are strings
+    """
+    by = list(by or [])
+    frame = frame[[category] + by + [value]].astype({key: str for key in [category] + by})
+    totals = frame.groupby(category, sort=False)[value].sum()
+    kept = totals.nlargest(n).index if n is not None else totals.index
+    is_kept = frame[category].isin(kept).to_numpy()
+
+    top = frame[is_kept]
+    rank = pd.Series(np.arange(len(kept)), index=kept)
+    top = top.iloc[np.argsort(rank.loc[top[category]].to_numpy(), kind="stable")]
+    rest = frame[~is_kept]
+    if rest.empty:
+        return top.reset_index(drop=True)
+    other = rest.groupby(by, sort=False)[value].sum().reset_index() if by else pd.DataFrame({value: [rest[value].sum()]})
+    other.insert(0, category, other_label)
+    return pd.concat([top, other[top.columns]], ignore_index=True)
+
+
+def figure_size(fig: go.Figure) -> int:
+    """Bytes of the figure once written as JSON"""
+    return len(fig.to_json().encode("utf-8"))
+
+
+def bounded_figure(
+        build: Callable[[int], go.Figure],
+        top_n: int = DEFAULT_TOP_N,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+) -> go.Figure:
+    """Build a figure that fits in max_bytes
+
+    Args:
+        build: builds the figure with the given number of categories
+        top_n: number of categories tried first
+        max_bytes: largest JSON size allowed
+
+    Returns:
+        go.Figure: the figure with the most categories, at most top_n, that fits
+
+    Raises:
+        ValueError: the figure does not fit even with a single category
+    """
+    n = max(int(top_n), 1)
+    while True:
+        fig = build(n)
+        size = figure_size(fig)
+        if size <= max_bytes:
+            return fig
+        if n == 1:
+            raise ValueError(f"The figure takes {size} bytes with one category, more than {max_bytes}")
+        n //= 2
@@ -0,0 +1,133 @@
+"""Column types of the inventory records and of the tables persisted as Parquet.
+
+Every warehouse inventory is brought to ``INVENTORY_SCHEMA`` once, in its preprocess
+node, and Parquet keeps those types between nodes, so later nodes do not cast again.
+UPC codes are digit strings, never floats, SKUs and warehouses are categoricals and
+quantities are int32.
+"""
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+# pseudo dtype of UPC codes, digit strings whatever type they were read as
+UPC = "upc"
+QUANTITY = "int32"
+
+INVENTORY_SCHEMA = {
+    "UPCCODE": UPC,
+    "WAREHOUSEID": "category",
+    "SKU": "category",
+    "ACTUALQTY": QUANTITY,
+    "AVAILABLE": QUANTITY,
+    "PENDINGPICKING": QUANTITY,
+}
+
+MERGED_TABLE_SCHEMA = INVENTORY_SCHEMA
+
+# one row per warehouse and SKU, the plots only group these rows
+INVENTORY_CUBE_SCHEMA = {
+    "WAREHOUSEID": "category",
+    "SKU": "category",
+    "Collection": "category",
+    "Product Description": "category",
+    "AVAILABLE": "int64",
+    "Quota Amount": "float64",
+}
+
+METRICS_TABLE_SCHEMA = {
+    "SKU": "string",
+    "UPC": UPC,
+    "Warehouse": "string",
+    "Quota": "float64",
+    "Quota Amount": "float64",
+    "Total Inventory": "float64",
+    "Total Available": "float64",
+}
+
+FINAL_SKU_TABLE_SCHEMA = {
+    **METRICS_TABLE_SCHEMA,
+    "Product Description": "string",
+    "Collection": "string",
+    "Color": "string",
+}
+
+
+def to_upc(values: pd.Series) -> pd.Series:
+    """Convert UPC codes read as int, float or text to digit strings
+
+    Args:
+        values: UPC codes
+
+    Returns:
+        pd.Series: UPC codes as strings without a decimal part, missing codes stay NA
+    """
+    if pd.api.types.is_float_dtype(values):
+        # the decimal part is dropped, as the text conversion below does
+        values = np.trunc(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype("Int64").astype("string")
+    return values.astype("string").str.strip().str.replace(r"\.\d*$", "", regex=True)
+
+
+def _mixed_types(values: pd.Series) -> bool:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.categories.map(type).nunique() > 1
+    return values.dtype == object and values.map(type).nunique() > 1
+
+
+def fill_missing(data: pd.DataFrame, value: Any) -> pd.DataFrame:
+    """fillna that also fills the categorical columns
+
+    ``DataFrame.fillna`` raises on a categorical column when value is not one of its
+    categories, value is added to the categories of the columns with missing values.
+
+    Args:
+        data: the table to fill
+        value: the value of the missing cells
+
+    Returns:
+        pd.DataFrame: a new table without missing values
+    """
+    categorical = [column for column, values in data.items() if isinstance(values.dtype, pd.CategoricalDtype)]
+    filled = data.fillna({column: value for column in data.columns if column not in categorical})
+    for column in categorical:
+        values = filled[column]
+        # fillna validates value even when nothing is missing
+        if values.hasnans:
+            if value not in values.cat.categories:
+                values = values.cat.add_categories([value])
+            filled[column] = values.fillna(value)
+    return filled
+
+
+def apply_schema(data: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """Cast a table to its schema before it is persisted
+
+    Columns of the schema are cast to their type, missing integers count as 0. Other
+    text and categorical columns mixing strings and numbers, which Parquet cannot store,
+    become strings.
+
+    Args:
+        data: the table to persist
+        schema: column name to pandas dtype
+
+    Returns:
+        pd.DataFrame: the table with its columns cast
+    """
+    casts = {}
+    for column in data.columns:
+        dtype = schema.get(column)
+        values = data[column]
+        if dtype is None and not _mixed_types(values):
+            continue
+        if dtype == values.dtype:
+            continue
+        if dtype == UPC:
+            casts[column] = to_upc(values)
+        elif dtype in ("string", "category") or dtype is None:
+            casts[column] = values.astype(dtype or "string")
+        else:
+            numbers = pd.to_numeric(values, errors="coerce")
+            casts[column] = (numbers.fillna(0) if dtype.startswith("int") else numbers).astype(dtype)
+    return data.assign(**casts) if casts else data
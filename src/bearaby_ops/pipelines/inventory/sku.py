@@ -0,0 +1,73 @@
+"""Canonical SKUs shared by the preprocess nodes.
+
+Warehouses and the quota sheet spell SKUs with size or variant suffixes, ``NAP-GR-15``
+is the SKU ``NAPGR`` and ``NAP001-A`` is ``NAP001``, ThinkLogistics stock codes also
+carry a 2 character account prefix. The rules run as vectorized string
+operations on the distinct raw SKUs only, and canonical forms are memoized so the same
+raw SKU is not parsed again by the next node of the run.
+"""
+import threading
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# first part, followed by the second one when there are at least two dashes
+SKU_PATTERN = r"^(?P<base>[^-]*)(?:-(?P<variant>[^-]*)-)?"
+
+# ThinkLogistics prefixes its stock codes with a 2 character account code
+TL_PREFIX_LENGTH = 2
+
+# bound on the memoized raw SKUs, the cache is emptied when it is reached
+MAX_CACHED_SKUS = 1_000_000
+
+_cache: Dict[int, Dict[str, str]] = {}
+_cache_lock = threading.Lock()
+
+
+def _canonicalize_unique(raw: pd.Series, prefix_length: int) -> pd.Series:
+    if prefix_length:
+        # codes too short to carry the prefix have no SKU
+        raw = raw.str.slice(prefix_length).where(raw.str.len() > prefix_length)
+    parts = raw.str.extract(SKU_PATTERN)
+    return parts["base"] + parts["variant"].fillna("")
+
+
+def canonical_sku(skus: pd.Series, prefix_length: int = 0) -> pd.Series:
+    """Canonical form of raw SKUs
+
+    ``A-B-C`` becomes ``AB``, ``A-B`` becomes ``A`` and ``A`` stays ``A``. Missing SKUs
+    stay missing.
+
+    Args:
+        skus: raw SKUs
+        prefix_length: characters of an account prefix dropped first, codes that are
+            not longer than the prefix become missing
+
+    Returns:
+        pd.Series: canonical SKUs, on the index of ``skus``
+    """
+    codes, uniques = pd.factorize(skus)
+    uniques = pd.Series(uniques, dtype=object).astype(str)
+
+    with _cache_lock:
+        cache = _cache.setdefault(prefix_length, {})
+        canonical = uniques.map(cache).astype(object)
+    unseen = canonical.isna().to_numpy()
+    if unseen.any():
+        computed = _canonicalize_unique(uniques[unseen], prefix_length)
+        canonical[unseen] = computed.to_numpy()
+        with _cache_lock:
+            if len(cache) + len(computed) > MAX_CACHED_SKUS:
+                cache.clear()
+            cache.update(zip(uniques[unseen], computed))
+
+    # factorize codes missing values as -1, they are taken from the appended NaN
+    values = np.append(canonical.to_numpy(dtype=object), np.nan)
+    return pd.Series(values[codes], index=skus.index, name=skus.name)
+
+
+def clear_cache() -> None:
+    """Forget the memoized canonical SKUs"""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,234 @@
+"""Per-node and per-dataset performance trace of every pipeline run.
+
+``ProfilingHooks`` appends one JSON line per node run, dataset load, dataset save and
+pipeline run to a JSONL file next to the kedro-viz session store. Node lines hold the
+wall time, the CPU time of the thread running the node, the growth of the peak RSS of the
+process and the rows and bytes of the inputs and outputs; dataset lines the time and the
+size of the data. Every line carries the session id, so the lines of one run can be
+grouped.
+
+The peak RSS is the process's: under ThreadRunner the ``peak_rss_delta_bytes`` of a node
+includes the memory of the nodes running next to it.
+
+Nodes named in ``profile_nodes`` also run under cProfile, their stats are dumped to
+``<profile_dir>/<session id>_<node name>.prof`` for ``python -m pstats`` or snakeviz.
+"""
+import cProfile
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+from kedro.framework.hooks import hook_impl
+from kedro.pipeline.node import Node
+
+try:
+    import resource
+except ImportError:  # not available on Windows, peak RSS is then not recorded
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+NODE = "node"
+LOAD = "load"
+SAVE = "save"
+RUN = "run"
+
+
+def peak_rss() -> Optional[int]:
+    """Peak resident memory of the process in bytes, None when it cannot be read"""
+    if resource is None:
+        return None
+    # Linux reports kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def data_size(data: Any, deep: bool = False) -> Dict[str, Optional[int]]:
+    """Rows and bytes of a dataset
+
+    Args:
+        data: the loaded or saved data
+        deep: count the bytes of the Python strings of object columns, slower on large frames
+
+    Returns:
+        Dict[str, Optional[int]]: rows and bytes, None for the data that is not a frame or
+        a series
+    """
+    if isinstance(data, pd.DataFrame):
+        return {"rows": len(data), "bytes": int(data.memory_usage(index=True, deep=deep).sum())}
+    if isinstance(data, pd.Series):
+        return {"rows": len(data), "bytes": int(data.memory_usage(index=True, deep=deep))}
+    if isinstance(data, (list, dict)):
+        return {"rows": len(data), "bytes": None}
+    return {"rows": None, "bytes": None}
+
+
+def _sizes(datasets: Dict[str, Any], deep: bool) -> Dict[str, Dict[str, Optional[int]]]:
+    return {name: data_size(data, deep) for name, data in datasets.items()}
+
+
+def _total(sizes: Dict[str, Dict[str, Optional[int]]], key: str) -> int:
+    return sum(size[key] or 0 for size in sizes.values())
+
+
+class ProfilingHooks:
+    """Records the performance trace of every run
+
+    Attributes:
+        path: JSONL file the records are appended to
+        profile_nodes: names of the nodes run under cProfile
+        profile_dir: folder of the cProfile stats
+        deep: count the bytes of the strings of object columns
+    """
+
+    def __init__(
+            self,
+            path: str,
+            profile_nodes: Iterable[str] = (),
+            profile_dir: str = None,
+            deep: bool = False,
+    ):
+        self.path = path
+        self.profile_nodes = set(profile_nodes)
+        self.profile_dir = profile_dir or os.path.join(os.path.dirname(os.path.abspath(path)), "profiles")
+        self.deep = deep
+        self._session_id = None
+        self._run_start = None
+        self._nodes: Dict[Any, Dict[str, Any]] = {}
+        self._loads: Dict[Any, float] = {}
+        self._saves: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        record = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "session_id": self._session_id,
+            "pid": os.getpid(),
+            **record,
+        }
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                # one write per line in append mode, so processes of a ParallelRunner do
+                # not interleave their records
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError as error:
+                logger.warning("The profiling record could not be written to %s: %s", self.path, error)
+
+    @staticmethod
+    def _key(name: str):
+        return name, threading.get_ident()
+
+    @hook_impl
+    def before_pipeline_run(self, run_params: Dict[str, Any]) -> None:
+        self._session_id = run_params.get("session_id")
+        self._run_start = (time.perf_counter(), time.process_time(), peak_rss())
+
+    @hook_impl
+    def after_pipeline_run(self, run_params: Dict[str, Any]) -> None:
+        if self._run_start is None:
+            return
+        wall, cpu, rss = self._run_start
+        self._write({
+            "event": RUN,
+            "name": run_params.get("pipeline_name") or "__default__",
+            "wall_seconds": time.perf_counter() - wall,
+            "cpu_seconds": time.process_time() - cpu,
+            "peak_rss_bytes": peak_rss(),
+            "peak_rss_delta_bytes": None if rss is None else peak_rss() - rss,
+        })
+
+    @hook_impl
+    def before_node_run(self, node: Node, inputs: Dict[str, Any], session_id: str) -> None:
+        self._session_id = self._session_id or session_id
+        profiler = None
+        if node.name in self.profile_nodes:
+            profiler = cProfile.Profile()
+        state = {
+            "inputs": _sizes(inputs, self.deep),
+            "peak_rss": peak_rss(),
+            "profiler": profiler,
+            # the node's thread only, ThreadRunner runs other nodes in the same process
+            "cpu": time.thread_time(),
+        }
+        self._nodes[self._key(node.name)] = state
+        state["wall"] = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+
+    def _finish_node(self, node: Node, outputs: Dict[str, Any], error: Exception = None) -> None:
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        state = self._nodes.pop(self._key(node.name), None)
+        if state is None:
+            return
+        profile = None
+        if state["profiler"] is not None:
+            state["profiler"].disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profile = os.path.join(self.profile_dir, f"{self._session_id}_{node.name}.prof")
+            state["profiler"].dump_stats(profile)
+        outputs = _sizes(outputs, self.deep)
+        rss = peak_rss()
+        self._write({
+            "event": NODE,
+            "name": node.name,
+            "wall_seconds": wall - state["wall"],
+            "cpu_seconds": cpu - state["cpu"],
+            "peak_rss_bytes": rss,
+            "peak_rss_delta_bytes": None if rss is None else rss - state["peak_rss"],
+            "input_rows": _total(state["inputs"], "rows"),
+            "input_bytes": _total(state["inputs"], "bytes"),
+            "output_rows": _total(outputs, "rows"),
+            "output_bytes": _total(outputs, "bytes"),
+            "inputs": state["inputs"],
+            "outputs": outputs,
+            "profile": profile,
+            "error": None if error is None else repr(error),
+        })
+
+    @hook_impl
+    def after_node_run(self, node: Node, outputs: Dict[str, Any]) -> None:
+        self._finish_node(node, outputs)
+
+    @hook_impl
+    def on_node_error(self, error: Exception, node: Node) -> None:
+        self._finish_node(node, {}, error)
+
+    @hook_impl
+    def before_dataset_loaded(self, dataset_name: str) -> None:
+        self._loads[self._key(dataset_name)] = time.perf_counter()
+
+    @hook_impl
+    def after_dataset_loaded(self, dataset_name: str, data: Any) -> None:
+        start = self._loads.pop(self._key(dataset_name), None)
+        if start is not None:
+            self._write({
+                "event": LOAD, "name": dataset_name, "wall_seconds": time.perf_counter() - start,
+                **data_size(data, self.deep),
+            })
+
+    @hook_impl
+    def before_dataset_saved(self, dataset_name: str) -> None:
+        self._saves[self._key(dataset_name)] = time.perf_counter()
+
+    @hook_impl
+    def after_dataset_saved(self, dataset_name: str, data: Any) -> None:
+        start = self._saves.pop(self._key(dataset_name), None)
+        if start is not None:
+            self._write({
+                "event": SAVE, "name": dataset_name, "wall_seconds": time.perf_counter() - start,
+                **data_size(data, self.deep),
+            })
+
+
+def read_profile(path: str) -> pd.DataFrame:
+    """The records of a profiling file, one row per record"""
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(line) for line in f if line.strip()])
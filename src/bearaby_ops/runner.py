@@ -0,0 +1,40 @@
+"""Runners of the project, kedro's runners sized by the run profile.
+
+``kedro run`` builds its runner without arguments, these subclasses take their worker
+count from ``RUNNER_MAX_WORKERS``, which ``kedro run --max-workers`` and the run profile
+``conf/base/run.yml`` set, see ``cli.py``.
+
+The inventory pipeline runs under all three runners: its datasets pickle, the nodes
+declare the inputs they modify (see ``ownership.py``) and the hooks keep their state per
+node and thread.
+"""
+import os
+from typing import Optional
+
+from kedro.runner import ParallelRunner as KedroParallelRunner
+from kedro.runner import SequentialRunner
+from kedro.runner import ThreadRunner as KedroThreadRunner
+
+MAX_WORKERS_ENV = "RUNNER_MAX_WORKERS"
+
+__all__ = ["MAX_WORKERS_ENV", "ParallelRunner", "SequentialRunner", "ThreadRunner", "profile_max_workers"]
+
+
+def profile_max_workers() -> Optional[int]:
+    """Worker count of the run profile, None for kedro's default"""
+    value = os.getenv(MAX_WORKERS_ENV)
+    return int(value) if value else None
+
+
+class ParallelRunner(KedroParallelRunner):
+    """ParallelRunner with RUNNER_MAX_WORKERS processes, by default at most one per CPU"""
+
+    def __init__(self, max_workers: int = None, is_async: bool = False):
+        super().__init__(max_workers=max_workers or profile_max_workers(), is_async=is_async)
+
+
+class ThreadRunner(KedroThreadRunner):
+    """ThreadRunner with RUNNER_MAX_WORKERS threads, by default one per node that can run at once"""
+
+    def __init__(self, max_workers: int = None, is_async: bool = False):
+        super().__init__(max_workers=max_workers or profile_max_workers(), is_async=is_async)
@@ -46,6 +46,31 @@ from pathlib import Path
 SESSION_STORE_CLASS = SQLiteStore
 SESSION_STORE_ARGS = {"path": str(Path(__file__).parents[2] / "data")}
 
+import os
+
+import pandas as pd
+
+from .catalog import OptimizingDataCatalog
 from .hooks import APIAccessHooks
+from .ownership import MutationGuardHooks
+from .profiling import ProfilingHooks
+
+# Nodes share the frames they do not modify, pandas copies a frame the first time a node
+# modifies it, see ownership.py
+pd.set_option("mode.copy_on_write", True)
+
+# Every run appends its node and dataset timings next to the session store, the nodes
+# listed in PROFILE_NODES (comma separated) also run under cProfile
+HOOKS = (
+    APIAccessHooks(),
+    ProfilingHooks(
+        path=str(Path(__file__).parents[2] / "data" / "profiling.jsonl"),
+        profile_nodes=[name for name in os.getenv("PROFILE_NODES", "").split(",") if name],
+    ),
+)
+# Debug mode failing the nodes that modify an input they do not declare with @consumes
+if os.getenv("CHECK_MUTATIONS", "").lower() in ("1", "true", "yes"):
+    HOOKS += (MutationGuardHooks(),)
 
-HOOKS = (APIAccessHooks(),)
+# Frames loaded from files get narrower dtypes, their memory before and after is logged
+DATA_CATALOG_CLASS = OptimizingDataCatalog
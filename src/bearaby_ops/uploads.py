@@ -0,0 +1,202 @@
+"""Concurrent upload of the pipeline artifacts to Google Drive.
+
+The Drive service is built once and shared by the upload workers. googleapiclient
+services are not thread-safe on their own, so every worker runs its requests through its
+own HTTP connection. Large files are sent as resumable uploads in chunks, a chunk that
+fails with a dropped connection, a 429 or a 5xx is resumed from what Drive received, up
+to NUM_RETRIES times. A file that already exists in its folder is
+updated in place instead of being uploaded a second time.
+"""
+import datetime
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+# files larger than this are uploaded resumably, chunks must be multiples of 256 KiB
+RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+CHUNK_SIZE = 4 * 1024 * 1024
+# retries of every request, with googleapiclient's exponential backoff
+NUM_RETRIES = 5
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_MIMETYPE = 'text/csv'
+
+
+class DriveUpload:
+    """A file to upload to a Drive folder
+
+    Attributes:
+        path: local path of the file
+        name: name of the file in Drive
+        folder_id: id of the Drive folder
+        mimetype: content type of the file
+    """
+
+    def __init__(self, path: str, name: str, folder_id: str, mimetype: str):
+        self.path = path
+        self.name = name
+        self.folder_id = folder_id
+        self.mimetype = mimetype
+
+    def __repr__(self):
+        return f"DriveUpload({self.name!r}, {self.folder_id!r})"
+
+
+def drive_upload(path: str, filename: str, folder_id: str, now: Optional[datetime.datetime] = None) -> DriveUpload:
+    """Name an artifact the way the Drive folders expect it
+
+    Args:
+        path: local path of the file
+        filename: "" for the daily inventory named mm-dd-YYYY.xlsx, "display" for the
+            display workbook, otherwise the prefix of a CSV named <prefix>mmddyy.csv
+        folder_id: id of the Drive folder
+        now: date of the upload, defaults to now
+
+    Returns:
+        DriveUpload: the upload
+    """
+    now = now or datetime.datetime.now()
+    if filename == "":
+        return DriveUpload(path, now.strftime("%m-%d-%Y") + ".xlsx", folder_id, XLSX_MIMETYPE)
+    if filename == "display":
+        return DriveUpload(path, "display", folder_id, XLSX_MIMETYPE)
+    return DriveUpload(path, f"{filename}{now.strftime('%m%d%y')}.csv", folder_id, CSV_MIMETYPE)
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def find_existing_file(service, name: str, folder_id: str, http=None,
+                       num_retries: int = NUM_RETRIES) -> Optional[str]:
+    """Look up a file by name in one folder
+
+    Args:
+        service: Drive v3 service
+        name: name of the file
+        folder_id: id of the folder
+        http: HTTP connection to run the request on
+        num_retries: retries of the request on connection errors and 5xx responses
+
+    Returns:
+        Optional[str]: id of the file, None when the folder has no such file
+    """
+    response = service.files().list(
+        q=f"name = '{_quote(name)}' and '{_quote(folder_id)}' in parents and trashed = false",
+        fields="files(id)",
+        pageSize=1,
+        supportsAllDrives=True,
+        includeItemsFromAllDrives=True,
+    ).execute(http=http, num_retries=num_retries)
+    files = response.get("files", [])
+    return files[0]["id"] if files else None
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        return error.resp.status == 429 or error.resp.status >= 500
+    return True
+
+
+def upload_file(service, upload: DriveUpload, http=None, chunk_size: int = CHUNK_SIZE,
+                resumable_threshold: int = RESUMABLE_THRESHOLD, num_retries: int = NUM_RETRIES) -> str:
+    """Create or replace a file in its Drive folder
+
+    Args:
+        service: Drive v3 service
+        upload: the file to upload
+        http: HTTP connection to run the requests on
+        chunk_size: bytes sent per request of a resumable upload
+        resumable_threshold: files larger than this are uploaded resumably
+        num_retries: retries of every request, and of every chunk, on connection errors,
+            429 and 5xx responses
+
+    Returns:
+        str: id of the Drive file
+    """
+    resumable = os.path.getsize(upload.path) > resumable_threshold
+    media = MediaFileUpload(upload.path, mimetype=upload.mimetype, chunksize=chunk_size, resumable=resumable)
+    try:
+        existing = find_existing_file(service, upload.name, upload.folder_id, http, num_retries)
+        if existing:
+            request = service.files().update(fileId=existing, media_body=media, fields="id", supportsAllDrives=True)
+        else:
+            metadata = {"name": upload.name, "parents": [upload.folder_id]}
+            request = service.files().create(body=metadata, media_body=media, fields="id", supportsAllDrives=True)
+
+        if not resumable:
+            return request.execute(http=http, num_retries=num_retries)["id"]
+        # googleapiclient retries a chunk by resending the part of the file it already read,
+        # a failed chunk is resumed here instead: the next call asks Drive for the bytes it
+        # received and sends the rest
+        response = None
+        retries = 0
+        while response is None:
+            try:
+                status, response = request.next_chunk(http=http)
+            except (HttpError, httplib2.HttpLib2Error, OSError) as error:
+                if retries == num_retries or not _is_transient(error):
+                    raise
+                retries += 1
+                logger.warning("%s: chunk failed, resuming (%d/%d): %s", upload.name, retries, num_retries, error)
+                time.sleep(random.random() * 2 ** retries)
+                continue
+            retries = 0
+            if status:
+                logger.debug("%s: %d%% uploaded", upload.name, int(status.progress() * 100))
+        return response["id"]
+    finally:
+        # MediaFileUpload opens the file and leaves it open
+        media.stream().close()
+
+
+def run_uploads(
+        service,
+        uploads: List[DriveUpload],
+        http_factory: Optional[Callable[[], object]] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Dict[str, str]:
+    """Upload all files concurrently
+
+    Args:
+        service: Drive v3 service shared by the workers
+        uploads: the files to upload
+        http_factory: builds the authorized HTTP connection of a worker, without it the
+            requests run on the connection of ``service``
+        max_workers: number of files uploading at the same time
+
+    Returns:
+        Dict[str, str]: Drive file id or the error message for every file name
+    """
+    local = threading.local()
+
+    def upload_one(upload):
+        if http_factory is not None and not hasattr(local, "http"):
+            local.http = http_factory()
+        return upload_file(service, upload, getattr(local, "http", None))
+
+    summary = {}
+    if not uploads:
+        return summary
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload") as executor:
+        futures = {upload.name: executor.submit(upload_one, upload) for upload in uploads}
+        for upload in uploads:
+            try:
+                summary[upload.name] = futures[upload.name].result()
+            except Exception as error:  # a failed upload must not stop the others
+                summary[upload.name] = str(error) or type(error).__name__
+                logger.error("Upload of %s failed: %s", upload.name, error)
+            else:
+                logger.info("Uploaded %s to Drive, file ID: %s", upload.name, summary[upload.name])
+    return summary
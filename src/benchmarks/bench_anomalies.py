@@ -0,0 +1,57 @@
+"""Benchmark the anomaly detection over a synthetic SKU x warehouse snapshot history.
+
+Run from the project root with::
+
+    python src/benchmarks/bench_anomalies.py --skus 20000 --days 31
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bearaby_ops.pipelines.inventory.anomalies import detect_anomalies, series_matrix  # noqa: E402
+
+WAREHOUSES = ["BLNJ", "3PLC LA", "3PLC NJ"]
+
+
+def synthetic_history(skus: int, days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    series = skus * len(WAREHOUSES)
+    available = rng.poisson(rng.integers(5, 500, size=series), size=(days, series))
+    return pd.DataFrame({
+        "Date": np.repeat(pd.date_range("2026-01-01", periods=days).strftime("%m/%d/%Y"), series),
+        "SKU": np.tile(np.repeat([f"NAP{i:06d}" for i in range(skus)], len(WAREHOUSES)), days),
+        "Collection": "Napper",
+        "Warehouse": np.tile(WAREHOUSES, skus * days),
+        "Available": available.ravel(),
+    })
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--skus", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=31)
+    args = parser.parse_args()
+
+    snapshots = synthetic_history(args.skus, args.days)
+    _, matrix_time = timed(series_matrix, snapshots)
+    anomalies, total_time = timed(detect_anomalies, snapshots)
+
+    print(f"series: {args.skus * len(WAREHOUSES)}, days: {args.days}, rows: {len(snapshots)}")
+    print(f"dense matrix:       {matrix_time:.2f}s")
+    print(f"detect_anomalies:   {total_time:.2f}s  ({len(anomalies)} outliers)")
+
+
+if __name__ == "__main__":
+    main()
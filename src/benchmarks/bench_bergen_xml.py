@@ -0,0 +1,119 @@
+"""Benchmark the streaming Bergen inventory parser against the in-memory one.
+
+A synthetic GetInventory response is served from a local HTTP server and each mode
+runs in its own process so the peak RSS of one does not hide the other.
+
+Run from the project root with::
+
+    python src/benchmarks/bench_bergen_xml.py --items 200000
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bearaby_ops.customClasses.BergenAPI import BergenAPI  # noqa: E402
+
+ITEM = (
+    "<item><Warehouse>Bergen Logistics NJ299</Warehouse><Style>S{i}</Style><Color>Blue</Color>"
+    "<Size>L</Size><Description>Weighted blanket {i}</Description><Sku>NAP{i:07d}</Sku>"
+    "<Upc>8100{i:08d}</Upc><ActualQuantity>{i}</ActualQuantity><PendingQuantity>1</PendingQuantity></item>"
+)
+
+
+def write_synthetic_response(path, items):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>')
+        f.write('<GetInventoryResponse xmlns="http://rex11.com/webmethods/"><Items>')
+        for i in range(1, items + 1):
+            f.write(ITEM.format(i=i))
+        f.write("</Items></GetInventoryResponse>")
+
+
+def serve_file(path):
+    size = os.path.getsize(path)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/xml")
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode, base_url, csv_filename):
+    api = BergenAPI("shop", "user", "secret", base_url=base_url)
+    api.authentication_token = "benchmark"
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "in-memory":
+        api.write_inventory_to_csv(api.get_inventory(), csv_filename)
+    else:
+        api.stream_inventory_to_csv(csv_filename)
+    seconds = time.perf_counter() - start
+    return {"mode": mode, "seconds": seconds, "peak_rss_delta_mb": peak_rss_mb() - baseline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--child", choices=["in-memory", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # silence the client's progress print so stdout only carries the result
+        sys.stdout = open(os.devnull, "w")
+        result = run_mode(args.child, args.url, args.csv)
+        sys.stdout = sys.__stdout__
+        print(json.dumps(result))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_path = os.path.join(tmp, "inventory.xml")
+        write_synthetic_response(xml_path, args.items)
+        server = serve_file(xml_path)
+        url = f"http://127.0.0.1:{server.server_port}"
+        print(f"items: {args.items}, response: {os.path.getsize(xml_path) / 2**20:.0f} MB")
+        try:
+            for mode in ("in-memory", "streaming"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", mode, "--url", url, "--csv", os.path.join(tmp, f"{mode}.csv")],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output)
+                print(
+                    f"{mode:>10}: {result['seconds']:.2f}s, {args.items / result['seconds']:,.0f} items/s, "
+                    f"peak RSS +{result['peak_rss_delta_mb']:.0f} MB"
+                )
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark saving and loading the pipeline intermediates as Excel and as Parquet.
+
+Run from the project root with::
+
+    python src/benchmarks/bench_catalog_io.py --rows 20000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from kedro.io import DataCatalog
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bearaby_ops.pipelines.inventory.schemas import (  # noqa: E402
+    FINAL_SKU_TABLE_SCHEMA, MERGED_TABLE_SCHEMA, METRICS_TABLE_SCHEMA, apply_schema,
+)
+
+WAREHOUSES = ["BLNJ", "3PLC LA", "3PLC NJ"]
+
+
+def synthetic_tables(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    skus = np.array([f"NAP{i:06d}" for i in range(rows)], dtype=object)
+    upcs = np.array([f"8100{i:08d}" for i in range(rows)], dtype=object)
+    quantities = rng.integers(0, 500, size=(rows, len(WAREHOUSES)))
+
+    merged_table = pd.DataFrame({
+        "UPCCODE": upcs,
+        "WAREHOUSEID": rng.choice(WAREHOUSES, size=rows),
+        "SKU": skus,
+        "ACTUALQTY": quantities[:, 0] + 5,
+        "AVAILABLE": quantities[:, 0],
+        "PENDINGPICKING": 5,
+    })
+    metrics_table = pd.DataFrame(quantities, columns=WAREHOUSES)
+    metrics_table.insert(0, "SKU", skus)
+    metrics_table["Quota"] = rng.integers(0, 2, size=rows).astype(float)
+    metrics_table["Quota Amount"] = rng.integers(0, 20, size=rows).astype(float)
+    metrics_table["Warehouse"] = rng.choice(WAREHOUSES, size=rows)
+    for warehouse in WAREHOUSES:
+        metrics_table[f"Updated_{warehouse}"] = metrics_table[warehouse] - metrics_table["Quota Amount"]
+    metrics_table["UPC"] = upcs
+    metrics_table["Total Inventory"] = quantities.sum(axis=1).astype(float)
+    metrics_table["Total Available"] = metrics_table["Total Inventory"] - metrics_table["Quota Amount"]
+
+    final_SKU_table = metrics_table.assign(
+        **{
+            "Product Description": [f"Weighted blanket {i % 300}" for i in range(rows)],
+            "Collection": rng.choice(["Napper", "Tree Napper", "Cotton Napper"], size=rows),
+            "Color": rng.choice(["Asteroid Grey", "Midnight Blue", "Moonstone Grey"], size=rows),
+            "Cost": rng.uniform(20, 120, size=rows).round(2),
+        }
+    )
+    return {
+        "merged_table": apply_schema(merged_table, MERGED_TABLE_SCHEMA),
+        "metrics_table": apply_schema(metrics_table, METRICS_TABLE_SCHEMA),
+        "final_SKU_table": apply_schema(final_SKU_table, FINAL_SKU_TABLE_SCHEMA),
+    }
+
+
+def time_round_trip(catalog, name, data):
+    start = time.perf_counter()
+    catalog.save(name, data)
+    saved = time.perf_counter()
+    catalog.load(name)
+    return saved - start, time.perf_counter() - saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    tables = synthetic_tables(args.rows)
+    print(f"rows: {args.rows}")
+    print(f"{'dataset':<16} {'excel save':>11} {'excel load':>11} {'pq save':>9} {'pq load':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, data in tables.items():
+            catalog = DataCatalog.from_config({
+                "excel": {"type": "pandas.ExcelDataSet", "filepath": f"{tmp}/{name}.xlsx"},
+                "parquet": {"type": "pandas.ParquetDataSet", "filepath": f"{tmp}/{name}.pq"},
+            })
+            excel = time_round_trip(catalog, "excel", data)
+            parquet = time_round_trip(catalog, "parquet", data)
+            print(f"{name:<16} {excel[0]:>10.2f}s {excel[1]:>10.2f}s {parquet[0]:>8.3f}s {parquet[1]:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Benchmark every node of the inventory pipeline and the full run on synthetic inputs.
+
+Results are written as JSON, one file per run, so runs of different commits can be
+compared. Run from the project root with::
+
+    python src/benchmarks/bench_pipeline.py --scales 1k 10k 100k
+    python src/benchmarks/bench_pipeline.py --scales 10k --baseline src/benchmarks/results/<file>.json
+    python src/benchmarks/bench_pipeline.py --scales 100k --optimize-dtypes
+"""
+import argparse
+import datetime
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from kedro.io import MemoryDataset
+from kedro.runner import SequentialRunner
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import SCALES, synthetic_catalog  # noqa: E402
+from bearaby_ops.catalog import OptimizingDataCatalog  # noqa: E402
+from bearaby_ops.pipelines.inventory.pipeline import create_pipeline  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# a node slower than the baseline by more than this ratio is reported
+REGRESSION_RATIO = 1.2
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _catalog(rows: int, directory: str, seed: int, optimize_dtypes: bool):
+    if optimize_dtypes:
+        # the raw inputs are read from files, as the production catalog reads them
+        return synthetic_catalog(rows, directory, seed, persist_raw=True, catalog_class=OptimizingDataCatalog)
+    return synthetic_catalog(rows, directory, seed)
+
+
+def time_nodes(rows: int, seed: int = 0, optimize_dtypes: bool = False) -> dict:
+    """Seconds taken by every node, run one by one in topological order"""
+    pipeline = create_pipeline()
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = _catalog(rows, directory, seed, optimize_dtypes)
+        for node in pipeline.nodes:
+            inputs = {name: catalog.load(name) for name in node.inputs}
+            start = time.perf_counter()
+            outputs = node.run(inputs)
+            timings[node.name] = time.perf_counter() - start
+            for name, data in outputs.items():
+                if name not in catalog.list():
+                    catalog.add(name, MemoryDataset())
+                catalog.save(name, data)
+    return timings
+
+
+def time_pipeline(rows: int, seed: int = 0, optimize_dtypes: bool = False) -> float:
+    """Seconds taken by a SequentialRunner run of the whole pipeline"""
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = _catalog(rows, directory, seed, optimize_dtypes)
+        start = time.perf_counter()
+        SequentialRunner().run(create_pipeline(), catalog)
+        return time.perf_counter() - start
+
+
+def run(scales, repeat: int, optimize_dtypes: bool = False) -> dict:
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "repeat": repeat,
+        "optimize_dtypes": optimize_dtypes,
+        "scales": {},
+    }
+    for scale in scales:
+        rows = SCALES[scale]
+        # the fastest of the repeats, the others are noise from the machine
+        node_runs = [time_nodes(rows, optimize_dtypes=optimize_dtypes) for _ in range(repeat)]
+        nodes = {name: min(run[name] for run in node_runs) for name in node_runs[0]}
+        pipeline = min(time_pipeline(rows, optimize_dtypes=optimize_dtypes) for _ in range(repeat))
+        results["scales"][scale] = {"rows": rows, "pipeline": pipeline, "nodes": nodes}
+        print(f"{scale}: pipeline {pipeline:.2f}s")
+        for name, seconds in sorted(nodes.items(), key=lambda item: -item[1]):
+            print(f"    {name:<45} {seconds:8.3f}s")
+    return results
+
+
+def regressions(results: dict, baseline: dict, ratio: float = REGRESSION_RATIO) -> list:
+    """Nodes and runs slower than in the baseline by more than ratio"""
+    slower = []
+    for scale, current in results["scales"].items():
+        previous = baseline.get("scales", {}).get(scale)
+        if not previous:
+            continue
+        pairs = [("pipeline", current["pipeline"], previous["pipeline"])]
+        pairs += [
+            (name, seconds, previous["nodes"][name])
+            for name, seconds in current["nodes"].items() if name in previous["nodes"]
+        ]
+        for name, seconds, before in pairs:
+            if before > 0 and seconds / before > ratio:
+                slower.append({"scale": scale, "name": name, "seconds": seconds, "baseline": before})
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["1k", "10k"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--baseline", type=Path, help="results of an earlier run to compare with")
+    parser.add_argument(
+        "--optimize-dtypes", action="store_true",
+        help="load the raw inputs from Parquet files through OptimizingDataCatalog",
+    )
+    args = parser.parse_args()
+    # the catalog logs every load and save, which would be most of the output
+    logging.getLogger("kedro").setLevel(logging.WARNING)
+
+    results = run(args.scales, args.repeat, args.optimize_dtypes)
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"{results['timestamp'].replace(':', '')}_{results['commit']}.json"
+    path.write_text(json.dumps(results, indent=2))
+    print(f"results written to {path}")
+
+    if args.baseline:
+        slower = regressions(results, json.loads(args.baseline.read_text()))
+        for entry in slower:
+            print(f"slower: {entry['scale']} {entry['name']} {entry['baseline']:.3f}s -> {entry['seconds']:.3f}s")
+        sys.exit(1 if slower else 0)
+
+
+if __name__ == "__main__":
+    main()
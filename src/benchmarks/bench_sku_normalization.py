@@ -0,0 +1,59 @@
+"""Benchmark the vectorized SKU canonicalization against the row-wise lambdas.
+
+Run from the project root with::
+
+    python src/benchmarks/bench_sku_normalization.py --rows 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bearaby_ops.pipelines.inventory.sku import TL_PREFIX_LENGTH, canonical_sku, clear_cache  # noqa: E402
+
+
+def legacy_tl_sku(stock_codes: pd.Series) -> pd.Series:
+    """The ThinkLogistics SKU normalization as ``preprocess_TL`` did it before."""
+    skus = stock_codes.apply(lambda x: x[2:] if len(x) > 2 else 0)
+    return skus.apply(lambda x: x.split("-")[0] + x.split("-")[1] if len(x.split("-")) > 2 else x.split("-")[0])
+
+
+def synthetic_stock_codes(rows: int, distinct: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    bases = np.array([f"TLNAP{i:05d}" for i in range(distinct)], dtype=object)
+    suffixes = np.array(["", "-A", "-GR-15", "-MB-20-X"], dtype=object)
+    return pd.Series(rng.choice(bases, size=rows) + rng.choice(suffixes, size=rows))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=20_000, help="distinct SKUs before suffixes")
+    args = parser.parse_args()
+
+    codes = synthetic_stock_codes(args.rows, args.distinct)
+    legacy, legacy_time = timed(legacy_tl_sku, codes)
+    clear_cache()
+    cold, cold_time = timed(lambda c: canonical_sku(c, TL_PREFIX_LENGTH), codes)
+    warm, warm_time = timed(lambda c: canonical_sku(c, TL_PREFIX_LENGTH), codes)
+    assert cold.equals(legacy) and warm.equals(legacy)
+
+    print(f"rows: {args.rows}, distinct raw SKUs: {codes.nunique()}")
+    print(f"lambdas:            {legacy_time:.2f}s")
+    print(f"vectorized (cold):  {cold_time:.2f}s  ({legacy_time / cold_time:.1f}x)")
+    print(f"vectorized (warm):  {warm_time:.2f}s  ({legacy_time / warm_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
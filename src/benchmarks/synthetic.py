@@ -0,0 +1,183 @@
+"""Synthetic raw inputs of the inventory pipeline at a configurable scale.
+
+The frames have the columns and types of the catalog datasets once loaded: Bergen and
+3PL Center inventory exports, the SKU workbook, the retail quota, the historic costs and
+the Shopify catalog. ``rows`` is the number of inventory rows of each warehouse export,
+the SKU catalog has one SKU per row, so scales grow every input together. A small share
+of the rows carries the defects seen in production: Bergen rows without SKU, UPCs
+that are not 12 digits and SKUs spelled with size suffixes in the quota sheet.
+
+Usage::
+
+    from benchmarks.synthetic import SCALES, synthetic_catalog
+    catalog = synthetic_catalog(SCALES["10k"], tmp_path)
+"""
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+import yaml
+from kedro.extras.datasets.pandas import ParquetDataSet
+from kedro.io import DataCatalog, MemoryDataset
+
+from bearaby_ops.extras.datasets import DailyPartitionedDataSet
+
+SCALES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+RAW_DATASETS = ["SKUs", "all_SKU_shopify", "bergenInventoryNJ", "tplCenter", "retailQuota", "retailPrice"]
+
+COLLECTIONS = ["Napper", "Tree Napper", "Cotton Napper", "Hugger", "Sleep Mask"]
+COLORS = ["Moonlight Grey", "Midnight Blue", "Cloud White", "Asteroid Grey", "Mystic Mint"]
+SIZES = ["48x72", "40x72", "45x72", "60x80"]
+WEIGHTS = [10, 15, 20, 25]
+
+# share of the rows with the production defects
+MISSING_SKU_SHARE = 0.02
+SHORT_UPC_SHARE = 0.01
+SUFFIXED_QUOTA_SHARE = 0.3
+QUOTA_SHARE = 0.2
+
+PARAMETERS_FILE = Path(__file__).resolve().parents[2] / "conf" / "base" / "parameters" / "inventory.yml"
+
+
+def _skus(count: int) -> np.ndarray:
+    return np.char.add("NAP", np.char.zfill(np.arange(count).astype(str), 6)).astype(object)
+
+
+def _upcs(count: int) -> np.ndarray:
+    return np.char.add("81", np.char.zfill(np.arange(count).astype(str), 10)).astype(object)
+
+
+def synthetic_inputs(rows: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """Raw inputs of the inventory pipeline
+
+    Args:
+        rows: inventory rows of each warehouse export, and SKUs of the catalog
+        seed: seed of the random generator, the same seed gives the same frames
+
+    Returns:
+        Dict[str, pd.DataFrame]: one frame per raw catalog dataset, see RAW_DATASETS
+    """
+    rng = np.random.default_rng(seed)
+    skus, upcs = _skus(rows), _upcs(rows)
+    collections = rng.choice(COLLECTIONS, size=rows)
+    colors = rng.choice(COLORS, size=rows)
+    sizes = rng.choice(SIZES, size=rows)
+
+    sku_table = pd.DataFrame({
+        "SKU_standard": skus,
+        "UPC": upcs,
+        "Collection": collections,
+        "Product Description": pd.Series(collections) + " " + colors + " " + sizes,
+        "Color": colors,
+        "Size (Inch)": sizes,
+        "Weight (lbs)": rng.choice(WEIGHTS, size=rows),
+    })
+    shopify = pd.DataFrame({"SKU": skus, "UPCCODE": upcs})
+
+    bergen_items = rng.integers(0, rows, size=rows)
+    actual = rng.integers(0, 500, size=rows).astype(np.int32)
+    pending = np.minimum(rng.integers(0, 20, size=rows), actual).astype(np.int32)
+    bergen_skus = skus[bergen_items].copy()
+    bergen_skus[rng.random(rows) < MISSING_SKU_SHARE] = None
+    bergen_upcs = upcs[bergen_items].copy()
+    short = rng.random(rows) < SHORT_UPC_SHARE
+    bergen_upcs[short] = [upc[:8] for upc in bergen_upcs[short]]
+    bergen = pd.DataFrame({
+        "WAREHOUSENAME": "Bergen Logistics NJ299",
+        "STYLE": bergen_skus,
+        "DESCRIPTION": sku_table["Product Description"].to_numpy()[bergen_items],
+        "UPCCODE": bergen_upcs,
+        "ACTUALQTY": actual,
+        "PENDINGPICKING": pending,
+        "AVAILABLE": actual - pending,
+        "SKU": bergen_skus,
+        "ACCOUNTNAME": "Bearaby",
+    })
+
+    tpl_items = rng.integers(0, rows, size=rows)
+    on_hand = rng.integers(0, 500, size=rows)
+    tpl_center = pd.DataFrame({
+        "SKU": skus[tpl_items],
+        "facilityId": rng.choice([659, 660], size=rows),
+        "onHand": on_hand,
+        "AVAILABLE": on_hand - np.minimum(rng.integers(0, 20, size=rows), on_hand),
+    })
+
+    quota_items = rng.choice(rows, size=max(1, int(rows * QUOTA_SHARE)), replace=False)
+    quota_skus = skus[quota_items].copy()
+    suffixed = rng.random(len(quota_skus)) < SUFFIXED_QUOTA_SHARE
+    quota_skus[suffixed] = [f"{sku}-{size}" for sku, size in zip(quota_skus[suffixed], sizes[quota_items][suffixed])]
+    quota_amount = rng.integers(0, 50, size=len(quota_items)).astype(float)
+    quota_amount[rng.random(len(quota_items)) < 0.1] = np.nan
+    retail_quota = pd.DataFrame({
+        "SKU": quota_skus,
+        "Quota": rng.integers(0, 2, size=len(quota_items)),
+        "Quota Amount": quota_amount,
+        "Description": sku_table["Product Description"].to_numpy()[quota_items],
+    })
+
+    retail_price = pd.DataFrame({"SKU": skus, "Cost": rng.uniform(20, 120, size=rows).round(2)})
+
+    return {
+        "SKUs": sku_table,
+        "all_SKU_shopify": shopify,
+        "bergenInventoryNJ": bergen,
+        "tplCenter": tpl_center,
+        "retailQuota": retail_quota,
+        "retailPrice": retail_price,
+    }
+
+
+def pipeline_parameters(path: Path = PARAMETERS_FILE) -> Dict[str, Any]:
+    """The inventory parameters as ``params:<name>`` catalog entries"""
+    with open(path, encoding="utf-8") as f:
+        parameters = yaml.safe_load(f)
+    return {f"params:{name}": value for name, value in parameters.items()}
+
+
+def synthetic_catalog(
+        rows: int,
+        directory: Path,
+        seed: int = 0,
+        persist_raw: bool = False,
+        catalog_class: type = DataCatalog,
+) -> DataCatalog:
+    """Catalog holding the synthetic inputs and the parameters of the inventory pipeline
+
+    The day-partitioned stores are written under ``directory``, as the transcoded
+    snapshot entries must share one store. Every other dataset stays in memory.
+
+    Args:
+        rows: see synthetic_inputs
+        directory: folder of the day-partitioned stores and of the raw inputs
+        seed: see synthetic_inputs
+        persist_raw: write the raw inputs as Parquet files, loaded from disk like the
+            production inputs, instead of keeping them in memory
+        catalog_class: DataCatalog or a subclass, e.g. OptimizingDataCatalog
+
+    Returns:
+        DataCatalog: catalog to run ``create_pipeline()`` with
+    """
+    directory = Path(directory)
+    datasets = {}
+    for name, frame in synthetic_inputs(rows, seed).items():
+        if persist_raw:
+            datasets[name] = ParquetDataSet(str(directory / "01_raw" / f"{name}.pq"))
+            datasets[name].save(frame)
+        else:
+            datasets[name] = MemoryDataset(frame)
+    datasets.update({name: MemoryDataset(value) for name, value in pipeline_parameters().items()})
+    snapshots = {"filepath": str(directory / "inventory_snapshot_history"), "date_format": "%m/%d/%Y"}
+    datasets["inventory_snapshot_history@all"] = DailyPartitionedDataSet(**snapshots)
+    datasets["inventory_snapshot_history@recent"] = DailyPartitionedDataSet(**snapshots, load_days=2)
+    datasets["total_inventory_history"] = DailyPartitionedDataSet(
+        str(directory / "total_inventory_history"), date_format="%m/%d/%Y",
+    )
+    return catalog_class(datasets)
@@ -0,0 +1,14 @@
+"""
+Fixtures shared by all tests.
+"""
+import pytest
+
+from bearaby_ops.customClasses import TokenCache
+
+
+@pytest.fixture(autouse=True)
+def token_cache(tmp_path, monkeypatch):
+    """Keep the API tokens of a test in its own temporary cache"""
+    cache = TokenCache.TokenCache(str(tmp_path / "tokens.json"))
+    monkeypatch.setattr(TokenCache, "_default_token_cache", cache)
+    return cache
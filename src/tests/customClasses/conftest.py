@@ -0,0 +1,39 @@
+"""
+Fixtures starting the local warehouse API stubs.
+"""
+import pytest
+
+from .stubs import (
+    StubBergen, StubThinkLogistics, StubTPLCenter, bergen_handler, serve, think_logistics_handler,
+    tpl_center_handler,
+)
+
+
+@pytest.fixture
+def bergen_server():
+    """Start a stub Bergen (Rex11) API, yields (base_url, stub)"""
+    stub = StubBergen()
+    server = serve(bergen_handler(stub))
+    yield f"http://127.0.0.1:{server.server_port}", stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tpl_center_server():
+    """Start a stub 3PL Center API, yields (base_url, stub)"""
+    stub = StubTPLCenter()
+    server = serve(tpl_center_handler(stub))
+    yield f"http://127.0.0.1:{server.server_port}", stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def think_logistics_server():
+    """Start a stub Think Logistics API, yields (base_url, stub)"""
+    stub = StubThinkLogistics()
+    server = serve(think_logistics_handler(stub))
+    yield f"http://127.0.0.1:{server.server_port}/", stub
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,211 @@
+"""
+Local stand-ins for the warehouse APIs, served by the fixtures in conftest.py.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubTPLCenter:
+    """3PL Center stock summaries served from memory
+
+    Attributes:
+        records: number of stock summaries
+        delay: seconds every inventory page takes
+        fail_once: page numbers answering 503 on their first request
+        expired: tokens answered with 401
+        requests: (path, pgnum) of every request received
+    """
+
+    def __init__(self, records=2300, delay=0.0, fail_once=()):
+        self.records = records
+        self.delay = delay
+        self.fail_once = set(fail_once)
+        self.expired = set()
+        self.issued = 0
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    def token(self):
+        with self.lock:
+            self.issued += 1
+            token = "stub-token" if self.issued == 1 else f"stub-token-{self.issued}"
+        return 200, {"access_token": token, "expires_in": 3600}
+
+    def stock_summaries(self, query, authorization=""):
+        page_size = int(query.get("pgsiz", ["500"])[0])
+        page = int(query.get("pgnum", ["1"])[0])
+        if authorization.removeprefix("Bearer ") in self.expired:
+            return 401, {"message": "token expired"}
+        with self.lock:
+            if page in self.fail_once:
+                self.fail_once.discard(page)
+                return 503, {"message": "try again"}
+        time.sleep(self.delay)
+        start = (page - 1) * page_size
+        summaries = [
+            {
+                "itemIdentifier": {"sku": f"SKU{i:05d}"}, "totalReceived": i, "allocated": 0,
+                "available": i, "onHold": 0, "onHand": i, "facilityId": 659,
+            }
+            for i in range(start, min(start + page_size, self.records))
+        ]
+        links = {}
+        if start + page_size < self.records:
+            links["next"] = {"href": f"/inventory/stocksummaries?pgsiz={page_size}&pgnum={page + 1}"}
+        return 200, {"totalResults": self.records, "summaries": summaries, "_links": links}
+
+
+BERGEN_ITEM = (
+    "<item><Warehouse>Bergen Logistics NJ299</Warehouse><Style>S{i}</Style><Color>Blue</Color>"
+    "<Size>L</Size><Description>Napper &amp; co {i}</Description><Sku>NAP{i:05d}</Sku>"
+    "<Upc>81000{i:07d}</Upc><ActualQuantity>{actual}</ActualQuantity>"
+    "<PendingQuantity>{pending}</PendingQuantity></item>"
+)
+
+
+def bergen_inventory_response(items):
+    """GetInventory SOAP response with ``items`` items, every fifth one out of stock"""
+    body = "".join(
+        BERGEN_ITEM.format(i=i, actual=0 if i % 5 == 0 else i, pending=0 if i % 5 == 0 else 1)
+        for i in range(items)
+    )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<GetInventoryResponse xmlns="http://rex11.com/webmethods/"><Items>'
+        f"{body}</Items></GetInventoryResponse>"
+    ).encode("utf-8")
+
+
+class StubBergen:
+    """Rex11 authentication and GetInventory served from memory"""
+
+    def __init__(self, items=100):
+        self.inventory = bergen_inventory_response(items)
+        self.etag = '"inventory-v1"'
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+
+class StubThinkLogistics:
+    """Think Logistics sign-in and paginated inventory served from memory
+
+    Attributes:
+        pages: number of non-empty inventory pages
+        requests: (path, PageIndex) of every request received
+    """
+
+    def __init__(self, pages=5):
+        self.pages = pages
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    def respond(self, path, body):
+        if path.endswith("/auth/signin"):
+            return 200, {"Token": "stub-token"}
+        page = body["PageIndex"]
+        if page > self.pages:
+            return 200, []
+        return 200, [
+            {"StockCode": f"T3NAP{page:02d}{i:03d}", "OnHandQty": i, "AllocatedQty": 0, "Available": i}
+            for i in range(body["PageSize"])
+        ]
+
+
+def think_logistics_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with stub.lock:
+                stub.requests.append((self.path, body.get("PageIndex")))
+                stub.connections.add(self.client_address)
+            status, reply = stub.respond(self.path, body)
+            payload = json.dumps(reply).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def bergen_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            with stub.lock:
+                stub.requests.append(url.path)
+                stub.connections.add(self.client_address)
+            if url.path.endswith("/AuthenticationTokenGet"):
+                payload = b'<string xmlns="http://rex11.com/webmethods/">stub-token</string>'
+            elif self.headers.get("If-None-Match") == stub.etag:
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            else:
+                payload = stub.inventory
+            self.send_response(200)
+            self.send_header("ETag", stub.etag)
+            self.send_header("Content-Type", "text/xml")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def tpl_center_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with stub.lock:
+                stub.requests.append((urlparse(self.path).path, None))
+                stub.connections.add(self.client_address)
+            self._reply(*stub.token())
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            with stub.lock:
+                stub.requests.append((url.path, int(query.get("pgnum", ["1"])[0])))
+                stub.connections.add(self.client_address)
+            self._reply(*stub.stock_summaries(query, self.headers.get("Authorization", "")))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,45 @@
+"""
+Tests for the 3PL Center API client against a local stub server.
+"""
+import time
+
+from bearaby_ops.customClasses._3PLCenterAPI import _3PLCenterAPI
+
+
+def test_pages_are_reassembled_in_order(tpl_center_server):
+    base_url, stub = tpl_center_server
+    stub.delay = 0.05
+    api = _3PLCenterAPI("id", "secret", base_url=base_url, max_workers=4)
+
+    inventory = api._get_inventory_data()
+
+    assert [row["itemIdentifier"]["sku"] for row in inventory] == [f"SKU{i:05d}" for i in range(2300)]
+
+
+def test_parallel_pages_are_faster_than_serial(tpl_center_server):
+    base_url, stub = tpl_center_server
+    stub.records = 4000
+    stub.delay = 0.1
+    api = _3PLCenterAPI("id", "secret", base_url=base_url, max_workers=8)
+
+    started = time.monotonic()
+    serial = api._get_inventory_data(parallel=False)
+    serial_time = time.monotonic() - started
+
+    started = time.monotonic()
+    parallel = api._get_inventory_data(parallel=True)
+    parallel_time = time.monotonic() - started
+
+    assert parallel == serial
+    assert parallel_time < serial_time / 2
+
+
+def test_server_errors_are_retried(tpl_center_server):
+    base_url, stub = tpl_center_server
+    stub.fail_once = {1, 3}
+    api = _3PLCenterAPI("id", "secret", base_url=base_url)
+
+    inventory = api._get_inventory_data()
+
+    assert len(inventory) == 2300
+    assert [pgnum for path, pgnum in stub.requests].count(3) == 2
@@ -0,0 +1,62 @@
+"""
+Tests for the Bergen (Rex11) API client against a local stub server.
+"""
+import pandas as pd
+
+from bearaby_ops.customClasses.BergenAPI import BergenAPI
+
+from .stubs import bergen_inventory_response
+
+
+def test_streamed_csv_matches_in_memory_parse(bergen_server, tmp_path):
+    base_url, stub = bergen_server
+    api = BergenAPI("shop", "user", "secret", base_url=base_url)
+    assert api.get_authentication_token() == "stub-token"
+
+    rows = api.stream_inventory_to_csv(tmp_path / "streamed.csv")
+    api.write_inventory_to_csv(api.get_inventory(), tmp_path / "parsed.csv")
+
+    assert rows == 80
+    assert (tmp_path / "streamed.csv").read_bytes() == (tmp_path / "parsed.csv").read_bytes()
+
+
+def test_csv_columns_and_available_quantity(tmp_path):
+    api = BergenAPI("shop", "user", "secret")
+    api.write_inventory_to_csv(bergen_inventory_response(3), tmp_path / "inventory.csv")
+
+    inventory = pd.read_csv(tmp_path / "inventory.csv")
+
+    assert list(inventory.columns) == [
+        "WAREHOUSENAME", "STYLE", "COLOR", "SIZE", "DESCRIPTION", "UPCCODE",
+        "ACTUALQTY", "PENDINGPICKING", "AVAILABLE", "SKU",
+    ]
+    assert inventory["SKU"].tolist() == ["NAP00001", "NAP00002"]
+    assert inventory["AVAILABLE"].tolist() == [0, 1]
+    assert inventory["DESCRIPTION"].tolist() == ["Napper & co 1", "Napper & co 2"]
+
+
+def test_missing_quantity_is_written_as_zero(tmp_path):
+    response = bergen_inventory_response(3).replace(b"<PendingQuantity>1</PendingQuantity>", b"", 1)
+    api = BergenAPI("shop", "user", "secret")
+    api.write_inventory_to_csv(response, tmp_path / "inventory.csv")
+
+    inventory = pd.read_csv(
+        tmp_path / "inventory.csv", dtype={"ACTUALQTY": "int32", "PENDINGPICKING": "int32", "AVAILABLE": "int32"},
+    )
+
+    assert inventory["PENDINGPICKING"].tolist() == [0, 1]
+    assert inventory["AVAILABLE"].tolist() == [1, 1]
+
+
+def test_conditional_request_skips_unchanged_inventory(bergen_server, tmp_path):
+    base_url, stub = bergen_server
+    api = BergenAPI("shop", "user", "secret", base_url=base_url)
+    api.get_authentication_token()
+    validators = {}
+
+    assert api.stream_inventory_to_csv(tmp_path / "first.csv", validators) == 80
+    assert validators["etag"] == stub.etag
+
+    assert api.stream_inventory_to_csv(tmp_path / "second.csv", validators) == 0
+    assert validators["not_modified"] is True
+    assert not (tmp_path / "second.csv").exists()
@@ -0,0 +1,74 @@
+"""
+Tests for the lazy Google API clients, without network access.
+"""
+import datetime
+import json
+import threading
+
+import pytest
+
+from bearaby_ops.customClasses import GoogleClientFactory as factory_module
+from bearaby_ops.customClasses.GoogleClientFactory import GoogleClientFactory
+from bearaby_ops.customClasses.GoogleSheetUpdater import GoogleSheetUpdater
+
+
+@pytest.fixture
+def token_file(tmp_path):
+    path = tmp_path / "token.json"
+    expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    path.write_text(json.dumps({
+        "token": "access-token",
+        "refresh_token": "refresh-token",
+        "client_id": "client-id",
+        "client_secret": "client-secret",
+        "expiry": expiry.strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }))
+    return str(path)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+
+    def build(name, version, **kwargs):
+        calls.append((name, version, kwargs))
+        return object()
+
+    monkeypatch.setattr(factory_module, "build", build)
+    return calls
+
+
+def test_services_are_built_once_from_bundled_discovery(token_file, builds):
+    factory = GoogleClientFactory()
+
+    sheets = factory.sheets(token_file)
+
+    assert factory.sheets(token_file) is sheets
+    assert factory.drive(token_file) is not sheets
+    assert [(name, version) for name, version, _ in builds] == [("sheets", "v4"), ("drive", "v3")]
+    assert all(kwargs["static_discovery"] for _, _, kwargs in builds)
+
+
+def test_concurrent_callers_share_one_service(token_file, builds):
+    factory = GoogleClientFactory()
+    services = []
+
+    threads = [threading.Thread(target=lambda: services.append(factory.drive(token_file))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert len({id(service) for service in services}) == 1
+
+
+def test_updater_builds_nothing_until_used(token_file, builds, monkeypatch):
+    factory = GoogleClientFactory()
+    monkeypatch.setattr(factory, "gspread_client", lambda: pytest.fail("the sheet was fetched"))
+
+    updater = GoogleSheetUpdater(("final_SKU_table.xlsx", "display", "sheet-id"), token_file, "", factory)
+    assert builds == []
+
+    assert updater.service_sheets is factory.sheets(token_file)
+    assert len(builds) == 1
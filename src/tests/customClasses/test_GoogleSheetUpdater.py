@@ -0,0 +1,144 @@
+"""
+Tests for the diff-based writes of GoogleSheetUpdater, against an in-memory Sheets service.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from bearaby_ops.customClasses.GoogleSheetUpdater import (
+    chunk_value_ranges, diff_value_ranges, frame_to_values, removed_leading_rows, write_values_diff,
+)
+
+
+class _Request:
+    def __init__(self, execute):
+        self.execute = execute
+
+
+class FakeSheetsService:
+    """Sheets API keeping one sheet in memory
+
+    Attributes:
+        rows: the rows of the sheet
+        requests: (method, body) of every write request received
+    """
+
+    def __init__(self, values, title="total_inventory", sheet_id=7):
+        self.rows = [list(row) for row in values]
+        self.title = title
+        self.sheet_id = sheet_id
+        self.requests = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return _Values(self)
+
+    def get(self, spreadsheetId, fields=None):
+        return _Request(lambda: {"sheets": [{"properties": {"sheetId": self.sheet_id, "title": self.title}}]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.requests.append(("spreadsheets.batchUpdate", body))
+        for request in body["requests"]:
+            rows = request["deleteDimension"]["range"]
+            assert rows["sheetId"] == self.sheet_id
+            del self.rows[rows["startIndex"]:rows["endIndex"]]
+        return _Request(lambda: {})
+
+
+class _Values:
+    def __init__(self, service):
+        self.service = service
+
+    def get(self, spreadsheetId, range, valueRenderOption=None):
+        # the API leaves out trailing empty cells and rows
+        rows = [list(row) for row in self.service.rows]
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        return _Request(lambda: {"values": rows})
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.service.requests.append(("values.batchUpdate", body))
+        values, cells = self.service.rows, 0
+        for value_range in body["data"]:
+            start = int(value_range["range"].rsplit("!A", 1)[1]) - 1
+            for offset, row in enumerate(value_range["values"]):
+                while len(values) <= start + offset:
+                    values.append([])
+                values[start + offset] = list(row)
+                cells += len(row)
+        return _Request(lambda: {"totalUpdatedCells": cells})
+
+
+def time_series(days, skus=50):
+    dates = pd.date_range("2026-09-01", periods=days).strftime("%m/%d/%Y")
+    return pd.DataFrame({
+        "SKU": np.tile([f"NAP{i:03d}" for i in range(skus)], days),
+        "Total Available": np.arange(days * skus) % 97,
+        "Date": np.repeat(dates, skus),
+    })
+
+
+def test_frame_to_values_converts_missing_and_numpy_values():
+    df = pd.DataFrame({"SKU": ["NAP001", None], "Total": [np.int64(3), np.nan]})
+
+    assert frame_to_values(df) == [["SKU", "Total"], ["NAP001", 3.0], ["", ""]]
+
+
+def test_diff_sends_only_changed_rows_and_clears_removed_ones():
+    current = [["SKU", "Total"], ["A", 1], ["B", 2], ["C", 3], ["D", 4]]
+    new = [["SKU", "Total"], ["A", 1.0], ["B", 5], ["C", 3]]
+
+    value_ranges = diff_value_ranges("total_inventory", current, new)
+
+    assert value_ranges == [
+        {"range": "'total_inventory'!A3", "values": [["B", 5]]},
+        {"range": "'total_inventory'!A5", "values": [["", ""]]},
+    ]
+
+
+def test_removed_leading_rows_needs_the_remaining_rows_in_order():
+    current = [["SKU"], ["A"], ["B"], ["C"]]
+
+    assert removed_leading_rows(current, [["SKU"], ["B"], ["C"], ["D"]]) == 1
+    assert removed_leading_rows(current, [["SKU"], ["B"], ["A"]]) == 0
+    assert removed_leading_rows(current, [["SKU", "Date"], ["B"], ["C"]]) == 0
+
+
+def test_chunks_stay_under_the_payload_limit():
+    rows = [["NAP%03d" % i, i] for i in range(100)]
+    value_ranges = [{"range": "'s'!A2", "values": rows}]
+
+    batches = chunk_value_ranges(value_ranges, max_payload_bytes=200)
+
+    assert len(batches) > 1
+    assert all(len(json.dumps(batch)) < 400 for batch in batches)
+    written = [row for batch in batches for value_range in batch for row in value_range["values"]]
+    assert written == rows
+    assert batches[1][0]["range"] == f"'s'!A{2 + len(batches[0][0]['values'])}"
+
+
+def test_rolling_time_series_writes_a_fraction_of_the_sheet():
+    yesterday, today = time_series(31), time_series(32).iloc[50:]
+    service = FakeSheetsService(frame_to_values(yesterday))
+
+    summary = write_values_diff(service, "sheet-id", "total_inventory", frame_to_values(today))
+
+    assert service.rows == frame_to_values(today)
+    # the oldest day is deleted and only the new day is written
+    assert summary == {"deleted_rows": 50, "rows": 50, "cells": 150, "requests": 1}
+
+
+def test_unchanged_sheet_sends_nothing():
+    values = frame_to_values(time_series(31))
+    service = FakeSheetsService(values)
+
+    summary = write_values_diff(service, "sheet-id", "total_inventory", values)
+
+    assert summary == {"deleted_rows": 0, "rows": 0, "cells": 0, "requests": 0}
+    assert service.requests == []
@@ -0,0 +1,53 @@
+"""
+Tests for the pooled HTTP transport shared by the warehouse API clients.
+"""
+from bearaby_ops.customClasses._3PLCenterAPI import _3PLCenterAPI
+from bearaby_ops.customClasses.HTTPTransport import HTTPTransport, get_default_transport
+from bearaby_ops.customClasses.ThinkLogisticsAPI import ThinkLogisticsAPI
+
+
+def test_default_transport_is_shared():
+    assert get_default_transport() is get_default_transport()
+
+
+def test_paginated_download_reuses_one_connection(think_logistics_server):
+    base_url, stub = think_logistics_server
+    api = ThinkLogisticsAPI("login", "secret", base_url=base_url, transport=HTTPTransport())
+
+    inventory = api.retrieve_inventory()
+
+    assert len(inventory) == 500
+    assert len(stub.requests) == 7
+    assert len(stub.connections) == 1
+
+
+def test_clients_share_an_injected_transport(tpl_center_server, think_logistics_server):
+    transport = HTTPTransport(timeout=5)
+    tpl_url, _ = tpl_center_server
+    tl_url, _ = think_logistics_server
+
+    tpl_api = _3PLCenterAPI("id", "secret", base_url=tpl_url, transport=transport)
+    tl_api = ThinkLogisticsAPI("login", "secret", base_url=tl_url, transport=transport)
+
+    assert tpl_api.transport is tl_api.transport is transport
+    assert tpl_api.token == "stub-token"
+
+
+def test_retries_exhausted_returns_last_response(tpl_center_server):
+    base_url, stub = tpl_center_server
+    stub.fail_once = {1}
+    transport = HTTPTransport(retries=0)
+
+    response = transport.get(f"{base_url}/inventory/stocksummaries", params={"pgnum": 1})
+
+    assert response.status_code == 503
+
+
+def test_3pl_center_pool_is_sized_by_its_workers(tpl_center_server):
+    base_url, _ = tpl_center_server
+    transport = HTTPTransport(pool_maxsize=8)
+
+    _3PLCenterAPI("id", "secret", base_url=base_url, max_workers=16, transport=transport)
+
+    assert transport.session.get_adapter(base_url).poolmanager.connection_pool_kw["maxsize"] == 16
+    assert transport.session.get_adapter("https://api.thinklogistics.com/").poolmanager.connection_pool_kw["maxsize"] == 8
@@ -0,0 +1,53 @@
+"""
+Tests for the on-disk token cache and the re-authentication of the API clients.
+"""
+import os
+import stat
+
+from bearaby_ops.customClasses._3PLCenterAPI import _3PLCenterAPI
+from bearaby_ops.customClasses.TokenCache import TokenCache
+
+
+def test_cached_token_is_returned_until_refresh_margin(tmp_path):
+    cache = TokenCache(str(tmp_path / "tokens.json"), refresh_margin=60)
+    key = cache.key("api", "https://example.com", "user")
+
+    cache.set(key, "fresh", expires_in=3600)
+    cache.set(cache.key("api", "https://example.com", "other"), "expiring", expires_in=30)
+
+    assert cache.get(key) == "fresh"
+    assert cache.get(cache.key("api", "https://example.com", "other")) is None
+    cache.invalidate(key)
+    assert cache.get(key) is None
+
+
+def test_cache_file_is_private_and_keyed_by_hash(tmp_path):
+    path = tmp_path / "cache" / "tokens.json"
+    cache = TokenCache(str(path))
+
+    cache.set(cache.key("api", "secret-user"), "token", expires_in=3600)
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert "secret-user" not in path.read_text()
+
+
+def test_token_is_reused_across_clients(tpl_center_server, token_cache):
+    base_url, stub = tpl_center_server
+
+    first = _3PLCenterAPI("id", "secret", base_url=base_url)
+    second = _3PLCenterAPI("id", "secret", base_url=base_url)
+
+    assert first.token == second.token == "stub-token"
+    assert stub.issued == 1
+
+
+def test_expired_token_is_refreshed_mid_pagination(tpl_center_server):
+    base_url, stub = tpl_center_server
+    api = _3PLCenterAPI("id", "secret", base_url=base_url)
+    stub.expired.add(api.token)
+
+    inventory = api._get_inventory_data()
+
+    assert len(inventory) == 2300
+    assert api.token == "stub-token-2"
+    assert stub.issued == 2
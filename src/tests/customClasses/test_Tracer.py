@@ -0,0 +1,118 @@
+"""
+Tests for the spans recorded around the outbound API calls.
+"""
+import json
+
+import pytest
+from googleapiclient.discovery import build
+
+from bearaby_ops.customClasses._3PLCenterAPI import _3PLCenterAPI
+from bearaby_ops.customClasses.HTTPTransport import HTTPTransport
+from bearaby_ops.customClasses.Tracer import TracedHttp, Tracer, attributes, endpoint_name, get_default_tracer
+from bearaby_ops.uploads import CSV_MIMETYPE, DriveUpload, upload_file
+
+from ..drive_stub import LocalHttp, StubDrive, serve_drive
+
+
+@pytest.fixture
+def tracer():
+    tracer = get_default_tracer()
+    tracer.clear()
+    yield tracer
+    tracer.clear()
+
+
+def test_ids_and_ranges_are_grouped_under_one_endpoint():
+    assert endpoint_name("get", "https://secure-wms.com/inventory/stocksummaries?pgnum=3") == \
+        "GET secure-wms.com/inventory/stocksummaries"
+    assert endpoint_name("PATCH", "https://www.googleapis.com/upload/drive/v3/files/1AbCdEfGhIjKlMnOpQ") == \
+        "PATCH www.googleapis.com/upload/drive/v3/files/{id}"
+    assert endpoint_name("PUT", "https://sheets.googleapis.com/v4/spreadsheets/42/values/Sheet1%21A1:B2") == \
+        "PUT sheets.googleapis.com/v4/spreadsheets/{id}/values/{range}"
+
+
+def test_every_request_of_a_download_is_a_span(tracer, tpl_center_server):
+    base_url, stub = tpl_center_server
+    stub.fail_once = {2}
+    api = _3PLCenterAPI("id", "secret", base_url=base_url, transport=HTTPTransport(backoff_factor=0))
+
+    api._get_inventory_data(parallel=False)
+
+    pages = [span for span in tracer.spans() if span.name.endswith("/inventory/stocksummaries")]
+    assert sorted(span.attributes["page"] for span in pages) == [1, 2, 3, 4, 5]
+    assert all(span.attributes["http.status_code"] == 200 for span in pages)
+    assert all(span.attributes["http.response_bytes"] > 0 for span in pages)
+    assert {span.attributes["page"]: span.attributes["http.retries"] for span in pages} == {1: 0, 2: 1, 3: 0, 4: 0, 5: 0}
+
+
+def test_summary_has_the_percentiles_of_each_endpoint():
+    tracer = Tracer()
+    for _ in range(100):
+        with tracer.span("GET a", **{"http.status_code": 200, "http.response_bytes": 10}):
+            pass
+    with pytest.raises(ConnectionError):
+        with tracer.span("GET b"):
+            raise ConnectionError("refused")
+
+    summary = tracer.summary()
+
+    assert summary["GET a"]["calls"] == 100
+    assert summary["GET a"]["bytes"] == 1000
+    assert summary["GET a"]["errors"] == 0
+    assert summary["GET a"]["p50"] <= summary["GET a"]["p95"] <= summary["GET a"]["p99"] <= summary["GET a"]["max"]
+    assert summary["GET b"]["errors"] == 1
+    assert tracer.spans()[-1].error == "ConnectionError: refused"
+
+
+def test_context_attributes_are_added_and_endpoint_is_replaced():
+    tracer = Tracer()
+    with attributes(page=4, endpoint="POST slack webhook"):
+        with tracer.span("POST hooks.slack.com/services/{id}/{id}/{id}"):
+            pass
+    with tracer.span("GET a"):
+        pass
+
+    first, second = tracer.spans()
+    assert (first.name, first.attributes) == ("POST slack webhook", {"page": 4})
+    assert (second.name, second.attributes) == ("GET a", {})
+
+
+def test_drive_uploads_are_traced(tmp_path):
+    stub = StubDrive()
+    server = serve_drive(stub)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    tracer = Tracer()
+    try:
+        service = build("drive", "v3", http=TracedHttp(LocalHttp(base_url), tracer), static_discovery=True)
+        path = tmp_path / "inventory.csv"
+        path.write_bytes(b"SKU,AVAILABLE\nNAP001,3\n")
+        existing = stub.add("inventory.csv", "folder")
+
+        upload_file(service, DriveUpload(str(path), "inventory.csv", "folder", CSV_MIMETYPE))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    names = [span.name for span in tracer.spans()]
+    assert names == ["GET www.googleapis.com/drive/v3/files", "PATCH www.googleapis.com/upload/drive/v3/files/{id}"]
+    assert existing not in json.dumps([span.to_dict() for span in tracer.spans()])
+
+
+def test_export_writes_plain_json_and_otlp(tmp_path):
+    tracer = Tracer()
+    with tracer.span("GET a", **{"http.status_code": 503, "page": 1}):
+        pass
+
+    tracer.export(tmp_path / "trace.json")
+    tracer.export(tmp_path / "trace.otlp.json", otlp=True)
+
+    plain = json.loads((tmp_path / "trace.json").read_text())
+    assert plain["trace_id"] == tracer.trace_id
+    assert plain["summary"]["GET a"]["errors"] == 1
+    assert plain["spans"][0]["attributes"] == {"http.status_code": 503, "page": 1}
+    otlp = json.loads((tmp_path / "trace.otlp.json").read_text())
+    span = otlp["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["traceId"] == tracer.trace_id and len(span["spanId"]) == 16
+    assert {"key": "http.status_code", "value": {"intValue": "503"}} in span["attributes"]
+    assert span["status"]["code"] == 2
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
@@ -0,0 +1,168 @@
+"""
+Local stand-in for the Google Drive v3 API, enough for the upload stage.
+"""
+import email
+import email.policy
+import itertools
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+
+GOOGLE_API = "https://www.googleapis.com"
+
+QUERY_PATTERN = re.compile(r"^name = '(?P<name>(?:[^'\\]|\\.)*)' and '(?P<folder>(?:[^'\\]|\\.)*)' in parents")
+
+
+class StubDrive:
+    """Drive files kept in memory
+
+    Attributes:
+        files: id -> dict with name, parents and content
+        requests: (method, path, uploadType) of every request received
+        connections: client addresses seen, one per worker connection
+        chunk_requests: number of PUT requests sending a chunk of a resumable session
+        fail_chunks: numbers of the chunk requests answered 503 instead, counted from 1
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.connections = set()
+        self.chunk_requests = 0
+        self.fail_chunks = set()
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def add(self, name, folder, content=b""):
+        file_id = f"file-{next(self.ids)}"
+        self.files[file_id] = {"name": name, "parents": [folder], "content": content}
+        return file_id
+
+    def find(self, query):
+        match = QUERY_PATTERN.match(query)
+        assert match, f"unfiltered files.list query: {query!r}"
+        name = match["name"].replace("\\'", "'")
+        folder = match["folder"].replace("\\'", "'")
+        return [
+            {"id": file_id} for file_id, f in self.files.items()
+            if f["name"] == name and folder in f["parents"]
+        ]
+
+    def save(self, file_id, metadata, content):
+        with self.lock:
+            if file_id is None:
+                file_id = f"file-{next(self.ids)}"
+                self.files[file_id] = {"name": metadata["name"], "parents": metadata["parents"]}
+            self.files[file_id]["content"] = content
+        return {"id": file_id}
+
+
+class LocalHttp(httplib2.Http):
+    """httplib2 connection sending the Google API requests to the stub server"""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+        # resumable uploads answer 308 without a redirect, as googleapiclient's build_http expects
+        self.redirect_codes = self.redirect_codes - {308}
+
+    def request(self, uri, *args, **kwargs):
+        return super().request(uri.replace(GOOGLE_API, self.base_url), *args, **kwargs)
+
+
+def drive_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status, body=None, headers=()):
+            payload = json.dumps(body).encode("utf-8") if body is not None else b""
+            self.send_response(status)
+            for header in headers:
+                self.send_header(*header)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def _record(self, url, query):
+            with stub.lock:
+                stub.requests.append((self.command, url.path, query.get("uploadType", [None])[0]))
+                stub.connections.add(self.client_address)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            self._record(url, query)
+            self._reply(200, {"files": stub.find(query["q"][0])[:int(query.get("pageSize", ["100"])[0])]})
+
+        def do_POST(self):
+            self._upload(None)
+
+        def do_PATCH(self):
+            self._upload(urlparse(self.path).path.rsplit("/", 1)[1])
+
+        def _upload(self, file_id):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            self._record(url, query)
+            body = self._body()
+            upload_type = query["uploadType"][0]
+            if upload_type == "resumable":
+                session = f"session-{next(stub.ids)}"
+                stub.sessions[session] = {
+                    "file_id": file_id, "metadata": json.loads(body or b"{}"), "content": b"",
+                }
+                location = f"http://{self.headers['Host']}/upload/session/{session}"
+                self._reply(200, headers=[("Location", location)])
+            elif upload_type == "multipart":
+                message = email.message_from_bytes(
+                    b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body,
+                    policy=email.policy.HTTP,
+                )
+                metadata, media = list(message.iter_parts())
+                self._reply(200, stub.save(file_id, json.loads(metadata.get_content()), media.get_payload(decode=True)))
+            else:
+                self._reply(200, stub.save(file_id, {}, body))
+
+        def do_PUT(self):
+            session = stub.sessions[urlparse(self.path).path.rsplit("/", 1)[1]]
+            body = self._body()
+            if self.headers["Content-Range"].startswith("bytes */"):
+                # status of an interrupted session, the bytes received so far
+                received = len(session["content"])
+                self._reply(308, headers=[("Range", f"bytes=0-{received - 1}")] if received else [])
+                return
+            with stub.lock:
+                stub.chunk_requests += 1
+                stub.connections.add(self.client_address)
+                failed = stub.chunk_requests in stub.fail_chunks
+            if failed:
+                self._reply(503, {"error": {"code": 503, "message": "Backend Error"}})
+                return
+            start, end, total = map(int, re.match(r"bytes (\d+)-(\d+)/(\d+)", self.headers["Content-Range"]).groups())
+            assert start == len(session["content"])
+            session["content"] += body
+            if end + 1 < total:
+                self._reply(308, headers=[("Range", f"bytes=0-{end}")])
+            else:
+                self._reply(200, stub.save(session["file_id"], session["metadata"], session["content"]))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve_drive(stub):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), drive_handler(stub))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,44 @@
+"""
+Tests for the memory dataset sharing frames under pandas Copy-on-Write.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearaby_ops.extras.datasets import CopyOnWriteMemoryDataset
+
+
+@pytest.fixture
+def copy_on_write():
+    with pd.option_context("mode.copy_on_write", True):
+        yield
+
+
+def test_loads_share_the_data_until_it_is_modified(copy_on_write):
+    frame = pd.DataFrame({"AVAILABLE": np.arange(1000)})
+    dataset = CopyOnWriteMemoryDataset(frame)
+
+    first, second = dataset.load(), dataset.load()
+
+    assert first is not second
+    assert np.shares_memory(first["AVAILABLE"].to_numpy(), frame["AVAILABLE"].to_numpy())
+    first.loc[0, "AVAILABLE"] = -1
+    first.drop(index=1, inplace=True)
+    assert second["AVAILABLE"].iloc[0] == 0 and len(second) == 1000
+    assert dataset.load()["AVAILABLE"].tolist() == list(range(1000))
+
+
+def test_frames_are_copied_without_copy_on_write():
+    frame = pd.DataFrame({"AVAILABLE": np.arange(10)})
+    with pd.option_context("mode.copy_on_write", False):
+        loaded = CopyOnWriteMemoryDataset(frame).load()
+
+    assert not np.shares_memory(loaded["AVAILABLE"].to_numpy(), frame["AVAILABLE"].to_numpy())
+
+
+def test_other_objects_are_copied(copy_on_write):
+    dataset = CopyOnWriteMemoryDataset({"warehouses": ["BLNJ"]})
+
+    dataset.load()["warehouses"].append("3PLC LA")
+
+    assert dataset.load() == {"warehouses": ["BLNJ"]}
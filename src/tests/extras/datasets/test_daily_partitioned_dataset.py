@@ -0,0 +1,61 @@
+"""
+Tests for the day-partitioned time series dataset.
+"""
+import pandas as pd
+import pytest
+from kedro.io import DataCatalog
+
+from bearaby_ops.extras.datasets import DailyPartitionedDataSet
+
+
+def day(date, skus=("NAP001", "NAP002"), available=(3, 4)):
+    return pd.DataFrame({"SKU": list(skus), "Total Available": list(available), "Date": date})
+
+
+@pytest.fixture
+def history(tmp_path):
+    return DailyPartitionedDataSet(
+        str(tmp_path / "history"), date_column="Date", date_format="%m/%d/%Y", retention_days=3
+    )
+
+
+def test_saving_a_day_keeps_the_other_days(history):
+    history.save(day("10/01/2026"))
+    history.save(day("10/02/2026", available=(5, 6)))
+
+    loaded = history.load()
+
+    assert loaded["Date"].tolist() == ["10/01/2026"] * 2 + ["10/02/2026"] * 2
+    assert loaded["Total Available"].tolist() == [3, 4, 5, 6]
+
+
+def test_saving_the_same_day_again_replaces_it(history):
+    history.save(day("10/01/2026"))
+    history.save(day("10/01/2026", skus=("NAP003",), available=(9,)))
+
+    pd.testing.assert_frame_equal(history.load(), day("10/01/2026", skus=("NAP003",), available=(9,)))
+
+
+def test_retention_drops_the_oldest_partitions(history, tmp_path):
+    seed = pd.concat([day(f"09/{d:02d}/2026") for d in range(25, 31)])
+    history.save(seed)
+    history.save(day("10/01/2026"))
+
+    assert [d.isoformat() for d in history.partitions()] == ["2026-09-29", "2026-09-30", "2026-10-01"]
+    assert sorted(p.name for p in (tmp_path / "history").iterdir()) == [
+        "date=2026-09-29", "date=2026-09-30", "date=2026-10-01",
+    ]
+
+
+def test_catalog_entry_reports_missing_history(tmp_path):
+    catalog = DataCatalog.from_config({
+        "total_inventory_history": {
+            "type": "bearaby_ops.extras.datasets.DailyPartitionedDataSet",
+            "filepath": str(tmp_path / "history"),
+            "date_format": "%m/%d/%Y",
+        },
+    })
+
+    assert not catalog.exists("total_inventory_history")
+    catalog.save("total_inventory_history", day("10/01/2026"))
+    assert catalog.exists("total_inventory_history")
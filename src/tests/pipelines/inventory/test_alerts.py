@@ -0,0 +1,77 @@
+"""
+Tests for the inventory deltas and alert thresholds.
+"""
+import pandas as pd
+import pytest
+
+from bearaby_ops.pipelines.inventory.alerts import compute_deltas, evaluate_thresholds
+from bearaby_ops.pipelines.inventory.nodes import inventory_snapshot
+
+
+@pytest.fixture
+def snapshots():
+    rows = [
+        ("10/01/2026", "NAP001", "Napper", "BLNJ", 100),
+        ("10/01/2026", "NAP001", "Napper", "3PLC LA", 50),
+        ("10/01/2026", "TRE001", "Tree", "BLNJ", 30),
+        ("10/02/2026", "NAP001", "Napper", "BLNJ", 20),
+        ("10/02/2026", "NAP001", "Napper", "3PLC LA", 55),
+        ("10/02/2026", "TRE001", "Tree", "BLNJ", 30),
+        ("10/02/2026", "TRE002", "Tree", "BLNJ", 12),
+    ]
+    return pd.DataFrame(rows, columns=["Date", "SKU", "Collection", "Warehouse", "Available"])
+
+
+def test_deltas_compare_the_last_two_days(snapshots):
+    older = snapshots.assign(Date="09/30/2026", Available=1000)
+
+    deltas = compute_deltas(pd.concat([older, snapshots]), "sku").set_index("name")
+
+    assert deltas.loc["NAP001"].tolist() == [150, 75, -75]
+    assert deltas.loc["TRE002"].tolist() == [0, 12, 12]
+    assert compute_deltas(snapshots, "total")["delta"].tolist() == [-63]
+
+
+def test_single_day_has_no_deltas(snapshots):
+    assert compute_deltas(snapshots[snapshots["Date"] == "10/02/2026"], "warehouse").empty
+    assert evaluate_thresholds(snapshots.iloc[:0], {"total": 1}) == []
+
+
+def test_thresholds_per_level_and_name(snapshots):
+    thresholds = {
+        "total": 500,
+        "collection": {"Tree": 10},
+        "warehouse": 5,
+        "sku": {"default": 70, "TRE002": 100},
+    }
+
+    alerts = evaluate_thresholds(snapshots, thresholds)
+
+    assert [(a["level"], a["name"], a["delta"], a["threshold"]) for a in alerts] == [
+        ("collection", "Tree", 12.0, 10.0),
+        ("warehouse", "3PLC LA", 5.0, 5.0),
+        ("warehouse", "BLNJ", -68.0, 5.0),
+        ("sku", "NAP001", -75.0, 70.0),
+    ]
+    assert {a["date"] for a in alerts} == {"10/02/2026"}
+
+
+def test_empty_levels_raise_no_alerts(snapshots):
+    assert evaluate_thresholds(snapshots, {"total": 500, "sku": {}, "warehouse": None}) == []
+
+
+def test_snapshot_has_one_row_per_sku_and_warehouse():
+    final_SKU_table = pd.DataFrame({
+        "SKU": ["NAP001", "TRE001"],
+        "Collection": ["Napper", "Tree"],
+        "Updated_BLNJ": [1, 2],
+        "Updated_3PLC LA": [3, 4],
+        "Total": [4, 6],
+    })
+
+    snapshot = inventory_snapshot(final_SKU_table, ["BLNJ", "3PLC LA"])
+
+    assert list(snapshot.columns) == ["Date", "SKU", "Collection", "Warehouse", "Available"]
+    assert snapshot[["SKU", "Warehouse", "Available"]].values.tolist() == [
+        ["NAP001", "BLNJ", 1], ["TRE001", "BLNJ", 2], ["NAP001", "3PLC LA", 3], ["TRE001", "3PLC LA", 4],
+    ]
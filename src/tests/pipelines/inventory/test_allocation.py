@@ -0,0 +1,39 @@
+"""
+Tests for the quota allocation of pipeline 'inventory'.
+"""
+import pandas as pd
+
+from bearaby_ops.pipelines.inventory.allocation import allocate_quota, priority_order
+
+WAREHOUSES = ["BLNJ", "3PLC LA", "3PLC NJ"]
+PRIORITY = ["BLNJ", "BLPA", "3PLC NJ", "3PLC LA", "SMC"]
+
+
+def test_priority_order_keeps_unlisted_warehouses_last():
+    assert priority_order(["3PLC LA", "NEW", "BLNJ"], PRIORITY) == ["BLNJ", "3PLC LA", "NEW"]
+
+
+def test_quota_taken_from_largest_warehouse():
+    stock = pd.DataFrame({"BLNJ": [5, 0], "3PLC LA": [1, 9], "3PLC NJ": [2, 3]})
+    allocation = allocate_quota(stock, pd.Series([2, 4]), WAREHOUSES, PRIORITY)
+
+    assert allocation["Warehouse"].tolist() == ["BLNJ", "3PLC LA"]
+    assert allocation["Updated_BLNJ"].tolist() == [3, 0]
+    assert allocation["Updated_3PLC LA"].tolist() == [1, 5]
+    assert allocation["Total Inventory"].tolist() == [8, 12]
+    assert allocation["Total Available"].tolist() == [6, 8]
+
+
+def test_ties_follow_priority_not_column_order():
+    stock = pd.DataFrame({"BLNJ": [0, 4], "3PLC LA": [7, 4], "3PLC NJ": [7, 1]})
+    allocation = allocate_quota(stock, pd.Series([1, 1]), WAREHOUSES, PRIORITY)
+
+    assert allocation["Warehouse"].tolist() == ["3PLC NJ", "BLNJ"]
+
+
+def test_missing_warehouse_counts_as_empty():
+    stock = pd.DataFrame({"BLNJ": [3]})
+    allocation = allocate_quota(stock, pd.Series([1.0]), WAREHOUSES, PRIORITY)
+
+    assert allocation["Updated_3PLC NJ"].tolist() == [0]
+    assert allocation["Total Available"].tolist() == [2.0]
@@ -0,0 +1,85 @@
+"""
+Tests for the robust z-score anomaly detection over the snapshot history.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearaby_ops.pipelines.inventory.anomalies import detect_anomalies, robust_zscores, series_matrix
+
+
+def history(values, sku="NAP001", warehouse="BLNJ", collection="Napper", start="2026-09-01"):
+    days = pd.date_range(start, periods=len(values)).strftime("%m/%d/%Y")
+    return pd.DataFrame({
+        "Date": days, "SKU": sku, "Collection": collection, "Warehouse": warehouse, "Available": values,
+    })
+
+
+def test_matrix_is_dense_with_missing_days_as_nan():
+    snapshots = pd.concat([history([1, 2, 3]), history([7, 9], warehouse="3PLC LA", start="2026-09-02")])
+
+    days, keys, matrix = series_matrix(snapshots)
+
+    assert list(days.day) == [1, 2, 3]
+    assert keys.values.tolist() == [["NAP001", "Napper", "BLNJ"], ["NAP001", "Napper", "3PLC LA"]]
+    np.testing.assert_array_equal(matrix, [[1, np.nan], [2, 7], [3, 9]])
+
+
+def test_scores_match_the_robust_zscore():
+    values = [100, 102, 98, 101, 99, 100, 103, 40]
+    scores = robust_zscores(np.array(values, dtype=float)[:, None])
+
+    median = np.median(values[:-1])
+    mad = np.median(np.abs(np.array(values[:-1]) - median))
+    assert scores.loc[0, "Score"] == pytest.approx((40 - median) / (1.4826 * mad))
+    assert scores.loc[0, "History"] == 7
+
+
+def test_short_or_missing_series_are_not_scored():
+    matrix = np.array([[1, 5, 5], [1, 5, 5], [1, np.nan, 5], [50, 5, np.nan]], dtype=float)
+
+    scores = robust_zscores(matrix, min_history=3)
+
+    assert scores["Score"].isna().tolist() == [False, True, True]
+    # a flat series is scored in units instead of dividing by a zero MAD
+    assert scores.loc[0, "Score"] == 49
+
+
+def test_outliers_are_ranked_by_absolute_score():
+    steady = [100, 101, 99, 100, 102, 98, 100, 101]
+    snapshots = pd.concat([
+        history(steady),
+        history(steady[:-1] + [20], sku="NAP002"),
+        history(steady[:-1] + [160], sku="NAP003", warehouse="3PLC NJ"),
+        history(steady[:-1] + [40], sku="TRE001", collection="Tree"),
+    ])
+
+    anomalies = detect_anomalies(snapshots, z_threshold=3.5, min_history=7, max_rows=2)
+
+    assert anomalies[["Rank", "SKU", "Warehouse"]].values.tolist() == [[1, "NAP002", "BLNJ"], [2, "NAP003", "3PLC NJ"]]
+    assert set(anomalies["Date"]) == {"09/08/2026"}
+    assert detect_anomalies(snapshots.iloc[:0]).empty
+
+
+def test_tens_of_thousands_of_series_are_scored_in_seconds():
+    rng = np.random.default_rng(0)
+    skus, warehouses, days = 10_000, 3, 31
+    available = rng.poisson(200, size=(days, skus * warehouses))
+    available[-1, :25] = 0
+    snapshots = pd.DataFrame({
+        "Date": np.repeat(pd.date_range("2026-09-01", periods=days).strftime("%m/%d/%Y"), skus * warehouses),
+        "SKU": np.tile(np.repeat([f"NAP{i:05d}" for i in range(skus)], warehouses), days),
+        "Collection": "Napper",
+        "Warehouse": np.tile(["BLNJ", "3PLC LA", "3PLC NJ"], skus * days),
+        "Available": available.ravel(),
+    })
+
+    started = time.monotonic()
+    anomalies = detect_anomalies(snapshots, z_threshold=6)
+    elapsed = time.monotonic() - started
+
+    assert len(anomalies) == 25
+    assert (anomalies["Available"] == 0).all()
+    assert elapsed < 5
@@ -0,0 +1,161 @@
+"""
+Tests for the nodes of pipeline 'inventory'.
+"""
+import pandas as pd
+import pytest
+from kedro.io import DataCatalog
+
+from bearaby_ops.pipelines.inventory.nodes import (
+    barplot_of_available_inventory_per_warehouse, inventory_cube, merge_tables, metrics,
+    preprocess_bergenInventory_products, preprocess_tplCenter, quota_barplot, stacked_barplot,
+)
+from bearaby_ops.pipelines.inventory.schemas import INVENTORY_CUBE_SCHEMA, INVENTORY_SCHEMA, apply_schema
+
+
+@pytest.fixture
+def merged_table():
+    return pd.DataFrame({
+        "UPCCODE": ["810000000001", "810000000002", "810000000003", "810000000004"],
+        "WAREHOUSEID": ["BLNJ", "3PLC NJ", "3PLC LA", "BLNJ"],
+        "SKU": ["NAP001", "Missing_SKU_", "NAP003", "Missing_SKU_"],
+        "ACTUALQTY": [10, 20, 30, 40],
+        "AVAILABLE": [8, 18, 28, 38],
+        "PENDINGPICKING": [2, 2, 2, 2],
+    })
+
+
+@pytest.fixture
+def retail_quota():
+    return pd.DataFrame({"SKU": ["NAP001"], "Quota": [1], "Quota Amount": [5]})
+
+
+@pytest.fixture
+def all_SKU_shopify():
+    return pd.DataFrame({
+        "SKU": ["NAP001", "NAP002", "NAP002B", "NAP003"],
+        "UPCCODE": [810000000001.0, 810000000002.0, 810000000002.0, 810000000003.0],
+    })
+
+
+class TestMetrics:
+    def test_missing_sku_is_backfilled_from_shopify_upc(
+        self, merged_table, retail_quota, all_SKU_shopify
+    ):
+        result = metrics(merged_table, retail_quota, all_SKU_shopify)
+
+        # float UPCs in the catalog match string UPCs, first SKU wins on repeats
+        assert "NAP002" in set(result["SKU"])
+        assert "NAP002B" not in set(result.loc[result["3PLC NJ"] > 0, "SKU"])
+
+    def test_unresolved_upc_stays_in_missing_bucket(
+        self, merged_table, retail_quota, all_SKU_shopify, caplog
+    ):
+        result = metrics(merged_table, retail_quota, all_SKU_shopify)
+
+        missing = result[result["SKU"] == "Missing_SKU_"]
+        assert missing["BLNJ"].sum() == 38
+        assert "810000000004" in caplog.text
+
+
+class TestParquetIntermediates:
+    def test_metrics_table_round_trips_with_string_upc(
+        self, merged_table, retail_quota, all_SKU_shopify, tmp_path
+    ):
+        catalog = DataCatalog.from_config({
+            "metrics_table": {"type": "pandas.ParquetDataSet", "filepath": str(tmp_path / "metrics.pq")},
+        })
+        result = metrics(merged_table, retail_quota, all_SKU_shopify)
+
+        catalog.save("metrics_table", result)
+        loaded = catalog.load("metrics_table")
+
+        pd.testing.assert_frame_equal(loaded, result)
+        assert set(loaded["UPC"]) == {"810000000001", "810000000002", "810000000003", "810000000004"}
+
+
+class TestInventorySchema:
+    @pytest.fixture
+    def bergen(self):
+        return pd.DataFrame({
+            "WAREHOUSENAME": ["Bergen Logistics NJ299"] * 2,
+            "UPCCODE": ["810000000001", "810000000004"],
+            "SKU": ["NAP001", None],
+            "ACTUALQTY": [10, 40],
+            "AVAILABLE": [8, 38],
+            "PENDINGPICKING": [2, 2],
+        })
+
+    @pytest.fixture
+    def tpl_center(self):
+        return pd.DataFrame({
+            "SKU": ["NAP003", "NAP009"],
+            "facilityId": [659, 1],
+            "onHand": [30, 5],
+            "AVAILABLE": [28, 5],
+        })
+
+    @pytest.fixture
+    def skus(self):
+        # UPCs read from Excel without a dtype come in as floats
+        return pd.DataFrame({"SKU": ["NAP003", "NAP009"], "UPC": [810000000003.0, 8.1]})
+
+    def test_preprocess_nodes_return_inventory_records(self, bergen, tpl_center, skus):
+        for record in (
+            preprocess_bergenInventory_products(bergen),
+            preprocess_tplCenter(tpl_center, skus),
+        ):
+            assert list(record.columns) == list(INVENTORY_SCHEMA)
+            assert record["UPCCODE"].dtype == "string"
+            assert record["SKU"].dtype == "category"
+            assert record["AVAILABLE"].dtype == "int32"
+
+    def test_merge_tables_keeps_only_full_upcs(self, bergen, tpl_center, skus):
+        merged = merge_tables(
+            preprocess_bergenInventory_products(bergen), preprocess_tplCenter(tpl_center, skus)
+        )
+
+        assert list(merged["UPCCODE"]) == ["810000000001", "810000000004", "810000000003"]
+        assert merged["WAREHOUSEID"].dtype == "category"
+
+    def test_metrics_accepts_inventory_records(self, merged_table, retail_quota, all_SKU_shopify):
+        record = apply_schema(merged_table, INVENTORY_SCHEMA)
+
+        result = metrics(record, retail_quota, all_SKU_shopify)
+
+        pd.testing.assert_frame_equal(result, metrics(merged_table, retail_quota, all_SKU_shopify))
+
+
+class TestInventoryCube:
+    @pytest.fixture
+    def skus(self):
+        return pd.DataFrame({
+            "SKU": ["NAP001", "NAP001", "NAP003"],
+            "Collection": ["Napper", "Napper", "Napper"],
+            "Product Description": ["Napper Grey", "Napper Grey (old)", "Napper Blue"],
+        })
+
+    @pytest.fixture
+    def cube(self, merged_table, retail_quota, all_SKU_shopify, skus):
+        metrics_table = metrics(merged_table.copy(), retail_quota, all_SKU_shopify)
+        return inventory_cube(apply_schema(merged_table, INVENTORY_SCHEMA), metrics_table, skus)
+
+    def test_one_row_per_warehouse_and_sku(self, cube, merged_table):
+        assert list(cube.columns) == list(INVENTORY_CUBE_SCHEMA)
+        assert not cube.duplicated(subset=["WAREHOUSEID", "SKU"]).any()
+        assert cube["AVAILABLE"].sum() == merged_table["AVAILABLE"].sum()
+        # the quota is counted once, in the warehouse it is allocated to
+        quota = cube[cube["Quota Amount"] > 0]
+        assert quota[["WAREHOUSEID", "SKU", "Quota Amount"]].astype(str).values.tolist() == [["BLNJ", "NAP001", "5.0"]]
+        # repeated SKUs in the SKU table do not duplicate inventory
+        assert cube.loc[cube["SKU"] == "NAP001", "Product Description"].tolist() == ["Napper Grey"]
+
+    def test_plots_read_the_cube(self, cube):
+        warehouses = barplot_of_available_inventory_per_warehouse(cube)
+        assert {trace.x[0]: trace.y[0] for trace in warehouses.data} == {"BLNJ": 46, "3PLC NJ": 18, "3PLC LA": 28}
+
+        assert list(quota_barplot(cube).data[0].x) == ["NAP001"]
+
+        stacked = stacked_barplot(cube)
+        assert sorted((trace.name, list(trace.x)) for trace in stacked.data) == [
+            ("3PLC LA", ["Napper Blue"]), ("BLNJ", ["Napper Grey"]),
+        ]
@@ -1,9 +1,98 @@
 """
-This is a boilerplate test file for pipeline 'inventory'
-generated using Kedro 0.18.12.
-Please add your pipeline tests here.
-
-Kedro recommends using `pytest` framework, more info about it can be found
-in the official documentation:
-https://docs.pytest.org/en/latest/getting-started.html
+Tests for the pipeline 'inventory', run end to end on synthetic inputs.
 """
+import time
+
+import pandas as pd
+import pytest
+from kedro.framework.hooks import _create_hook_manager
+from kedro.runner import SequentialRunner
+
+from bearaby_ops.catalog import OptimizingDataCatalog
+from bearaby_ops.ownership import MutationGuardHooks
+from bearaby_ops.pipelines.inventory.pipeline import create_pipeline
+from bearaby_ops.pipelines.inventory.schemas import FINAL_SKU_TABLE_SCHEMA
+from bearaby_ops.runner import ParallelRunner, ThreadRunner
+from benchmarks.synthetic import RAW_DATASETS, synthetic_catalog, synthetic_inputs
+
+
+def test_synthetic_inputs_are_reproducible():
+    first, second = synthetic_inputs(200, seed=1), synthetic_inputs(200, seed=1)
+
+    assert list(first) == RAW_DATASETS
+    for name in RAW_DATASETS:
+        assert first[name].equals(second[name])
+
+
+def test_pipeline_runs_on_synthetic_inputs(tmp_path):
+    inputs = synthetic_inputs(1_000)
+    catalog = synthetic_catalog(1_000, tmp_path)
+
+    outputs = SequentialRunner().run(create_pipeline(), catalog)
+
+    final_SKU_table = outputs["final_SKU_table_export"]
+    assert final_SKU_table["SKU"].is_unique
+    bergen = inputs["bergenInventoryNJ"]
+    tpl_center = inputs["tplCenter"].groupby("facilityId")["AVAILABLE"].sum()
+    # only the Bergen rows with a full UPC are kept
+    assert final_SKU_table["BLNJ"].sum() == bergen.loc[bergen["UPCCODE"].str.len() == 12, "AVAILABLE"].sum()
+    assert final_SKU_table["3PLC LA"].sum() == tpl_center[659]
+    assert final_SKU_table["3PLC NJ"].sum() == tpl_center[660]
+    snapshots = catalog.load("inventory_snapshot_history@all")
+    assert set(snapshots["Warehouse"]) == {"BLNJ", "3PLC LA", "3PLC NJ"}
+    assert outputs["inventory_alerts"] == []
+
+
+def test_optimized_catalog_gives_the_same_tables(tmp_path):
+    outputs = SequentialRunner().run(create_pipeline(), synthetic_catalog(1_000, tmp_path / "memory"))
+    optimized = SequentialRunner().run(create_pipeline(), synthetic_catalog(
+        1_000, tmp_path / "files", persist_raw=True, catalog_class=OptimizingDataCatalog,
+    ))
+
+    expected, final_SKU_table = outputs["final_SKU_table_export"], optimized["final_SKU_table_export"]
+    # the columns outside FINAL_SKU_TABLE_SCHEMA keep their narrower dtypes
+    for column in FINAL_SKU_TABLE_SCHEMA:
+        assert final_SKU_table[column].dtype == expected[column].dtype
+    pd.testing.assert_frame_equal(final_SKU_table, expected, check_dtype=False, check_categorical=False)
+
+
+def test_copy_on_write_run_gives_the_same_tables_and_modifies_no_shared_input(tmp_path):
+    expected = SequentialRunner().run(create_pipeline(), synthetic_catalog(
+        1_000, tmp_path / "copies", persist_raw=True, catalog_class=OptimizingDataCatalog,
+    ))
+    # the process-wide option settings.py sets, and the guard CHECK_MUTATIONS registers
+    hook_manager = _create_hook_manager()
+    hook_manager.register(MutationGuardHooks())
+    with pd.option_context("mode.copy_on_write", True):
+        outputs = SequentialRunner().run(create_pipeline(), synthetic_catalog(
+            1_000, tmp_path / "views", persist_raw=True, catalog_class=OptimizingDataCatalog,
+        ), hook_manager)
+
+    assert set(outputs) == set(expected)
+    pd.testing.assert_frame_equal(outputs["final_SKU_table_export"], expected["final_SKU_table_export"])
+    assert outputs["experiment_metrics"] == expected["experiment_metrics"]
+    assert outputs["inventory_alerts"] == expected["inventory_alerts"]
+
+
+@pytest.mark.parametrize("runner", [ThreadRunner(max_workers=4), ParallelRunner(max_workers=2)], ids=type)
+def test_runners_give_the_same_tables(runner, tmp_path, record_property):
+    timings = {}
+    results = {}
+    for name, run in [("sequential", SequentialRunner()), ("concurrent", runner)]:
+        catalog = synthetic_catalog(
+            1_000, tmp_path / name, persist_raw=True, catalog_class=OptimizingDataCatalog,
+        )
+        start = time.perf_counter()
+        outputs = run.run(create_pipeline(), catalog)
+        timings[name] = time.perf_counter() - start
+        results[name] = outputs, catalog.load("inventory_snapshot_history@all")
+    # kept in the junit report to compare the runners, not asserted on shared machines
+    record_property("sequential_seconds", round(timings["sequential"], 3))
+    record_property(f"{type(runner).__name__}_seconds", round(timings["concurrent"], 3))
+
+    (expected, expected_snapshots), (outputs, snapshots) = results["sequential"], results["concurrent"]
+    assert set(outputs) == set(expected)
+    pd.testing.assert_frame_equal(outputs["final_SKU_table_export"], expected["final_SKU_table_export"])
+    pd.testing.assert_frame_equal(snapshots, expected_snapshots)
+    assert outputs["experiment_metrics"] == expected["experiment_metrics"]
+    assert outputs["inventory_alerts"] == expected["inventory_alerts"]
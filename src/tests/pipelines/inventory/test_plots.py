@@ -0,0 +1,89 @@
+"""
+Tests for the size bounds of the plotly outputs.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from kedro.io import DataCatalog
+
+from bearaby_ops.pipelines.inventory.nodes import quota_barplot, stacked_barplot
+from bearaby_ops.pipelines.inventory.plots import bounded_figure, figure_size, top_n
+from bearaby_ops.pipelines.inventory.schemas import INVENTORY_CUBE_SCHEMA, apply_schema
+
+
+@pytest.fixture
+def large_cube():
+    rng = np.random.default_rng(0)
+    skus = 50_000
+    warehouses = ["BLNJ", "3PLC LA", "3PLC NJ"]
+    cube = pd.DataFrame({
+        "WAREHOUSEID": np.tile(warehouses, skus),
+        "SKU": np.repeat([f"NAP{i:05d}" for i in range(skus)], len(warehouses)),
+        "Collection": "Napper",
+        "Product Description": np.repeat([f"Napper {i:05d} Weighted Blanket" for i in range(skus)], len(warehouses)),
+        "AVAILABLE": rng.integers(0, 1000, size=skus * len(warehouses)),
+        "Quota Amount": rng.integers(0, 3, size=skus * len(warehouses)).astype(float),
+    })
+    return apply_schema(cube, INVENTORY_CUBE_SCHEMA)
+
+
+def test_top_n_sums_the_rest_into_other():
+    frame = pd.DataFrame({
+        "Product": ["a", "a", "b", "c", "c", "d"],
+        "Warehouse": ["NJ", "LA", "NJ", "NJ", "LA", "LA"],
+        "Available": [5, 5, 20, 1, 2, 4],
+    })
+
+    bars = top_n(frame, "Product", "Available", 2, by=["Warehouse"])
+
+    assert bars.values.tolist() == [
+        ["b", "NJ", 20], ["a", "NJ", 5], ["a", "LA", 5], ["Other", "NJ", 1], ["Other", "LA", 6],
+    ]
+    assert bars["Available"].sum() == frame["Available"].sum()
+    assert top_n(frame, "Product", "Available", 10)["Product"].tolist() == ["b", "a", "a", "d", "c", "c"]
+
+
+def test_figure_is_rebuilt_with_fewer_bars_until_it_fits(large_cube):
+    sizes = {}
+
+    def build(n):
+        fig = stacked_barplot(large_cube, {"top_n": n, "max_bytes": 10**9})
+        sizes[n] = figure_size(fig)
+        return fig
+
+    fig = bounded_figure(build, top_n=400, max_bytes=30_000)
+
+    assert figure_size(fig) <= 30_000
+    assert sizes[400] > 30_000 and min(sizes) < 400
+    with pytest.raises(ValueError):
+        bounded_figure(build, top_n=1, max_bytes=100)
+
+
+def test_numbers_are_written_as_typed_arrays(large_cube):
+    fig = quota_barplot(large_cube, {"top_n": 10})
+
+    trace = fig.to_plotly_json()["data"][0]
+    assert len(trace["x"]) == 11 and trace["x"][-1] == "Other"
+    assert '"bdata"' in fig.to_json()
+
+
+def test_50k_skus_give_a_bounded_artifact_in_time(large_cube, tmp_path):
+    catalog = DataCatalog.from_config({
+        name: {"type": "plotly.JSONDataSet", "filepath": str(tmp_path / f"{name}.json")}
+        for name in ("quota_barplot", "stacked_barplot_for_sku")
+    })
+    options = {"top_n": 25, "max_bytes": 200_000}
+
+    started = time.monotonic()
+    catalog.save("quota_barplot", quota_barplot(large_cube, options))
+    stacked = stacked_barplot(large_cube, options)
+    catalog.save("stacked_barplot_for_sku", stacked)
+    elapsed = time.monotonic() - started
+
+    for name in ("quota_barplot", "stacked_barplot_for_sku"):
+        assert (tmp_path / f"{name}.json").stat().st_size <= options["max_bytes"]
+        assert catalog.load(name).data
+    assert sum(trace.y.sum() for trace in stacked.data) == large_cube["AVAILABLE"].sum()
+    assert elapsed < 5
@@ -0,0 +1,81 @@
+"""
+Tests for the SKU canonicalization of pipeline 'inventory'.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bearaby_ops.pipelines.inventory.nodes import preprocess_quota
+from bearaby_ops.pipelines.inventory.sku import TL_PREFIX_LENGTH, canonical_sku, clear_cache
+
+ALPHABET = list("AB01-- ")
+
+
+def legacy_canonical_sku(x):
+    return x.split("-")[0] + x.split("-")[1] if len(x.split("-")) > 2 else x.split("-")[0]
+
+
+def legacy_strip_tl_prefix(x):
+    return x[2:] if len(x) > 2 else 0
+
+
+def random_skus(seed, size=2000, min_length=0):
+    # a small alphabet with dashes makes repeated SKUs and dash runs likely
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(min_length, 9, size=size)
+    return pd.Series(["".join(rng.choice(ALPHABET, size=n)) for n in lengths])
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_canonical_sku_matches_legacy_lambda(seed):
+    skus = random_skus(seed)
+
+    assert canonical_sku(skus).tolist() == skus.apply(legacy_canonical_sku).tolist()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_memoized_skus_give_the_same_result(seed):
+    first, second = random_skus(seed), random_skus(seed + 100)
+    canonical_sku(first)
+
+    assert canonical_sku(second).tolist() == second.apply(legacy_canonical_sku).tolist()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_tl_stock_codes_match_legacy_lambdas(seed):
+    # the legacy lambdas fail on codes of 2 characters or less, only longer ones compare
+    codes = random_skus(seed, min_length=3)
+
+    result = canonical_sku(codes, TL_PREFIX_LENGTH)
+
+    expected = codes.apply(legacy_strip_tl_prefix).apply(legacy_canonical_sku)
+    assert result.tolist() == expected.tolist()
+
+
+def test_short_tl_codes_and_missing_skus_stay_missing():
+    result = canonical_sku(pd.Series(["TL", None, "TLNAP-GR-15"], index=[3, 1, 2]), TL_PREFIX_LENGTH)
+
+    assert result.index.tolist() == [3, 1, 2]
+    assert result.isna().tolist() == [True, True, False]
+    assert result[2] == "NAPGR"
+
+
+def test_preprocess_quota_canonicalizes_sku():
+    quota = pd.DataFrame({
+        "SKU": ["NAP-GR-15", "NAP001-A"],
+        "Quota": [1, 0],
+        "Quota Amount": [5, None],
+        "Description": ["", ""],
+    })
+
+    result = preprocess_quota(quota)
+
+    assert result["SKU"].tolist() == ["NAPGR", "NAP001"]
+    assert result["Quota Amount"].tolist() == [5, 0]
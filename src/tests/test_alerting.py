@@ -0,0 +1,121 @@
+"""
+Tests for the alert delivery, against a local webhook.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bearaby_ops.alerting import (
+    DUPLICATE, FAILED, PENDING, SENT, AlertDispatcher, SlackSink, format_alert,
+)
+from bearaby_ops.customClasses.HTTPTransport import HTTPTransport
+
+
+class Webhook:
+    """Answers the posted messages with the queued statuses, then 200"""
+
+    def __init__(self):
+        self.messages = []
+        self.statuses = []
+        self.delay = threading.Event()
+        self.delay.set()
+
+    def handler(self):
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                webhook.delay.wait()
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status = webhook.statuses.pop(0) if webhook.statuses else 200
+                if status == 200:
+                    webhook.messages.append(body["text"])
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def webhook():
+    hook = Webhook()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), hook.handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    hook.url = f"http://127.0.0.1:{server.server_address[1]}/hook"
+    yield hook
+    hook.delay.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sink(webhook):
+    return SlackSink(webhook.url, timeout=5, transport=HTTPTransport(retries=0))
+
+
+def alert(name="total", level="total", delta=-600.0):
+    return {
+        "date": "10/02/2026", "level": level, "name": name,
+        "previous": 1000.0, "current": 1000.0 + delta, "delta": delta, "threshold": 500.0,
+    }
+
+
+def test_total_alert_keeps_the_legacy_message():
+    assert format_alert(alert()) == "Inventory diff is -600 from yesterday. Date: 10/02/2026."
+    assert "sku NAP001 is 12.5" in format_alert(alert("NAP001", "sku", 12.5))
+
+
+def test_server_errors_are_retried(webhook, sink):
+    webhook.statuses = [503, 429]
+    dispatcher = AlertDispatcher([sink], retries=2, backoff=0.01).start()
+
+    dispatcher.submit(alert())
+
+    assert dispatcher.close(timeout=5) == {"10/02/2026|total|total": SENT}
+    assert webhook.messages == [format_alert(alert())]
+
+
+def test_rejected_alert_is_not_retried_and_does_not_stop_the_others(webhook, sink):
+    webhook.statuses = [400]
+    dispatcher = AlertDispatcher([sink], retries=2, backoff=0.01).start()
+
+    dispatcher.submit(alert("NAP001", "sku"))
+    dispatcher.submit(alert("NAP002", "sku"))
+
+    results = dispatcher.close(timeout=5)
+    assert results == {"10/02/2026|sku|NAP001": FAILED, "10/02/2026|sku|NAP002": SENT}
+    assert webhook.statuses == []
+    assert len(webhook.messages) == 1
+
+
+def test_sent_alerts_are_not_sent_again_by_the_next_run(webhook, sink, tmp_path):
+    state_file = str(tmp_path / "tracking" / "alerts.json")
+    first = AlertDispatcher([sink], state_file=state_file).start()
+    first.submit(alert())
+    assert not first.submit(alert())
+    first.close(timeout=5)
+
+    second = AlertDispatcher([sink], state_file=state_file).start()
+    assert not second.submit(alert())
+    assert second.submit(alert(delta=-700.0) | {"date": "10/03/2026"})
+
+    assert second.close(timeout=5) == {"10/02/2026|total|total": DUPLICATE, "10/03/2026|total|total": SENT}
+    assert len(webhook.messages) == 2
+
+
+def test_alerts_left_after_the_timeout_stay_pending(webhook, sink, tmp_path):
+    webhook.delay.clear()
+    state_file = tmp_path / "alerts.json"
+    dispatcher = AlertDispatcher([sink], state_file=str(state_file)).start()
+
+    dispatcher.submit(alert())
+
+    assert dispatcher.close(timeout=0.2) == {"10/02/2026|total|total": PENDING}
+    assert json.loads(state_file.read_text()) == {}
@@ -0,0 +1,66 @@
+"""
+Tests for the catalog narrowing the dtypes of the frames it loads.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+from kedro.extras.datasets.pandas import CSVDataSet
+from kedro.io import MemoryDataset
+
+from bearaby_ops.catalog import OptimizingDataCatalog, memory_usage, optimize_dtypes
+
+
+def inventory(rows=1000):
+    return pd.DataFrame({
+        "WAREHOUSEID": np.where(np.arange(rows) % 3, "BLNJ", "3PLC LA"),
+        "SKU": [f"NAP{i:05d}" for i in range(rows)],
+        "AVAILABLE": np.arange(rows, dtype=np.int64),
+        "Quota Amount": np.arange(rows, dtype=np.float64),
+        "Cost": np.linspace(0.1, 99.9, rows),
+    })
+
+
+def test_dtypes_are_narrowed_without_changing_values():
+    frame = inventory()
+    expected = frame.copy()
+
+    optimized = optimize_dtypes(frame)
+
+    assert optimized.dtypes.to_dict() == {
+        "WAREHOUSEID": "category", "SKU": object, "AVAILABLE": np.int32,
+        "Quota Amount": np.float32, "Cost": np.float64,
+    }
+    pd.testing.assert_frame_equal(optimized, expected, check_dtype=False, check_categorical=False)
+    assert memory_usage(optimized) < memory_usage(expected)
+
+
+def test_values_that_do_not_fit_keep_their_dtype():
+    frame = pd.DataFrame({
+        "AVAILABLE": [0, 2 ** 40], "Quota Amount": [np.nan, 0.1], "Collection": ["Napper", "Hugger"],
+    })
+
+    optimized = optimize_dtypes(frame)
+
+    assert optimized["AVAILABLE"].dtype == np.int64
+    assert optimized["Quota Amount"].dtype == np.float64
+    # as many collections as rows, the column stays text
+    assert optimized["Collection"].dtype == object
+
+
+def test_frames_loaded_from_files_are_optimized_and_logged(tmp_path, caplog):
+    path = tmp_path / "inventory.csv"
+    inventory().to_csv(path, index=False)
+    catalog = OptimizingDataCatalog({
+        "inventory": CSVDataSet(str(path)),
+        "in_memory": MemoryDataset(inventory()),
+    })
+
+    with caplog.at_level(logging.INFO, logger="bearaby_ops.catalog"):
+        loaded = catalog.shallow_copy().load("inventory")
+        in_memory = catalog.load("in_memory")
+
+    assert loaded["WAREHOUSEID"].dtype == "category"
+    assert in_memory["WAREHOUSEID"].dtype == object
+    messages = [record.getMessage() for record in caplog.records if record.name == "bearaby_ops.catalog"]
+    assert len(messages) == 1 and messages[0].startswith("Loaded 'inventory':")
@@ -0,0 +1,48 @@
+"""
+Tests for the project run command and its run profile.
+"""
+import os
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from bearaby_ops import cli
+from bearaby_ops.runner import MAX_WORKERS_ENV, ThreadRunner
+
+RUN_PROFILE = Path(__file__).resolve().parents[2] / "conf" / "base" / "run.yml"
+
+
+@pytest.fixture
+def kedro_run(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cli.kedro_run, "callback", lambda **kwargs: calls.append(kwargs))
+    # restored once the test ran, the command sets it
+    monkeypatch.setenv(MAX_WORKERS_ENV, "")
+    return calls
+
+
+def test_run_profile_picks_the_sequential_runner(kedro_run):
+    result = CliRunner().invoke(cli.run, ["--config", str(RUN_PROFILE)])
+
+    assert result.exit_code == 0, result.output
+    assert kedro_run[0]["runner"] == "SequentialRunner"
+    assert not os.environ[MAX_WORKERS_ENV]
+
+
+def test_project_runners_are_sized_by_max_workers(kedro_run):
+    result = CliRunner().invoke(cli.run, ["--runner", "ThreadRunner", "--max-workers", "4"])
+
+    assert result.exit_code == 0, result.output
+    assert kedro_run[0]["runner"] == "bearaby_ops.runner.ThreadRunner"
+    assert ThreadRunner()._max_workers == 4
+
+
+def test_command_line_overrides_the_profile(kedro_run):
+    result = CliRunner().invoke(
+        cli.run, ["--config", str(RUN_PROFILE), "--runner", "ParallelRunner", "--max-workers", "2"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert kedro_run[0]["runner"] == "bearaby_ops.runner.ParallelRunner"
+    assert ThreadRunner()._max_workers == 2
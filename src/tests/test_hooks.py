@@ -0,0 +1,99 @@
+"""
+Tests for the export of the API trace by the project hooks.
+"""
+import json
+
+import pytest
+from kedro.framework.hooks import _create_hook_manager
+from kedro.io import DataCatalog, MemoryDataset
+
+from bearaby_ops import hooks
+from bearaby_ops.customClasses.Tracer import get_default_tracer
+from bearaby_ops.hooks import APIAccessHooks
+
+
+@pytest.fixture
+def hook_manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(hooks, "project_url", str(tmp_path))
+    tracer = get_default_tracer()
+    tracer.clear()
+    with tracer.span("GET secure-wms.com/inventory/stocksummaries", **{"http.status_code": 503}):
+        pass
+    hook_manager = _create_hook_manager()
+    hook_manager.register(APIAccessHooks())
+    yield hook_manager
+    tracer.clear()
+
+
+def _exported_spans(tmp_path):
+    traces = list((tmp_path / "data" / "09_tracking").glob("api_trace_*.json"))
+    assert len(traces) == 1
+    return [span["name"] for span in json.loads(traces[0].read_text())["spans"]]
+
+
+def test_trace_is_exported_when_the_pipeline_fails(hook_manager, tmp_path):
+    hook_manager.hook.on_pipeline_error(error=ValueError("broken node"), run_params={}, pipeline=None, catalog=None)
+
+    assert _exported_spans(tmp_path) == ["GET secure-wms.com/inventory/stocksummaries"]
+
+
+def test_trace_is_exported_when_an_upload_fails(hook_manager, tmp_path, monkeypatch):
+    def publish(catalog):
+        raise ConnectionError("sheets are down")
+
+    monkeypatch.setattr(APIAccessHooks, "_publish", staticmethod(publish))
+
+    with pytest.raises(ConnectionError):
+        hook_manager.hook.after_pipeline_run(run_params={}, run_result={}, pipeline=None, catalog=DataCatalog())
+
+    assert _exported_spans(tmp_path) == ["GET secure-wms.com/inventory/stocksummaries"]
+
+
+SENT_ALERTS = []
+
+
+class RecordingSink:
+    def __init__(self, url):
+        self.url = url
+
+    def send(self, alert):
+        SENT_ALERTS.append(alert)
+
+
+class StubClientFactory:
+    def drive(self, *args):
+        return None
+
+    def credentials(self, *args):
+        return None
+
+
+class FailingSheetUpdater:
+    def __init__(self, *args):
+        pass
+
+    def update_sheet(self, **kwargs):
+        raise ConnectionError("sheets are down")
+
+
+def test_alerts_sent_before_a_failed_sheet_update_are_not_sent_again(hook_manager, tmp_path, monkeypatch):
+    SENT_ALERTS.clear()
+    monkeypatch.setenv("SLACK_URL", "https://hooks.slack.com/services/a/b/c")
+    monkeypatch.setattr(hooks, "SlackSink", RecordingSink)
+    monkeypatch.setattr(hooks, "get_default_client_factory", StubClientFactory)
+    monkeypatch.setattr(hooks, "run_uploads", lambda *args, **kwargs: {})
+    monkeypatch.setattr(hooks, "GoogleSheetUpdater", FailingSheetUpdater)
+    alert = {
+        "date": "10/02/2026", "level": "total", "name": "total",
+        "previous": 1000.0, "current": 400.0, "delta": -600.0, "threshold": 500.0,
+    }
+    catalog = DataCatalog({"inventory_alerts": MemoryDataset([alert], copy_mode="assign")})
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            APIAccessHooks._publish(catalog)
+
+    state = json.loads((tmp_path / "data" / "09_tracking" / ".alerts_sent.json").read_text())
+    assert list(state) == ["10/02/2026|total|total"]
+    assert SENT_ALERTS == [alert]
+
@@ -0,0 +1,119 @@
+"""
+Tests for the concurrent download of the raw warehouse files.
+"""
+import json
+import os
+import time
+
+from bearaby_ops.ingestion import InventorySource, run_ingestion
+
+
+def _writer(content, delay=0.0):
+    def fetch(path):
+        time.sleep(delay)
+        with open(path, "w") as f:
+            f.write(content)
+    return fetch
+
+
+def _failing(path):
+    with open(path, "w") as f:
+        f.write("partial")
+    raise ConnectionError("warehouse is down")
+
+
+def test_sources_run_concurrently(tmp_path):
+    sources = [
+        InventorySource(f"source{i}", _writer(f"rows{i}", delay=0.3), str(tmp_path / f"{i}.csv"))
+        for i in range(3)
+    ]
+
+    started = time.monotonic()
+    summary = run_ingestion(sources, max_workers=3)
+
+    assert time.monotonic() - started < 0.8
+    assert summary == {"source0": "fresh", "source1": "fresh", "source2": "fresh"}
+    assert (tmp_path / "2.csv").read_text() == "rows2"
+
+
+def test_failed_source_keeps_previous_file(tmp_path):
+    target = tmp_path / "failing.csv"
+    target.write_text("yesterday")
+    sources = [
+        InventorySource("failing", _failing, str(target)),
+        InventorySource("working", _writer("today"), str(tmp_path / "working.csv")),
+    ]
+
+    summary = run_ingestion(sources)
+
+    assert summary["failing"] == "warehouse is down"
+    assert summary["working"] == "fresh"
+    assert target.read_text() == "yesterday"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["failing.csv", "working.csv"]
+
+
+def test_slow_source_is_abandoned(tmp_path):
+    target = tmp_path / "slow.csv"
+    target.write_text("yesterday")
+    sources = [
+        InventorySource("slow", _writer("late", delay=0.5), str(target), timeout=0.1),
+        InventorySource("fast", _writer("today"), str(tmp_path / "fast.csv")),
+    ]
+
+    summary = run_ingestion(sources)
+    time.sleep(0.6)
+
+    assert summary["slow"].startswith("timed out")
+    assert summary["fast"] == "fresh"
+    assert target.read_text() == "yesterday"
+
+
+def test_unchanged_payload_keeps_cached_file(tmp_path):
+    target = tmp_path / "inventory.csv"
+    state_file = str(tmp_path / "state.json")
+    run_ingestion([InventorySource("bergen", _writer("SKU,QTY\nA,1\nB,2\n"), str(target))], state_file=state_file)
+    os.utime(target, (0, 0))
+
+    # same rows in another order
+    summary = run_ingestion([InventorySource("bergen", _writer("SKU,QTY\nB,2\nA,1\n"), str(target))], state_file=state_file)
+
+    assert summary == {"bergen": "cached"}
+    assert os.stat(target).st_mtime == 0
+    assert target.read_text() == "SKU,QTY\nA,1\nB,2\n"
+
+    summary = run_ingestion([InventorySource("bergen", _writer("SKU,QTY\nA,1\nB,3\n"), str(target))], state_file=state_file)
+
+    assert summary == {"bergen": "fresh"}
+    assert target.read_text() == "SKU,QTY\nA,1\nB,3\n"
+
+
+def test_conditional_source_gets_stored_validators(tmp_path):
+    target = tmp_path / "inventory.csv"
+    state_file = tmp_path / "state.json"
+    seen = []
+
+    def fetch(path, validators):
+        seen.append(dict(validators))
+        if validators.get("etag") == '"v1"':
+            validators["not_modified"] = True
+            return
+        validators["etag"] = '"v1"'
+        _writer("SKU,QTY\nA,1\n")(path)
+
+    run_ingestion([InventorySource("bergen", fetch, str(target), conditional=True)], state_file=str(state_file))
+    summary = run_ingestion([InventorySource("bergen", fetch, str(target), conditional=True)], state_file=str(state_file))
+
+    assert seen == [{}, {"etag": '"v1"'}]
+    assert summary == {"bergen": "cached"}
+    assert json.loads(state_file.read_text())["bergen"]["etag"] == '"v1"'
+
+
+def test_corrupt_state_file_treats_every_source_as_fresh(tmp_path):
+    target = tmp_path / "inventory.csv"
+    state_file = tmp_path / "state.json"
+    state_file.write_text('{"bergen": {"hash": "ab')
+
+    summary = run_ingestion([InventorySource("bergen", _writer("SKU,QTY\nA,1\n"), str(target))], state_file=str(state_file))
+
+    assert summary == {"bergen": "fresh"}
+    assert "bergen" in json.loads(state_file.read_text())
@@ -0,0 +1,73 @@
+"""
+Tests for the node ownership declarations and the mutation guard.
+"""
+import pandas as pd
+import pytest
+from kedro.framework.hooks import _create_hook_manager
+from kedro.io import MemoryDataset
+from kedro.pipeline import node, pipeline
+from kedro.runner import SequentialRunner
+
+from bearaby_ops.catalog import OptimizingDataCatalog
+from bearaby_ops.extras.datasets import CopyOnWriteMemoryDataset
+from bearaby_ops.ownership import InputMutatedError, MutationGuardHooks, consumed_inputs, consumes
+
+
+def drop_empty(frame):
+    frame.dropna(inplace=True)
+    return frame
+
+
+@consumes("frame")
+def drop_empty_owned(frame):
+    frame.dropna(inplace=True)
+    return frame
+
+
+def total(frame, scale):
+    return frame["value"].sum() * scale
+
+
+def run(nodes):
+    hook_manager = _create_hook_manager()
+    hook_manager.register(MutationGuardHooks())
+    catalog = OptimizingDataCatalog({
+        "numbers": MemoryDataset(pd.DataFrame({"value": [1.0, None, 3.0]})),
+        "params:scale": MemoryDataset(2),
+    })
+    return SequentialRunner().run(pipeline(nodes), catalog, hook_manager)
+
+
+def test_consumed_arguments_are_mapped_to_datasets():
+    assert consumed_inputs(node(drop_empty_owned, "numbers", "clean")) == {"numbers"}
+    assert consumed_inputs(node(drop_empty_owned, {"frame": "numbers"}, "clean")) == {"numbers"}
+    assert consumed_inputs(node(drop_empty, "numbers", "clean")) == set()
+
+
+def test_unknown_arguments_are_rejected():
+    with pytest.raises(ValueError, match="no argument"):
+        consumes("frames")(drop_empty)
+
+
+def test_undeclared_mutation_fails_the_node():
+    with pytest.raises(InputMutatedError, match=r"\['numbers'\]"):
+        run([node(drop_empty, "numbers", "clean", name="drop_empty")])
+
+
+def test_declared_mutation_and_reads_pass():
+    outputs = run([
+        node(drop_empty_owned, "numbers", "clean", name="drop_empty"),
+        node(total, ["clean", "params:scale"], "total", name="total"),
+    ])
+
+    assert outputs == {"total": 8.0}
+
+
+def test_intermediate_results_are_kept_copy_on_write():
+    catalog = OptimizingDataCatalog()
+
+    catalog.add("clean", MemoryDataset())
+    catalog.add("numbers", MemoryDataset(pd.DataFrame({"value": [1]})))
+
+    assert isinstance(catalog._get_dataset("clean"), CopyOnWriteMemoryDataset)
+    assert type(catalog._get_dataset("numbers")) is MemoryDataset
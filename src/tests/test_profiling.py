@@ -0,0 +1,109 @@
+"""
+Tests for the profiling hooks, on a small pipeline.
+"""
+import pstats
+import time
+
+import pandas as pd
+import pytest
+from kedro.framework.hooks import _create_hook_manager
+from kedro.io import DataCatalog, MemoryDataset
+from kedro.pipeline import node, pipeline
+from kedro.runner import SequentialRunner, ThreadRunner
+
+from bearaby_ops.profiling import LOAD, NODE, RUN, SAVE, ProfilingHooks, data_size, read_profile
+
+
+def double(frame):
+    return frame.assign(value=frame["value"] * 2)
+
+
+def fail(frame):
+    raise ValueError("broken node")
+
+
+def spin(frame):
+    started = time.thread_time()
+    while time.thread_time() - started < 0.3:
+        pass
+    return frame
+
+
+def sleep(frame):
+    time.sleep(0.3)
+    return frame
+
+
+def run(hooks, nodes, session_id="session-1", runner=None):
+    hook_manager = _create_hook_manager()
+    hook_manager.register(hooks)
+    catalog = DataCatalog({"numbers": MemoryDataset(pd.DataFrame({"value": range(1000)}))})
+    run_params = {"session_id": session_id, "pipeline_name": None}
+    hook_manager.hook.before_pipeline_run(run_params=run_params, pipeline=None, catalog=catalog)
+    (runner or SequentialRunner()).run(pipeline(nodes), catalog, hook_manager, session_id)
+    hook_manager.hook.after_pipeline_run(run_params=run_params, run_result={}, pipeline=None, catalog=catalog)
+
+
+def test_data_size_of_frames_and_other_data():
+    frame = pd.DataFrame({"value": range(10)}, dtype="int64")
+
+    assert data_size(frame) == {"rows": 10, "bytes": 80 + frame.index.memory_usage()}
+    assert data_size([1, 2]) == {"rows": 2, "bytes": None}
+    assert data_size(3) == {"rows": None, "bytes": None}
+
+
+def test_nodes_and_datasets_are_recorded(tmp_path):
+    path = tmp_path / "profiling.jsonl"
+
+    run(ProfilingHooks(str(path)), [
+        node(double, "numbers", "doubled", name="double"),
+        node(double, "doubled", "quadrupled", name="double_again"),
+    ])
+
+    records = read_profile(str(path))
+    assert set(records["session_id"]) == {"session-1"}
+    nodes = records[records["event"] == NODE].set_index("name")
+    assert list(nodes.index) == ["double", "double_again"]
+    assert nodes.loc["double", "input_rows"] == 1000
+    assert nodes.loc["double", "output_bytes"] > 8000
+    assert (nodes["wall_seconds"] >= 0).all() and (nodes["peak_rss_delta_bytes"] >= 0).all()
+    assert records.loc[records["event"] == LOAD, "name"].tolist() == ["numbers", "doubled"]
+    assert records.loc[records["event"] == SAVE, "name"].tolist() == ["doubled", "quadrupled"]
+    assert records["event"].iloc[-1] == RUN
+
+
+def test_named_node_is_profiled(tmp_path):
+    hooks = ProfilingHooks(str(tmp_path / "profiling.jsonl"), profile_nodes=["double_again"])
+
+    run(hooks, [
+        node(double, "numbers", "doubled", name="double"),
+        node(double, "doubled", "quadrupled", name="double_again"),
+    ], session_id="s2")
+
+    nodes = read_profile(hooks.path).query("event == @NODE").set_index("name")
+    assert nodes.loc["double", "profile"] is None
+    stats = pstats.Stats(nodes.loc["double_again", "profile"])
+    assert any(function == "double" for _, _, function in stats.stats)
+
+
+def test_failed_node_is_recorded(tmp_path):
+    hooks = ProfilingHooks(str(tmp_path / "profiling.jsonl"))
+
+    with pytest.raises(ValueError):
+        run(hooks, [node(fail, "numbers", "nothing", name="fail")])
+
+    record = read_profile(hooks.path).query("event == @NODE").iloc[0]
+    assert record["name"] == "fail" and "broken node" in record["error"]
+
+
+def test_cpu_time_of_a_node_excludes_the_nodes_running_next_to_it(tmp_path):
+    hooks = ProfilingHooks(str(tmp_path / "profiling.jsonl"))
+
+    run(hooks, [
+        node(spin, "numbers", "spun", name="spin"),
+        node(sleep, "numbers", "slept", name="sleep"),
+    ], runner=ThreadRunner(max_workers=2))
+
+    nodes = read_profile(hooks.path).query("event == @NODE").set_index("name")
+    assert nodes.loc["spin", "cpu_seconds"] >= 0.3
+    assert nodes.loc["sleep", "cpu_seconds"] < 0.1
@@ -0,0 +1,108 @@
+"""
+Tests for the Drive upload stage, against a local Drive backend.
+"""
+import datetime
+
+import pytest
+from googleapiclient.discovery import build
+
+from bearaby_ops.uploads import CSV_MIMETYPE, XLSX_MIMETYPE, DriveUpload, drive_upload, run_uploads, upload_file
+
+from .drive_stub import LocalHttp, StubDrive, serve_drive
+
+
+@pytest.fixture
+def drive():
+    stub = StubDrive()
+    server = serve_drive(stub)
+    stub.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service(drive):
+    return build("drive", "v3", http=LocalHttp(drive.base_url), static_discovery=True)
+
+
+def test_upload_names_follow_the_drive_folders():
+    now = datetime.datetime(2026, 10, 8)
+
+    assert drive_upload("a.xlsx", "", "f", now).name == "10-08-2026.xlsx"
+    assert drive_upload("a.xlsx", "display", "f", now).mimetype == XLSX_MIMETYPE
+    upload = drive_upload("a.csv", "3PLCenter", "f", now)
+    assert (upload.name, upload.mimetype) == ("3PLCenter100826.csv", CSV_MIMETYPE)
+
+
+def test_existing_file_in_the_folder_is_updated(drive, service, tmp_path):
+    path = tmp_path / "inventory.csv"
+    path.write_bytes(b"SKU,AVAILABLE\nNAP001,3\n")
+    existing = drive.add("it's.csv", "folder-a")
+    drive.add("it's.csv", "folder-b")
+
+    file_id = upload_file(service, DriveUpload(str(path), "it's.csv", "folder-a", CSV_MIMETYPE))
+
+    assert file_id == existing
+    assert drive.files[existing]["content"] == path.read_bytes()
+    assert len(drive.files) == 2
+
+
+def test_large_files_are_uploaded_in_chunks(drive, service, tmp_path):
+    path = tmp_path / "final_SKU_table.xlsx"
+    content = bytes(range(256)) * 4096  # 1 MiB
+    path.write_bytes(content)
+
+    file_id = upload_file(
+        service, DriveUpload(str(path), "display", "folder", XLSX_MIMETYPE),
+        chunk_size=256 * 1024, resumable_threshold=512 * 1024,
+    )
+
+    assert drive.files[file_id]["content"] == content
+    assert drive.files[file_id]["parents"] == ["folder"]
+    assert drive.chunk_requests == 4
+
+
+def test_failed_chunk_is_resent(drive, service, tmp_path, monkeypatch):
+    # no backoff before resuming
+    monkeypatch.setattr("bearaby_ops.uploads.random.random", lambda: 0.0)
+    path = tmp_path / "final_SKU_table.xlsx"
+    content = bytes(range(256)) * 4096  # 1 MiB
+    path.write_bytes(content)
+    drive.fail_chunks = {2}
+
+    file_id = upload_file(
+        service, DriveUpload(str(path), "display", "folder", XLSX_MIMETYPE),
+        chunk_size=256 * 1024, resumable_threshold=512 * 1024, num_retries=1,
+    )
+
+    assert drive.files[file_id]["content"] == content
+    assert drive.chunk_requests == 5
+
+
+def test_uploads_run_concurrently_on_their_own_connections(drive, service, tmp_path):
+    uploads = []
+    for i in range(6):
+        path = tmp_path / f"{i}.csv"
+        path.write_bytes(b"x" * (i + 1))
+        uploads.append(DriveUpload(str(path), f"{i}.csv", "folder", CSV_MIMETYPE))
+
+    summary = run_uploads(service, uploads, http_factory=lambda: LocalHttp(drive.base_url), max_workers=3)
+
+    assert sorted(f["content"] for f in drive.files.values()) == [b"x" * (i + 1) for i in range(6)]
+    assert set(summary.values()) == set(drive.files)
+    assert 1 < len({port for _, port in drive.connections}) <= 3
+
+
+def test_failed_upload_does_not_stop_the_others(drive, service, tmp_path):
+    path = tmp_path / "ok.csv"
+    path.write_bytes(b"ok")
+    uploads = [
+        DriveUpload(str(tmp_path / "missing.csv"), "missing.csv", "folder", CSV_MIMETYPE),
+        DriveUpload(str(path), "ok.csv", "folder", CSV_MIMETYPE),
+    ]
+
+    summary = run_uploads(service, uploads, http_factory=lambda: LocalHttp(drive.base_url))
+
+    assert summary["ok.csv"] in drive.files
+    assert "missing.csv" in summary["missing.csv"]